@@ -0,0 +1,97 @@
+"""
+Async base classes for DRF views.
+
+DRF dispatches synchronously, so an `async def` handler on a plain APIView
+would return an unawaited coroutine. AsyncAPIView and
+AsyncReadOnlyModelViewSet run DRF's request setup (authentication,
+permissions, throttling, content negotiation) in a worker thread and then
+await the handler, so handlers can use Django's async ORM (`async for`,
+`aget`, ...). Under ASGI (see config/gunicorn.conf.py) a request waiting
+on the database then no longer occupies a worker thread; under WSGI and
+in tests Django runs the same views through async_to_sync.
+
+All handlers of such a view must be coroutines. Sync helpers that touch
+the database are called through sync_to_async.
+"""
+import inspect
+
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from rest_framework import viewsets
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+class AsyncDispatchMixin:
+    """Async version of APIView.dispatch()."""
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            # OPTIONS and 405 responses come from DRF's sync handlers
+            if inspect.isawaitable(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncAPIView(AsyncDispatchMixin, APIView):
+    """APIView whose handlers are coroutines."""
+
+
+class AsyncReadOnlyModelViewSet(AsyncDispatchMixin, viewsets.GenericViewSet):
+    """ReadOnlyModelViewSet with async list/retrieve; extra actions must be async too."""
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        # ViewSetMixin builds a sync view function; it returns our coroutine
+        return markcoroutinefunction(super().as_view(actions, **initkwargs))
+
+    async def aget_object(self):
+        """Async get_object(): look up the instance named by the URL kwarg."""
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            obj = await queryset.aget(**filter_kwargs)
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def paginated_response(self, queryset):
+        """Serialize `queryset`, paginated if the paginator applies."""
+        page = await sync_to_async(self.paginate_queryset)(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer([obj async for obj in queryset], many=True)
+        return Response(serializer.data)
+
+    async def list(self, request, *args, **kwargs):
+        return await self.paginated_response(self.filter_queryset(self.get_queryset()))
+
+    async def retrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
@@ -0,0 +1,176 @@
+"""
+Immutable catalog bundles.
+
+The catalog (modules, career paths, career offers, master programs and
+support services) only changes when import_course_data or a seed_* command
+runs. Those commands call build_catalog_bundles(). It writes one JSON
+bundle per examination regulation and language to
+settings.CATALOG_BUNDLE_DIR:
+
+    catalog-<regulation id>-<language>.<content hash>.json
+    ... .json.gz                      (always)
+    ... .json.br                      (if the brotli package is installed)
+
+plus manifest.json mapping each regulation and language to its current
+file. A bundle's name changes whenever its content does, so clients and
+proxies may cache bundles forever. They only need to revalidate the small
+manifest (GET /api/catalog/manifest/).
+
+A bundle holds the same objects the catalog endpoints return, with the
+other language's `*_en`/`*_de` fields left out.
+
+Files of the previous manifest are kept, so clients still holding it
+can finish loading; older bundles are deleted.
+"""
+import gzip
+import hashlib
+import json
+import os
+
+from django.conf import settings
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import (
+    CareerOffer, CareerPath, ExaminationRegulation, MasterProgram, Module, SupportService
+)
+from .renderers import ORJSONRenderer
+from .serializers import (
+    CareerOfferSerializer, CareerPathSerializer, MasterProgramSerializer,
+    ModuleSerializer, SupportServiceSerializer
+)
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+LANGUAGES = ['en', 'de']
+
+MANIFEST_NAME = 'manifest.json'
+
+# Hex digits of the SHA-256 content hash used in file names
+HASH_LENGTH = 16
+
+
+def _localize(data, language):
+    """Drop the fields of the other languages (`title_de` from an English bundle etc.)."""
+    other_suffixes = tuple(f'_{other}' for other in LANGUAGES if other != language)
+    if isinstance(data, dict):
+        return {
+            key: _localize(value, language)
+            for key, value in data.items()
+            if not key.endswith(other_suffixes)
+        }
+    if isinstance(data, list):
+        return [_localize(item, language) for item in data]
+    return data
+
+
+def _shared_catalog():
+    """Serialized catalog parts that do not depend on the regulation."""
+    careers = CareerPath.objects.filter(is_active=True).annotate(
+        module_count=Count('module_relevances')
+    ).order_by('title_en')
+    return {
+        'careers': CareerPathSerializer(careers, many=True).data,
+        'career_offers': CareerOfferSerializer(
+            CareerOffer.objects.filter(is_active=True), many=True
+        ).data,
+        'master_programs': MasterProgramSerializer(
+            MasterProgram.objects.filter(is_active=True), many=True
+        ).data,
+        'support_services': SupportServiceSerializer(
+            SupportService.objects.filter(is_active=True).prefetch_related(
+                'related_milestones'
+            ).order_by('category', 'name'),
+            many=True
+        ).data,
+    }
+
+
+def _write_atomic(path, content):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _write_bundle(directory, stem, body):
+    """Write the bundle and its compressed variants; return its manifest entry."""
+    digest = hashlib.sha256(body).hexdigest()[:HASH_LENGTH]
+    name = f'{stem}.{digest}.json'
+    path = os.path.join(directory, name)
+    # Same name means same content, so an existing bundle is left as is
+    if not os.path.exists(path):
+        _write_atomic(f'{path}.gz', gzip.compress(body, compresslevel=9, mtime=0))
+        if brotli is not None:
+            _write_atomic(f'{path}.br', brotli.compress(body, quality=11))
+        _write_atomic(path, body)
+    return {'file': name, 'hash': digest, 'bytes': len(body)}
+
+
+def read_manifest(directory=None):
+    """Return the current manifest, or None if no bundles were built yet."""
+    directory = str(directory or settings.CATALOG_BUNDLE_DIR)
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), 'rb') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _manifest_files(manifest):
+    return {
+        entry['file']
+        for languages in (manifest or {}).get('bundles', {}).values()
+        for entry in languages.values()
+    }
+
+
+def _prune(directory, keep):
+    for name in os.listdir(directory):
+        if not name.startswith('catalog-'):
+            continue
+        base = name.removesuffix('.gz').removesuffix('.br').removesuffix('.tmp')
+        if base not in keep:
+            os.remove(os.path.join(directory, name))
+
+
+def build_catalog_bundles(directory=None):
+    """Write the bundles of every regulation and language; return the manifest."""
+    directory = str(directory or settings.CATALOG_BUNDLE_DIR)
+    os.makedirs(directory, exist_ok=True)
+    previous = read_manifest(directory)
+
+    shared = _shared_catalog()
+    renderer = ORJSONRenderer()
+    bundles = {}
+    for regulation in ExaminationRegulation.objects.order_by('id'):
+        modules = ModuleSerializer(
+            Module.objects.filter(examination_regulation=regulation).order_by('module_code', 'id'),
+            many=True
+        ).data
+        for language in LANGUAGES:
+            catalog = _localize({
+                'regulation': regulation.id,
+                'language': language,
+                'modules': modules,
+                **shared,
+            }, language)
+            bundles.setdefault(str(regulation.id), {})[language] = _write_bundle(
+                directory, f'catalog-{regulation.id}-{language}', renderer.render(catalog)
+            )
+
+    manifest = {'generated_at': timezone.now().isoformat(), 'bundles': bundles}
+    if previous and previous['bundles'] == bundles:
+        # Nothing changed; keep the manifest (and its timestamp) stable
+        return previous
+
+    _write_atomic(
+        os.path.join(directory, MANIFEST_NAME),
+        json.dumps(manifest, indent=2).encode()
+    )
+    _prune(directory, _manifest_files(manifest) | _manifest_files(previous))
+    return manifest
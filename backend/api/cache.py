@@ -0,0 +1,146 @@
+"""
+Versioned response cache for the public catalog endpoints.
+
+Every catalog model has a "catalog version" token stored in the `catalog`
+cache. The token is replaced whenever rows of that model change: through
+post_save/post_delete signals (see api/signals.py), or explicitly by the
+seed and import commands after bulk writes. Cached responses are keyed on
+the request path plus the versions of the models they are built from, so
+a stale entry is never served and nothing has to be deleted.
+
+Because the version is part of the key, it also yields a strong ETag;
+clients sending a matching If-None-Match get a 304 without the view
+running at all.
+
+The cache backend is configured in settings.CACHES (CACHE_BACKEND env var):
+local memory by default, or a file/shared-memory backend so that several
+worker processes see the same versions.
+"""
+import hashlib
+import uuid
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+
+CATALOG_CACHE_ALIAS = 'catalog'
+VERSION_KEY_PREFIX = 'catalog-version:'
+RESPONSE_KEY_PREFIX = 'catalog-response:'
+
+
+def _catalog_cache():
+    return caches[CATALOG_CACHE_ALIAS]
+
+
+def _version_key(model):
+    return VERSION_KEY_PREFIX + model._meta.label_lower
+
+
+def bump_catalog_version(*models):
+    """Invalidate everything cached for the given models."""
+    _catalog_cache().set_many(
+        {_version_key(model): uuid.uuid4().hex for model in models},
+        timeout=None
+    )
+
+
+def catalog_version(*models):
+    """Return a token identifying the current state of the given models."""
+    cache = _catalog_cache()
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        # Another worker may initialise the same key concurrently; add()
+        # keeps whichever token got there first.
+        for key in missing:
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+        versions.update(cache.get_many(missing))
+
+    return '.'.join(versions.get(key, '') for key in keys)
+
+
+def is_process_local(alias):
+    """True if entries of the cache `alias` are invisible to other processes."""
+    return isinstance(caches[alias], (LocMemCache, DummyCache))
+
+
+def _etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return '*' in etags or etag in etags or f'W/{etag}' in etags
+
+
+def _catalog_etag(request, version):
+    """Return (cache key, ETag) of a catalog response."""
+    digest = hashlib.sha1(
+        f'{request.get_full_path()}|{version}'.encode()
+    ).hexdigest()
+    media_type = getattr(request, 'accepted_media_type', '')
+    etag = '"{}"'.format(
+        hashlib.sha1(f'{digest}|{media_type}'.encode()).hexdigest()
+    )
+    return RESPONSE_KEY_PREFIX + digest, etag
+
+
+def cache_catalog_response(*models):
+    """
+    Cache the data of a GET handler until one of `models` changes.
+
+    Use on viewset actions or APIView.get methods whose response does not
+    depend on the requesting user. Non-200 responses are never cached.
+    Works on sync and async (see api/async_views.py) handlers.
+    """
+    def decorator(handler):
+        if iscoroutinefunction(handler):
+            @wraps(handler)
+            async def async_wrapper(self, request, *args, **kwargs):
+                version = await sync_to_async(catalog_version)(*models)
+                cache_key, etag = _catalog_etag(request, version)
+                headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+
+                if _etag_matches(request, etag):
+                    return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+                cache = _catalog_cache()
+                data = await cache.aget(cache_key)
+                if data is None:
+                    response = await handler(self, request, *args, **kwargs)
+                    if response.status_code != status.HTTP_200_OK:
+                        return response
+                    data = response.data
+                    await cache.aset(cache_key, data, timeout=settings.CATALOG_CACHE_TIMEOUT)
+
+                return Response(data, headers=headers)
+            return async_wrapper
+
+        @wraps(handler)
+        def wrapper(self, request, *args, **kwargs):
+            cache_key, etag = _catalog_etag(request, catalog_version(*models))
+            headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+
+            if _etag_matches(request, etag):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+            cache = _catalog_cache()
+            data = cache.get(cache_key)
+            if data is None:
+                response = handler(self, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                data = response.data
+                cache.set(cache_key, data, timeout=settings.CATALOG_CACHE_TIMEOUT)
+
+            return Response(data, headers=headers)
+        return wrapper
+    return decorator
@@ -0,0 +1,210 @@
+"""
+Server-sent event stream of a user's new notifications and milestone
+progress changes (GET /api/events/).
+
+Each open stream keeps two cursors: the highest Notification id and the
+latest MilestoneProgress.updated_at it has sent. It sends every row past
+those cursors. Then it sleeps until either
+
+- the in-process broker wakes it: Notification/MilestoneProgress saves
+  and completion changes in this worker call notify_users() (see
+  api/signals.py), or
+- EVENT_STREAM_POLL_INTERVAL passes. This database poll picks up rows
+  written by other workers, management commands and bulk operations, so
+  no external broker is needed.
+
+Every event carries the cursors as its id. A reconnecting client sends it
+back (Last-Event-ID header or ?last_event_id=), and the stream resumes
+without gaps.
+
+EventSource cannot send headers, so the stream URL carries a short-lived
+signed ticket (POST /api/events/ticket/) instead of the API token. A
+leaked URL, e.g. from an access log, is useless after
+EVENT_STREAM_TICKET_MAX_AGE seconds.
+
+Streaming needs the ASGI server (config/gunicorn.conf.py). Under WSGI
+(runserver) the view sends the pending events once and closes, and the
+client reconnects after the retry interval.
+
+Database work runs in the shared thread pool and closes its connection
+after every poll, whatever CONN_MAX_AGE says. An idle stream therefore
+holds no connection, and no pool slot.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import MilestoneProgress, Notification, User
+
+
+# Most notifications sent per poll; the rest follow on the next one
+MAX_EVENTS_PER_POLL = 100
+
+# Client reconnect delay announced to EventSource (milliseconds)
+RETRY_MS = 5000
+
+STREAM_TICKET_SALT = 'api.events.stream-ticket'
+
+
+class EventBroker:
+    """Per-process registry of open streams, woken when a user's data changes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters = defaultdict(set)
+
+    def subscribe(self, user_id):
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters[user_id].add(waiter)
+        return waiter
+
+    def unsubscribe(self, user_id, waiter):
+        with self._lock:
+            self._waiters[user_id].discard(waiter)
+            if not self._waiters[user_id]:
+                del self._waiters[user_id]
+
+    def notify(self, user_ids):
+        """Wake the streams of `user_ids`; safe to call from any thread."""
+        with self._lock:
+            waiters = [waiter for user_id in user_ids for waiter in self._waiters.get(user_id, ())]
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+
+BROKER = EventBroker()
+
+
+def notify_users(user_ids):
+    """Wake the users' open streams in this process once the transaction commits."""
+    user_ids = list(user_ids)
+    transaction.on_commit(lambda: BROKER.notify(user_ids))
+
+
+@dataclass
+class StreamCursor:
+    notification_id: int
+    progress_at: datetime
+
+    def __str__(self):
+        return f'{self.notification_id}:{int(self.progress_at.timestamp() * 1_000_000)}'
+
+    @classmethod
+    def parse(cls, value):
+        """Parse a Last-Event-ID value; None if it is not one of ours."""
+        try:
+            notification_id, micros = value.split(':')
+            progress_at = datetime.fromtimestamp(int(micros) / 1_000_000, tz=dt_timezone.utc)
+            return cls(int(notification_id), progress_at)
+        except (AttributeError, ValueError, OverflowError, OSError):
+            return None
+
+
+def issue_stream_ticket(user):
+    """Signed, short-lived credential for opening the user's event stream."""
+    return signing.TimestampSigner(salt=STREAM_TICKET_SALT).sign(str(user.pk))
+
+
+def _release_connection():
+    """
+    Close this thread's database connection. Unlike close_old_connections()
+    this ignores CONN_MAX_AGE, which would otherwise keep a connection open
+    per pool thread between polls.
+    """
+    connection.close()
+
+
+def authenticate_ticket(ticket):
+    """Return the active user a still valid stream ticket was issued to, or None."""
+    try:
+        user_id = signing.TimestampSigner(salt=STREAM_TICKET_SALT).unsign(
+            ticket, max_age=settings.EVENT_STREAM_TICKET_MAX_AGE
+        )
+        return User.objects.filter(pk=int(user_id), is_active=True).first()
+    except (signing.BadSignature, ValueError):
+        return None
+    finally:
+        _release_connection()
+
+
+def initial_cursor(user_id):
+    """Cursor at "now": only changes after connecting are sent."""
+    try:
+        last_id = Notification.objects.filter(user_id=user_id).order_by('-id').values_list(
+            'id', flat=True
+        ).first()
+    finally:
+        _release_connection()
+    return StreamCursor(last_id or 0, timezone.now())
+
+
+def fetch_events(user_id, cursor):
+    """Return ([(event name, data)], new cursor) for changes after `cursor`."""
+    # Imported here: serializers -> transcripts -> progress imports this module
+    from .serializers import MilestoneProgressSerializer, NotificationSerializer
+
+    try:
+        notifications = list(
+            Notification.objects.filter(
+                user_id=user_id, id__gt=cursor.notification_id
+            ).order_by('id')[:MAX_EVENTS_PER_POLL]
+        )
+        progress = list(
+            MilestoneProgress.objects.filter(
+                user_id=user_id, updated_at__gt=cursor.progress_at
+            ).select_related('milestone').order_by('updated_at', 'id')
+        )
+    finally:
+        _release_connection()
+
+    events = [('notification', data) for data in NotificationSerializer(notifications, many=True).data]
+    events += [('milestone', data) for data in MilestoneProgressSerializer(progress, many=True).data]
+    return events, StreamCursor(
+        notifications[-1].id if notifications else cursor.notification_id,
+        progress[-1].updated_at if progress else cursor.progress_at,
+    )
+
+
+def format_event(name, data, event_id):
+    return f'id: {event_id}\nevent: {name}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n'
+
+
+def pending_messages(user_id, cursor):
+    """The retry hint and all pending events as one SSE payload (WSGI fallback)."""
+    events, cursor = fetch_events(user_id, cursor)
+    return f'retry: {RETRY_MS}\n\n' + ''.join(format_event(name, data, cursor) for name, data in events)
+
+
+async def event_stream(user_id, cursor, poll_interval, max_age):
+    """Yield SSE messages for `user_id` for at most `max_age` seconds."""
+    waiter = BROKER.subscribe(user_id)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_age
+    try:
+        yield f'retry: {RETRY_MS}\n\n'
+        while True:
+            events, cursor = await loop.run_in_executor(None, fetch_events, user_id, cursor)
+            for name, data in events:
+                yield format_event(name, data, cursor)
+            if loop.time() >= deadline:
+                return
+
+            _, event = waiter
+            try:
+                await asyncio.wait_for(event.wait(), min(poll_interval, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                # Comment line; keeps proxies from closing an idle connection
+                yield ': keep-alive\n\n'
+            event.clear()
+    finally:
+        BROKER.unsubscribe(user_id, waiter)
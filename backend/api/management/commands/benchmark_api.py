@@ -0,0 +1,176 @@
+"""
+Management command to benchmark the main API endpoints in-process.
+
+Drives each endpoint through Django's test client from a fixed number of
+threads, authenticated as users of a generated cohort (see
+generate_cohort), and reports throughput, latency percentiles and SQL
+query counts as JSON. Query counts come from RequestMetricsMiddleware.
+
+Usage:
+    python manage.py benchmark_api
+    python manage.py benchmark_api --concurrency 16 --requests 1000
+    python manage.py benchmark_api --endpoint recommendations --output baseline.json
+"""
+import itertools
+import json
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from rest_framework.authtoken.models import Token
+
+from api.models import User
+
+
+ENDPOINTS = {
+    'modules': '/api/modules/',
+    'careers': '/api/careers/',
+    'recommendations': '/api/recommendations/',
+    'milestones': '/api/user/milestones/',
+    'notifications': '/api/notifications/',
+}
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the main API endpoints and reports latency and query counts as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--endpoint',
+            action='append',
+            choices=sorted(ENDPOINTS),
+            help='Endpoint to benchmark (repeatable, default: all)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=8,
+            help='Number of concurrent client threads',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help='Measured requests per endpoint',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=20,
+            help='Unmeasured requests per endpoint before measuring',
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=200,
+            help='Number of cohort users the requests are spread over',
+        )
+        parser.add_argument(
+            '--prefix',
+            default='cohort_',
+            help='Username prefix of the cohort to authenticate as',
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the JSON report to this file instead of stdout',
+        )
+
+    def handle(self, *args, **options):
+        users = list(
+            User.objects.filter(username__startswith=options['prefix']).order_by('id')[:options['users']]
+        )
+        if not users:
+            raise CommandError(
+                f'No users with prefix "{options["prefix"]}"; run generate_cohort first'
+            )
+        tokens = [Token.objects.get_or_create(user=user)[0].key for user in users]
+
+        report = {
+            'database': connection.vendor,
+            'concurrency': options['concurrency'],
+            'requests': options['requests'],
+            'users': len(users),
+            'endpoints': {},
+        }
+        for name in options['endpoint'] or list(ENDPOINTS):
+            self.stderr.write(f'Benchmarking {name}...')
+            self.run_requests(ENDPOINTS[name], tokens, options['warmup'], options['concurrency'])
+            report['endpoints'][name] = self.benchmark(
+                ENDPOINTS[name], tokens, options['requests'], options['concurrency']
+            )
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stderr.write(self.style.SUCCESS(f'Wrote {options["output"]}'))
+        else:
+            self.stdout.write(output)
+
+    def run_requests(self, path, tokens, count, concurrency):
+        """Issue `count` requests from `concurrency` threads; return (samples, seconds)."""
+        jobs = iter(itertools.islice(itertools.cycle(tokens), count))
+        lock = threading.Lock()
+        samples = []
+
+        def worker():
+            client = Client(HTTP_HOST='localhost')
+            try:
+                while True:
+                    with lock:
+                        token = next(jobs, None)
+                    if token is None:
+                        return
+                    started = time.perf_counter()
+                    response = client.get(path, HTTP_AUTHORIZATION=f'Token {token}')
+                    elapsed = time.perf_counter() - started
+                    metrics = getattr(response, 'request_metrics', None)
+                    with lock:
+                        samples.append((elapsed, metrics.queries if metrics else None, response.status_code))
+            finally:
+                # Every thread opens its own database connection
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return samples, time.perf_counter() - started
+
+    def benchmark(self, path, tokens, count, concurrency):
+        samples, seconds = self.run_requests(path, tokens, count, concurrency)
+        latencies = sorted(elapsed * 1000 for elapsed, _, _ in samples)
+        queries = [q for _, q, _ in samples if q is not None]
+        errors = sum(1 for _, _, status_code in samples if status_code >= 400)
+
+        return {
+            'path': path,
+            'requests': len(samples),
+            'errors': errors,
+            'seconds': round(seconds, 3),
+            'throughput_rps': round(len(samples) / seconds, 1) if seconds else None,
+            'latency_ms': {
+                'mean': round(statistics.fmean(latencies), 2),
+                'p50': round(percentile(latencies, 0.50), 2),
+                'p95': round(percentile(latencies, 0.95), 2),
+                'p99': round(percentile(latencies, 0.99), 2),
+                'max': round(latencies[-1], 2),
+            },
+            'queries': {
+                'mean': round(statistics.fmean(queries), 2) if queries else None,
+                'max': max(queries) if queries else None,
+            },
+        }
@@ -0,0 +1,98 @@
+"""
+Management command to compare the response renderers per endpoint.
+
+Fetches one response per endpoint (see benchmark_api) as a cohort user,
+then renders its data repeatedly with DRF's JSONRenderer, the orjson
+renderer and, if msgpack is installed, the MessagePack renderer (see
+api/renderers.py). Reports the mean encoding time, the body size and the
+gzip-compressed size as JSON.
+
+Usage:
+    python manage.py benchmark_renderers
+    python manage.py benchmark_renderers --endpoint careers --iterations 500
+"""
+import gzip
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+
+from api import renderers
+from api.management.commands.benchmark_api import ENDPOINTS
+from api.models import User
+
+
+RENDERERS = {
+    'json': JSONRenderer,
+    'orjson': renderers.ORJSONRenderer,
+    'msgpack': renderers.MessagePackRenderer,
+}
+
+
+class Command(BaseCommand):
+    help = 'Compares encoding time and size of the API renderers per endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--endpoint',
+            action='append',
+            choices=sorted(ENDPOINTS),
+            help='Endpoint to benchmark (repeatable, default: all)',
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=200,
+            help='Renders per endpoint and renderer',
+        )
+        parser.add_argument(
+            '--prefix',
+            default='cohort_',
+            help='Username prefix of the cohort to authenticate as',
+        )
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username__startswith=options['prefix']).order_by('id').first()
+        if user is None:
+            raise CommandError(
+                f'No users with prefix "{options["prefix"]}"; run generate_cohort first'
+            )
+        token = Token.objects.get_or_create(user=user)[0].key
+        client = Client(HTTP_HOST='localhost')
+
+        available = {
+            name: renderer_class for name, renderer_class in RENDERERS.items()
+            if name != 'msgpack' or renderers.msgpack is not None
+        }
+        if renderers.orjson is None:
+            self.stderr.write(self.style.WARNING('orjson is not installed; "orjson" measures the fallback'))
+        if 'msgpack' not in available:
+            self.stderr.write(self.style.WARNING('msgpack is not installed; skipping MessagePack'))
+
+        report = {'iterations': options['iterations'], 'endpoints': {}}
+        for name in options['endpoint'] or list(ENDPOINTS):
+            response = client.get(ENDPOINTS[name], HTTP_AUTHORIZATION=f'Token {token}')
+            if response.status_code != 200:
+                raise CommandError(f'{ENDPOINTS[name]} returned {response.status_code}')
+            report['endpoints'][name] = {
+                renderer_name: self.measure(renderer_class(), response.data, options['iterations'])
+                for renderer_name, renderer_class in available.items()
+            }
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def measure(self, renderer, data, iterations):
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            body = renderer.render(data)
+            timings.append(time.perf_counter() - started)
+        return {
+            'encode_ms': round(statistics.fmean(timings) * 1000, 3),
+            'bytes': len(body),
+            'gzip_bytes': len(gzip.compress(body)),
+        }
@@ -0,0 +1,24 @@
+"""
+Management command to write the content-hashed catalog bundles and their
+manifest (see api/bundles.py).
+
+import_course_data and the seed commands already do this after every
+import; run it by hand after editing catalog data in the admin.
+
+Usage:
+    python manage.py build_catalog_bundles
+"""
+from django.core.management.base import BaseCommand
+
+from api.bundles import build_catalog_bundles
+
+
+class Command(BaseCommand):
+    help = 'Write the content-hashed catalog bundles per regulation and language'
+
+    def handle(self, *args, **options):
+        manifest = build_catalog_bundles()
+        for regulation_id, languages in manifest['bundles'].items():
+            for language, entry in languages.items():
+                self.stdout.write(f'  {entry["file"]} ({entry["bytes"]} bytes)')
+        self.stdout.write(self.style.SUCCESS(f'Catalog manifest of {manifest["generated_at"]}'))
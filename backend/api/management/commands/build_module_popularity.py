@@ -0,0 +1,21 @@
+"""
+Management command to rebuild the cold-start module ranking used for
+recommendations of users without career interests.
+
+Run it periodically (e.g. nightly) so the ranking follows completion
+counts; import_course_data also rebuilds it after importing modules.
+
+Usage:
+    python manage.py build_module_popularity
+"""
+from django.core.management.base import BaseCommand
+
+from api.popularity import rebuild_module_popularity
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the popularity ranking used for cold-start recommendations'
+
+    def handle(self, *args, **options):
+        count = rebuild_module_popularity()
+        self.stdout.write(self.style.SUCCESS(f'Ranked {count} modules'))
@@ -0,0 +1,34 @@
+"""
+Management command to rebuild the "similar modules" table from the
+modules' learning content and objectives (see api/similarity.py).
+
+import_course_data already rebuilds it after importing modules.
+
+Usage:
+    python manage.py build_module_similarity
+    python manage.py build_module_similarity --top-k 20
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.similarity import DEFAULT_TOP_K, rebuild_module_similarity
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the precomputed similar-modules table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=DEFAULT_TOP_K,
+            help='Number of similar modules stored per module',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuild_module_similarity(top_k=options['top_k'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {count} module neighbours ({time.perf_counter() - started:.1f}s)'
+        ))
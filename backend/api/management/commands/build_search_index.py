@@ -0,0 +1,29 @@
+"""
+Management command to rebuild the module search index and write it to
+settings.SEARCH_INDEX_PATH (see api/search.py).
+
+import_course_data already does this after every import; run it by hand
+after editing modules in the admin. Running workers pick up the new file
+on their next search.
+
+Usage:
+    python manage.py build_search_index
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.search import build_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the module search index file'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        index = build_search_index()
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {len(index.documents)} modules into {settings.SEARCH_INDEX_PATH} '
+            f'({time.perf_counter() - started:.1f}s)'
+        ))
@@ -0,0 +1,259 @@
+"""
+Management command to generate a synthetic student cohort for load tests.
+
+Creates users with module completions, grades, career interests,
+notifications, milestone progress and progress snapshots, written with
+bulk_create in chunks. Modules, career paths and milestones must already
+exist (run import_course_data first). The same --seed always produces the
+same cohort.
+
+Usage:
+    python manage.py generate_cohort --users 50000
+    python manage.py generate_cohort --users 1000 --seed 7 --chunk-size 500
+    python manage.py generate_cohort --clear           # Remove a generated cohort
+"""
+import random
+import time
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from api.models import (
+    CareerPath, ExaminationRegulation, Module, Notification, User,
+    UserCareerInterest, UserModuleCompletion
+)
+from api.milestones import evaluate_milestones_for_users
+from api.popularity import rebuild_module_popularity
+from api.progress import refresh_progress_snapshots
+
+
+# Grade steps used at TU Darmstadt and how often they are given
+GRADES = [Decimal(g) for g in ('1.0', '1.3', '1.7', '2.0', '2.3', '2.7', '3.0', '3.3', '3.7', '4.0')]
+GRADE_WEIGHTS = [6, 9, 12, 14, 14, 13, 11, 9, 7, 5]
+
+FAIL_RATE = 0.05
+UNGRADED_RATE = 0.1
+NO_INTEREST_RATE = 0.3
+CREDITS_PER_SEMESTER = 30
+
+NOTIFICATION_TEMPLATES = [
+    ('milestone_reminder', 'medium', 'Upcoming milestone', 'You are close to your next milestone.'),
+    ('deadline_warning', 'high', 'Registration deadline', 'Exam registration closes soon.'),
+    ('recommendation', 'low', 'New recommendations', 'New modules match your career interests.'),
+    ('support_service', 'low', 'Support available', 'Study counselling offers open consultation hours.'),
+    ('system', 'medium', 'Welcome', 'Welcome to your career roadmap.'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Generates a synthetic student cohort for load tests'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=1000,
+            help='Number of users to create',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of users written per transaction',
+        )
+        parser.add_argument(
+            '--prefix',
+            default='cohort_',
+            help='Username prefix of generated users',
+        )
+        parser.add_argument(
+            '--password',
+            default='cohort-password',
+            help='Password of every generated user',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=31,
+            help='Random seed',
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Delete previously generated users with this prefix and exit',
+        )
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        existing = User.objects.filter(username__startswith=prefix)
+        if options['clear']:
+            deleted, _ = existing.delete()
+            rebuild_module_popularity()
+            self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} rows of generated users'))
+            return
+        if existing.exists():
+            raise CommandError(f'Users with prefix "{prefix}" exist already; run with --clear first')
+
+        self.load_catalog()
+        self.rng = random.Random(options['seed'])
+        # Hashing is deliberately slow; every user shares the same hash
+        self.password = make_password(options['password'])
+        self.now = timezone.now()
+
+        started = time.perf_counter()
+        totals = defaultdict(int)
+        chunk_size = options['chunk_size']
+        for start in range(0, options['users'], chunk_size):
+            count = min(chunk_size, options['users'] - start)
+            for name, written in self.create_chunk(prefix, start, count).items():
+                totals[name] += written
+            self.stdout.write(f'  {start + count}/{options["users"]} users')
+
+        # Completion counts feed the cold-start ranking
+        rebuild_module_popularity()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated cohort in {time.perf_counter() - started:.1f}s:'
+        ))
+        for name, written in totals.items():
+            self.stdout.write(f'  - {written} {name}')
+
+    def load_catalog(self):
+        """Load the catalog rows the cohort refers to."""
+        self.modules = defaultdict(list)
+        for module in Module.objects.only(
+            'id', 'examination_regulation_id', 'credits', 'category', 'group_name'
+        ).order_by('id'):
+            self.modules[module.examination_regulation_id].append(module)
+        if not self.modules:
+            raise CommandError('No modules found; run import_course_data first')
+
+        self.regulations = {
+            regulation.pk: regulation
+            for regulation in ExaminationRegulation.objects.filter(pk__in=list(self.modules))
+        }
+        self.regulation_ids = sorted(self.regulations)
+        self.career_ids = list(CareerPath.objects.filter(is_active=True).values_list('id', flat=True))
+
+    def semester_label(self, semesters_ago):
+        """Name the semester `semesters_ago` terms before the current one."""
+        today = self.now.date()
+        # Count terms as 2 * year, plus 1 for the winter term starting in October
+        if today.month >= 10:
+            term = today.year * 2 + 1
+        elif today.month >= 4:
+            term = today.year * 2
+        else:
+            term = (today.year - 1) * 2 + 1
+        year, winter = divmod(term - semesters_ago, 2)
+        return f'WS{year}' if winter else f'SS{year}'
+
+    def create_chunk(self, prefix, start, count):
+        rng = self.rng
+        users = [
+            User(
+                username=f'{prefix}{n:06d}',
+                email=f'{prefix}{n:06d}@stud.tu-darmstadt.de',
+                password=self.password,
+                semester=rng.randint(1, 10),
+                examination_regulation_id=rng.choice(self.regulation_ids),
+            )
+            for n in range(start, start + count)
+        ]
+
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            if users[0].pk is None:
+                # Backends without RETURNING support
+                users = list(User.objects.filter(
+                    username__in=[user.username for user in users]
+                ).order_by('id'))
+
+            completions, interests, notifications = [], [], []
+            for user in users:
+                completions.extend(self.completions_for(user))
+                interests.extend(self.interests_for(user))
+                notifications.extend(self.notifications_for(user))
+            UserModuleCompletion.objects.bulk_create(completions, batch_size=2000)
+
+            # Snapshots and milestones come from the same code paths the API uses
+            snapshots = refresh_progress_snapshots(users)
+            milestones = evaluate_milestones_for_users(
+                users, {snapshot.user_id: snapshot.total_credits for snapshot in snapshots}
+            )
+
+            UserCareerInterest.objects.bulk_create(interests, batch_size=2000)
+            Notification.objects.bulk_create(notifications, batch_size=2000)
+
+        return {
+            'users': len(users),
+            'module completions': len(completions),
+            'milestone progress records': len(milestones),
+            'career interests': len(interests),
+            'notifications': len(notifications),
+        }
+
+    def completions_for(self, user):
+        """Completed modules of past semesters plus the current semester's courses."""
+        rng = self.rng
+        modules = self.modules[user.examination_regulation_id]
+        pool = rng.sample(modules, len(modules))
+
+        completions = []
+        for semesters_ago in range(user.semester - 1, -1, -1):
+            current = semesters_ago == 0
+            label = self.semester_label(semesters_ago)
+            credits = 0
+            while pool and credits < CREDITS_PER_SEMESTER:
+                module = pool.pop()
+                credits += module.credits
+                completion = UserModuleCompletion(
+                    user=user, module=module, semester_taken=label
+                )
+                if current:
+                    completion.status = 'in_progress'
+                elif rng.random() < FAIL_RATE:
+                    completion.status = 'failed'
+                    completion.grade = Decimal('5.0')
+                else:
+                    completion.status = 'completed'
+                    completion.completed_at = self.now - timedelta(days=182 * semesters_ago)
+                    if rng.random() >= UNGRADED_RATE:
+                        completion.grade = rng.choices(GRADES, GRADE_WEIGHTS)[0]
+                completions.append(completion)
+        return completions
+
+    def interests_for(self, user):
+        rng = self.rng
+        if not self.career_ids or rng.random() < NO_INTEREST_RATE:
+            return []
+        careers = rng.sample(self.career_ids, min(len(self.career_ids), rng.randint(1, 3)))
+        return [
+            UserCareerInterest(
+                user=user,
+                career_path_id=career_id,
+                interest_level=rng.randint(30, 100),
+                is_primary=index == 0,
+            )
+            for index, career_id in enumerate(careers)
+        ]
+
+    def notifications_for(self, user):
+        rng = self.rng
+        notifications = []
+        for _ in range(rng.randint(0, 8)):
+            kind, priority, title, message = rng.choice(NOTIFICATION_TEMPLATES)
+            notifications.append(Notification(
+                user=user,
+                type=kind,
+                priority=priority,
+                title=title,
+                message=message,
+                read_at=self.now if rng.random() < 0.6 else None,
+            ))
+        return notifications
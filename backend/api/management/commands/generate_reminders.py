@@ -0,0 +1,61 @@
+"""
+Management command to write milestone and deadline reminders as
+notifications for all active users (see api/reminders.py).
+
+Run it once a day from cron, or keep it running with --interval.
+
+Usage:
+    python manage.py generate_reminders
+    python manage.py generate_reminders --lead-days 7 --repeat-days 3
+    python manage.py generate_reminders --interval 3600   # Keep running, hourly
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.reminders import generate_reminders
+
+
+class Command(BaseCommand):
+    help = 'Generates due milestone and deadline reminders for all users'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Number of users processed per batch',
+        )
+        parser.add_argument(
+            '--lead-days',
+            type=int,
+            default=14,
+            help='Warn about deadlines this many days ahead',
+        )
+        parser.add_argument(
+            '--repeat-days',
+            type=int,
+            default=7,
+            help='Do not repeat a read reminder within this many days',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Repeat every N seconds instead of running once',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            created = generate_reminders(
+                chunk_size=options['chunk_size'],
+                lead_days=options['lead_days'],
+                repeat_days=options['repeat_days'],
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'Created {created} reminders ({time.perf_counter() - started:.1f}s)'
+            ))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
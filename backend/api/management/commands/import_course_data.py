@@ -4,11 +4,23 @@ Management command to import course/module data and career paths from JSON files
 Usage:
     python manage.py import_course_data
     python manage.py import_course_data --clear  # Clear existing modules and career data first
+    python manage.py import_course_data --bulk   # Diff against the database and write in bulk
+
+A module record may list the codes of its prerequisite modules under
+"prerequisites"; the import then replaces that module's prerequisite edges.
+The import is rolled back if the resulting prerequisites form a cycle.
 """
 import json
 from pathlib import Path
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
+from api.bundles import build_catalog_bundles
+from api.cache import bump_catalog_version
+from api.popularity import rebuild_module_popularity
+from api.prerequisites import PrerequisiteCycleError, PrerequisiteGraph
+from api.progress import invalidate_progress_snapshots
+from api.search import build_search_index
+from api.similarity import rebuild_module_similarity
 from api.models import (
     ExaminationRegulation, Module, CareerPath, ModuleCareerRelevance
 )
@@ -23,6 +35,11 @@ class Command(BaseCommand):
             action='store_true',
             help='Clear existing modules and career data before importing',
         )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Diff modules and career relevances against the database and apply changes in bulk',
+        )
         parser.add_argument(
             '--modules-file',
             type=str,
@@ -61,7 +78,10 @@ class Command(BaseCommand):
                 career_paths = {}
 
             # Import modules
-            if modules_file.exists():
+            if modules_file.exists() and options['bulk']:
+                self.stdout.write('Importing modules (bulk)...')
+                self.import_modules_bulk(modules_file, regulation, career_paths)
+            elif modules_file.exists():
                 self.stdout.write('Importing modules...')
                 modules = self.import_modules(modules_file, regulation, career_paths)
                 self.stdout.write(self.style.SUCCESS(f'Imported {len(modules)} modules'))
@@ -69,6 +89,23 @@ class Command(BaseCommand):
                 self.stdout.write(self.style.ERROR(f'Modules file not found: {modules_file}'))
                 return
 
+            self.import_prerequisites(modules_file, regulation)
+
+            # Reject the import (and roll it back) if prerequisites form a cycle
+            try:
+                PrerequisiteGraph.build(regulation.id).check_acyclic()
+            except PrerequisiteCycleError as exc:
+                raise CommandError(f'Prerequisite cycle detected: {exc}')
+
+        # Bulk writes bypass model signals, so invalidate cached catalog data here
+        bump_catalog_version(Module, CareerPath, ModuleCareerRelevance)
+
+        index = build_search_index()
+        self.stdout.write(f'Search index: {len(index.documents)} modules')
+        self.stdout.write(f'Popularity ranking: {rebuild_module_popularity()} modules')
+        self.stdout.write(f'Similar modules: {rebuild_module_similarity()} neighbours')
+        self.stdout.write(f'Catalog bundles: {len(build_catalog_bundles()["bundles"])} regulations')
+
         # Print summary
         self.stdout.write(self.style.SUCCESS('\n=== Import Complete ==='))
         self.stdout.write(f'Modules: {Module.objects.count()}')
@@ -137,33 +174,10 @@ class Command(BaseCommand):
         relevance_count = 0
 
         for module_data in modules_data:
-            # Use German category directly or map to valid choice
-            valid_categories = [
-                'Pflichtbereich', 'Wahlpflichtbereich', 'Informatik-Wahlbereich',
-                'Studienbegleitende Leistungen', 'Studium Generale', 'Abschlussbereich'
-            ]
-            category = module_data.get('category', 'Wahlpflichtbereich')
-            if category not in valid_categories:
-                category = 'Wahlpflichtbereich'
-
             module, created = Module.objects.update_or_create(
                 examination_regulation=regulation,
                 module_code=module_data['module_code'],
-                defaults={
-                    'name': module_data.get('name_de', ''),
-                    'name_en': module_data.get('name_en', ''),
-                    'credits': module_data.get('credits', 0) or 5,
-                    'category': category,
-                    'learning_content': module_data.get('learning_content', ''),
-                    'learning_objectives': module_data.get('learning_objectives', ''),
-                    'prerequisites_text': module_data.get('prerequisites_text', ''),
-                    'exam_form': module_data.get('exam_form', ''),
-                    'workload_hours': module_data.get('workload_hours'),
-                    'self_study_hours': module_data.get('self_study_hours'),
-                    'duration_semesters': module_data.get('duration_semesters', 1),
-                    'language': module_data.get('language', 'Deutsch'),
-                    'offering_frequency': module_data.get('offering_frequency', ''),
-                }
+                defaults=self.module_defaults(module_data)
             )
             modules.append(module)
 
@@ -183,3 +197,196 @@ class Command(BaseCommand):
 
         self.stdout.write(f'  Created {relevance_count} module-career relevance mappings')
         return modules
+
+    def module_defaults(self, module_data):
+        """Map a module JSON record to Module field values."""
+        # Use German category directly or map to valid choice
+        valid_categories = [
+            'Pflichtbereich', 'Wahlpflichtbereich', 'Informatik-Wahlbereich',
+            'Studienbegleitende Leistungen', 'Studium Generale', 'Abschlussbereich'
+        ]
+        category = module_data.get('category', 'Wahlpflichtbereich')
+        if category not in valid_categories:
+            category = 'Wahlpflichtbereich'
+
+        return {
+            'name': module_data.get('name_de', ''),
+            'name_en': module_data.get('name_en', ''),
+            'credits': module_data.get('credits', 0) or 5,
+            'category': category,
+            'learning_content': module_data.get('learning_content', ''),
+            'learning_objectives': module_data.get('learning_objectives', ''),
+            'prerequisites_text': module_data.get('prerequisites_text', ''),
+            'exam_form': module_data.get('exam_form', ''),
+            'workload_hours': module_data.get('workload_hours'),
+            'self_study_hours': module_data.get('self_study_hours'),
+            'duration_semesters': module_data.get('duration_semesters', 1),
+            'language': module_data.get('language', 'Deutsch'),
+            'offering_frequency': module_data.get('offering_frequency', ''),
+        }
+
+    def import_modules_bulk(self, file_path, regulation, career_paths):
+        """
+        Import modules from JSON file with set-based writes.
+
+        Incoming records are diffed against the existing rows of the
+        regulation by module_code, and only new or changed modules and
+        career relevances are written, each with a single upsert. Career
+        relevances an incoming module no longer lists are deleted.
+        """
+        with open(file_path, 'r', encoding='utf-8') as f:
+            modules_data = json.load(f)
+
+        incoming = {
+            module_data['module_code']: (module_data, self.module_defaults(module_data))
+            for module_data in modules_data
+        }
+        module_fields = list(next(iter(incoming.values()))[1]) if incoming else []
+
+        existing = {
+            row['module_code']: row
+            for row in Module.objects.filter(
+                examination_regulation=regulation
+            ).values('module_code', *module_fields)
+        }
+
+        changed_modules = []
+        recounted_codes = []
+        inserted = updated = 0
+        for module_code, (_, defaults) in incoming.items():
+            current = existing.get(module_code)
+            if current is None:
+                inserted += 1
+            elif any(current[field] != value for field, value in defaults.items()):
+                updated += 1
+                if (current['credits'], current['category']) != (defaults['credits'], defaults['category']):
+                    recounted_codes.append(module_code)
+            else:
+                continue
+            changed_modules.append(Module(
+                examination_regulation=regulation,
+                module_code=module_code,
+                **defaults
+            ))
+
+        if changed_modules:
+            Module.objects.bulk_create(
+                changed_modules,
+                update_conflicts=True,
+                unique_fields=['examination_regulation', 'module_code'],
+                update_fields=module_fields + ['updated_at'],
+            )
+        # Bulk writes bypass the signals that keep progress snapshots current
+        if inserted:
+            invalidate_progress_snapshots(user__examination_regulation=regulation)
+        elif recounted_codes:
+            invalidate_progress_snapshots(
+                user__module_completions__module__examination_regulation=regulation,
+                user__module_completions__module__module_code__in=recounted_codes,
+            )
+        self.stdout.write(
+            f'  Modules: {inserted} inserted, {updated} updated, '
+            f'{len(incoming) - inserted - updated} unchanged'
+        )
+
+        module_ids = dict(
+            Module.objects.filter(
+                examination_regulation=regulation
+            ).values_list('module_code', 'id')
+        )
+
+        # Create career relevance mappings
+        incoming_relevances = {}
+        for module_code, (module_data, _) in incoming.items():
+            career_relevance = module_data.get('career_relevance', {})
+            for career_id, score in career_relevance.items():
+                if career_id in career_paths and score > 0:
+                    key = (module_ids[module_code], career_paths[career_id].id)
+                    incoming_relevances[key] = (score, score >= 50)
+
+        existing_relevances = {}
+        relevance_ids = {}
+        for pk, module_id, career_path_id, score, is_core in ModuleCareerRelevance.objects.filter(
+            module__examination_regulation=regulation
+        ).values_list('id', 'module_id', 'career_path_id', 'relevance_score', 'is_core'):
+            existing_relevances[(module_id, career_path_id)] = (score, is_core)
+            relevance_ids[(module_id, career_path_id)] = pk
+
+        changed_relevances = []
+        inserted = updated = 0
+        for (module_id, career_path_id), (score, is_core) in incoming_relevances.items():
+            current = existing_relevances.get((module_id, career_path_id))
+            if current is None:
+                inserted += 1
+            elif current != (score, is_core):
+                updated += 1
+            else:
+                continue
+            changed_relevances.append(ModuleCareerRelevance(
+                module_id=module_id,
+                career_path_id=career_path_id,
+                relevance_score=score,
+                is_core=is_core
+            ))
+
+        if changed_relevances:
+            ModuleCareerRelevance.objects.bulk_create(
+                changed_relevances,
+                update_conflicts=True,
+                unique_fields=['module', 'career_path'],
+                update_fields=['relevance_score', 'is_core', 'updated_at'],
+            )
+
+        # Only pairs both files cover; a missing careers file deletes nothing
+        incoming_module_ids = {module_ids[module_code] for module_code in incoming}
+        incoming_career_ids = {career_path.id for career_path in career_paths.values()}
+        stale_ids = [
+            pk for (module_id, career_path_id), pk in relevance_ids.items()
+            if module_id in incoming_module_ids and career_path_id in incoming_career_ids
+            and (module_id, career_path_id) not in incoming_relevances
+        ]
+        if stale_ids:
+            ModuleCareerRelevance.objects.filter(pk__in=stale_ids).delete()
+        deleted = len(stale_ids)
+        self.stdout.write(
+            f'  Module-career relevances: {inserted} inserted, {updated} updated, '
+            f'{deleted} deleted, {len(incoming_relevances) - inserted - updated} unchanged'
+        )
+
+    def import_prerequisites(self, file_path, regulation):
+        """Replace the prerequisite edges of every module record listing `prerequisites`."""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            modules_data = json.load(f)
+
+        listed = {
+            module_data['module_code']: module_data['prerequisites']
+            for module_data in modules_data
+            if 'prerequisites' in module_data
+        }
+        if not listed:
+            return
+
+        module_ids = dict(
+            Module.objects.filter(
+                examination_regulation=regulation
+            ).values_list('module_code', 'id')
+        )
+        Prerequisite = Module.prerequisites.through
+        edges = []
+        for module_code, prerequisite_codes in listed.items():
+            for prerequisite_code in prerequisite_codes:
+                if prerequisite_code not in module_ids:
+                    self.stdout.write(self.style.WARNING(
+                        f'  Unknown prerequisite {prerequisite_code} of {module_code}'
+                    ))
+                    continue
+                edges.append(Prerequisite(
+                    from_module_id=module_ids[module_code],
+                    to_module_id=module_ids[prerequisite_code]
+                ))
+
+        Prerequisite.objects.filter(
+            from_module_id__in=[module_ids[module_code] for module_code in listed]
+        ).delete()
+        Prerequisite.objects.bulk_create(edges)
+        self.stdout.write(f'  Prerequisites: {len(edges)} edges for {len(listed)} modules')
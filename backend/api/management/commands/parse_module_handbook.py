@@ -0,0 +1,496 @@
+"""
+Management command to extract module records from the Modulhandbuch text
+dumps in docs/course-pdfs-text into JSON for import_course_data.
+
+Each part file is streamed line by line through a small state machine
+(page furniture -> module header fields -> numbered sections). Part files
+are parsed in parallel, and a manifest of per-file content hashes lets
+reruns reuse the results of unchanged parts.
+
+Usage:
+    python manage.py parse_module_handbook
+    python manage.py parse_module_handbook --output /tmp/modules.json --workers 4
+    python manage.py parse_module_handbook --force  # Ignore the manifest
+"""
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+DOCS_DIR = Path(__file__).resolve().parent.parent.parent.parent.parent / 'docs'
+
+# Cached part results are only reused with the parser that produced them
+with open(__file__, 'rb') as _source:
+    PARSER_VERSION = hashlib.sha256(_source.read()).hexdigest()[:16]
+
+PAGE_HEADER = 'Modulhandbuch B. Sc. Informatik'
+
+# Header labels of a module description and the record keys they fill
+HEADER_FIELDS = {
+    'Modulname': 'name_de',
+    'Modul Nr.': 'module_code',
+    'Leistungspunkte': 'credits',
+    'Arbeitsaufwand': 'workload_hours',
+    'Selbststudium': 'self_study_hours',
+    'Moduldauer': 'duration_semesters',
+    'Angebotsturnus': 'offering_frequency',
+    'Sprache': 'language',
+    'Modulverantwortliche Person': 'responsible_person',
+}
+
+# Numbered sections following the header; sections without a key are skipped
+SECTIONS = [
+    ('Kurse des Moduls', 'courses'),
+    ('Lerninhalt', 'learning_content'),
+    ('Qualifikationsziele / Lernergebnisse', 'learning_objectives'),
+    ('Voraussetzung für die Teilnahme', 'prerequisites_text'),
+    ('Prüfungsform', 'exam_form'),
+    ('Voraussetzung für die Vergabe von Leistungspunkten', None),
+    ('Benotung', None),
+    ('Verwendbarkeit des Moduls', 'usable_in_programs'),
+    ('Literatur', None),
+    ('Kommentar', None),
+]
+
+# Handbook headings -> Module.category
+CATEGORY_HEADINGS = [
+    (re.compile(r'^A Pflichtbereich'), 'Pflichtbereich'),
+    (re.compile(r'^B Wahlpflichtbereich'), 'Wahlpflichtbereich'),
+    (re.compile(r'^Wahlbereich Studienbegleitende Leistungen'), 'Studienbegleitende Leistungen'),
+    (re.compile(r'^Wahlbereich '), 'Informatik-Wahlbereich'),
+    (re.compile(r'^Bachelorarbeit'), 'Abschlussbereich'),
+]
+
+# Course code, optionally followed by the start of the course name on the same line
+COURSE_CODE_RE = re.compile(r'^(\d{2}-[0-9A-Za-z]{2}-\d{4}(?:-[a-z]{1,4})?)(?: (.*))?$')
+WRAPPED_CODE_RE = re.compile(r'^\d{2}-[0-9A-Za-z]{2}-(?:\d{4}-)?$')
+COURSE_TABLE_HEADER = {'Kurs', 'Nr.', 'Kurs Nr.', 'Kursname', 'Arbeitsaufwand', '(CP)', 'Lehrform', 'SWS'}
+NUMBER_RE = re.compile(r'^\d+(?:[,.]\d+)?$')
+# "Algorithmen und Datenstrukturen 10 integrierte Veranstaltung" on one line
+INLINE_ROW_RE = re.compile(
+    r'^(.*\D) (\d+(?:[,.]\d+)?) ((?:integrierte|Vorlesung|Übung|Seminar|Praktikum|Projekt|Tutorium).*)$',
+    re.IGNORECASE
+)
+TRAILING_NUMBER_RE = re.compile(r'^(.*\D) (\d+(?:[,.]\d+)?)$')
+INT_RE = re.compile(r'\d+')
+# Some module numbers carry the handbook language ("04-10-0118/de"); the catalog has none
+LANGUAGE_SUFFIX_RE = re.compile(r'/[a-z]{2}$')
+
+
+def _normalize(line):
+    return ' '.join(line.split())
+
+
+def _label_prefixes(labels):
+    """Proper prefixes of labels, for labels wrapped over two lines ("Leistungspun" / "kte")."""
+    return {label[:i] for label in labels for i in range(4, len(label))}
+
+
+HEADER_PREFIXES = _label_prefixes(HEADER_FIELDS)
+SECTION_LABELS = {label: index for index, (label, _) in enumerate(SECTIONS, start=1)}
+
+
+def _first_int(values):
+    match = INT_RE.search(' '.join(values))
+    return int(match.group()) if match else None
+
+
+def _text(lines):
+    """Join section lines, dropping surrounding and repeated blank lines."""
+    text = []
+    for line in lines:
+        line = line.rstrip()
+        if line.strip() or (text and text[-1]):
+            text.append(line if line.strip() else '')
+    return '\n'.join(text).strip()
+
+
+def _number(text):
+    return float(text.replace(',', '.'))
+
+
+def _add_course_cell(course, token):
+    """Fill the next empty column of a course row (name, CP, teaching form, SWS)."""
+    if course['credits'] is None:
+        inline = INLINE_ROW_RE.match(token)
+        trailing = TRAILING_NUMBER_RE.match(token)
+        if inline:
+            name, credits, token = inline.groups()
+            course['name'].append(name)
+            course['credits'] = _number(credits)
+        elif trailing:
+            name, credits = trailing.groups()
+            course['name'].append(name)
+            course['credits'] = _number(credits)
+            return
+        elif NUMBER_RE.match(token):
+            course['credits'] = _number(token)
+            return
+        else:
+            course['name'].append(token)
+            return
+
+    if course['sws'] is None:
+        if NUMBER_RE.match(token):
+            course['sws'] = _number(token)
+            return
+        trailing = TRAILING_NUMBER_RE.match(token)
+        if trailing:
+            token, sws = trailing.groups()
+            course['sws'] = _number(sws)
+        course['teaching_form'].append(token)
+
+
+def parse_courses(lines):
+    """Parse the "Kurse des Moduls" table into course dicts."""
+    tokens = [_normalize(line) for line in lines]
+    tokens = [token for token in tokens if token and token not in COURSE_TABLE_HEADER]
+
+    # Re-join course codes wrapped over two lines ("20-00-" / "0004-iv", "20-00-1141-" / "tt")
+    joined = []
+    for token in tokens:
+        if joined and WRAPPED_CODE_RE.match(joined[-1]) and COURSE_CODE_RE.match(joined[-1] + token):
+            joined[-1] += token
+            continue
+        joined.append(token)
+
+    courses = []
+    for token in joined:
+        code_match = COURSE_CODE_RE.match(token)
+        if code_match:
+            code, token = code_match.groups()
+            courses.append({'course_code': code, 'name': [], 'credits': None,
+                            'teaching_form': [], 'sws': None})
+        if courses and token:
+            _add_course_cell(courses[-1], token)
+
+    for course in courses:
+        course['name'] = ' '.join(course['name'])
+        course['teaching_form'] = ' '.join(course['teaching_form'])
+    return courses
+
+
+class ModuleBuilder:
+    """Collects the lines of one module description and turns them into a record."""
+
+    def __init__(self, category):
+        self.category = category
+        self.header = {}
+        self.sections = {}
+        self.current = None
+
+    def start_header_field(self, key):
+        self.current = ('header', key)
+        self.header.setdefault(key, [])
+
+    def start_section(self, index):
+        self.current = ('section', index)
+        self.sections.setdefault(index, [])
+
+    def add(self, line):
+        if self.current is None:
+            return
+        kind, key = self.current
+        if kind == 'header':
+            if line.strip():
+                self.header[key].append(_normalize(line))
+        else:
+            self.sections[key].append(line)
+
+    @property
+    def next_section(self):
+        if self.current is None or self.current[0] == 'header':
+            return 1
+        return self.current[1] + 1
+
+    def record(self):
+        header = self.header
+        record = {
+            'module_code': LANGUAGE_SUFFIX_RE.sub('', ''.join(header.get('module_code', []))),
+            'name_de': ' '.join(header.get('name_de', [])),
+            'name_en': '',
+            'credits': _first_int(header.get('credits', [])),
+            'workload_hours': _first_int(header.get('workload_hours', [])),
+            'self_study_hours': _first_int(header.get('self_study_hours', [])),
+            'duration_semesters': _first_int(header.get('duration_semesters', [])) or 1,
+            'language': ' '.join(header.get('language', [])),
+            'offering_frequency': ' '.join(header.get('offering_frequency', [])),
+            'responsible_person': ' '.join(header.get('responsible_person', [])),
+        }
+        for index, (_, key) in enumerate(SECTIONS, start=1):
+            if key == 'courses':
+                record[key] = parse_courses(self.sections.get(index, []))
+            elif key:
+                record[key] = _text(self.sections.get(index, []))
+        record['category'] = self.category
+        return record
+
+
+def parse_part(path):
+    """
+    Stream one part file and return its modules.
+
+    Returns {'modules': [...], 'last_category': ...}. Modules that appear
+    before the first section heading of the file get category None; the
+    caller fills in the category the previous part ended with.
+    """
+    modules = []
+    category = None
+    module = None
+    in_page_header = False
+    after_page_header = False
+    divider = 0
+    pending = None
+
+    def finish():
+        if module is not None and module.header.get('module_code'):
+            modules.append(module.record())
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for raw_line in f:
+            line = raw_line.rstrip('\n')
+            text = _normalize(line)
+
+            # Page furniture: "=====", "PAGE n", running header and page number
+            if text.startswith('====='):
+                in_page_header = True
+                continue
+            if in_page_header:
+                if text == PAGE_HEADER:
+                    in_page_header = False
+                    after_page_header = True
+                continue
+            if after_page_header:
+                if not text:
+                    continue
+                after_page_header = False
+                if text.isdigit():
+                    continue
+
+            # Section divider pages: "Modulhandbuch" / "B. Sc. Informatik" / heading
+            if divider == 0 and text == 'Modulhandbuch':
+                divider = 1
+                continue
+            if divider == 1:
+                divider = 2 if text == 'B. Sc. Informatik' else 0
+                continue
+            if divider == 2:
+                if not text:
+                    continue
+                divider = 0
+                for pattern, heading_category in CATEGORY_HEADINGS:
+                    if pattern.match(text):
+                        finish()
+                        module = None
+                        category = heading_category
+                        break
+                continue
+
+            if text == 'Modulbeschreibung':
+                finish()
+                module = ModuleBuilder(category)
+                pending = None
+                continue
+            if module is None:
+                continue
+
+            # A wrapped label or a section number waits for the next line
+            if pending is not None:
+                held, pending = pending, None
+                if module.current is None or module.current[0] == 'header':
+                    label = held + text
+                    if label in HEADER_FIELDS:
+                        module.start_header_field(HEADER_FIELDS[label])
+                        continue
+                if held.isdigit() and SECTION_LABELS.get(text) == int(held):
+                    module.start_section(int(held))
+                    continue
+                module.add(held)
+
+            in_header = module.current is None or module.current[0] == 'header'
+            if in_header and text in HEADER_FIELDS and HEADER_FIELDS[text] not in module.header:
+                module.start_header_field(HEADER_FIELDS[text])
+                continue
+            if in_header and text in HEADER_PREFIXES:
+                pending = text
+                continue
+            if text == str(module.next_section):
+                pending = text
+                continue
+            number, _, label = text.partition(' ')
+            if number == str(module.next_section) and SECTION_LABELS.get(label) == int(number):
+                module.start_section(int(number))
+                continue
+            if SECTION_LABELS.get(text) == module.next_section:
+                module.start_section(module.next_section)
+                continue
+            module.add(line)
+
+    finish()
+    return {'modules': modules, 'last_category': category}
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def part_sort_key(path):
+    """Order part files numerically (part-2 before part-10)."""
+    numbers = re.findall(r'\d+', path.stem)
+    return (int(numbers[-1]) if numbers else 0, path.name)
+
+
+class Command(BaseCommand):
+    help = 'Parse the Modulhandbuch text dumps into a modules JSON file for import_course_data'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--input-dir',
+            type=str,
+            default=str(DOCS_DIR / 'course-pdfs-text'),
+            help='Directory containing the handbook part files',
+        )
+        parser.add_argument(
+            '--pattern',
+            type=str,
+            default='*MHB*-part-*.txt',
+            help='Glob pattern of the part files inside --input-dir',
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=str(DOCS_DIR / 'data-model' / 'modules_handbook.json'),
+            help='Path of the modules JSON file to write',
+        )
+        parser.add_argument(
+            '--manifest',
+            type=str,
+            default=None,
+            help='Path of the hash manifest (default: <output>.manifest.json)',
+        )
+        parser.add_argument(
+            '--relevance-from',
+            type=str,
+            default=str(DOCS_DIR / 'data-model' / 'modules_cleaned.json'),
+            help='Modules JSON to copy career_relevance and name_en from (matched by module_code)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Number of worker processes',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-parse all part files, ignoring the manifest',
+        )
+
+    def handle(self, *args, **options):
+        input_dir = Path(options['input_dir'])
+        paths = sorted(input_dir.glob(options['pattern']), key=part_sort_key)
+        if not paths:
+            raise CommandError(f'No part files matching {options["pattern"]} in {input_dir}')
+
+        output = Path(options['output'])
+        manifest_path = Path(options['manifest'] or f'{output}.manifest.json')
+        manifest = {} if options['force'] else self.load_manifest(manifest_path)
+
+        hashes = {path.name: file_hash(path) for path in paths}
+        results = {}
+        changed = []
+        for path in paths:
+            entry = manifest.get(path.name)
+            if entry and entry.get('sha256') == hashes[path.name]:
+                results[path.name] = entry['result']
+            else:
+                changed.append(path)
+
+        if changed:
+            workers = max(1, min(options['workers'], len(changed)))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for path, result in zip(changed, executor.map(parse_part, changed)):
+                    results[path.name] = result
+        self.stdout.write(
+            f'Parsed {len(changed)} part files, reused {len(paths) - len(changed)} unchanged'
+        )
+
+        modules = self.merge_parts(paths, results)
+        self.copy_relevance(modules, options['relevance_from'])
+
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(modules, f, ensure_ascii=False, indent=2)
+
+        self.save_manifest(manifest_path, {
+            'parser_version': PARSER_VERSION,
+            'files': {
+                path.name: {'sha256': hashes[path.name], 'result': results[path.name]}
+                for path in paths
+            },
+        })
+        self.stdout.write(self.style.SUCCESS(f'Wrote {len(modules)} modules to {output}'))
+
+    def load_manifest(self, path):
+        """Return the per-file entries of a manifest written by this parser version."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get('parser_version') != PARSER_VERSION:
+            return {}
+        return manifest.get('files', {})
+
+    def save_manifest(self, path, manifest):
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def merge_parts(self, paths, results):
+        """
+        Concatenate part results in order, carrying the section category
+        across part boundaries. A module listed in several sections keeps
+        its first occurrence. The part results are left untouched: they are
+        stored in the manifest, and an inherited category must be recomputed
+        when an earlier part changes.
+        """
+        modules = {}
+        category = None
+        for path in paths:
+            result = results[path.name]
+            for module in result['modules']:
+                module = dict(module)
+                if module['category'] is None:
+                    module['category'] = category or 'Wahlpflichtbereich'
+                category = module['category']
+                modules.setdefault(module['module_code'], module)
+            category = result['last_category'] or category
+        return sorted(modules.values(), key=lambda module: module['module_code'])
+
+    def copy_relevance(self, modules, path):
+        """Carry over hand-maintained career relevance and English names."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                existing = {module['module_code']: module for module in json.load(f)}
+        except (OSError, ValueError):
+            existing = {}
+
+        matched = 0
+        for module in modules:
+            previous = existing.get(module['module_code'])
+            module['career_relevance'] = previous.get('career_relevance', {}) if previous else {}
+            if previous:
+                module['name_en'] = previous.get('name_en', '')
+                matched += 1
+        if existing:
+            self.stdout.write(f'Copied career relevance for {matched} modules from {path}')
@@ -1,5 +1,7 @@
 from django.core.management.base import BaseCommand
-from api.models import CareerOffer
+from api.bundles import build_catalog_bundles
+from api.cache import bump_catalog_version
+from api.models import CareerOffer, CareerOfferField
 
 
 class Command(BaseCommand):
@@ -254,12 +256,17 @@ class Command(BaseCommand):
             },
         ]
 
-        created_count = 0
-        for offer_dict in offers_data:
-            CareerOffer.objects.create(**offer_dict)
-            created_count += 1
+        offers = CareerOffer.objects.bulk_create(
+            CareerOffer(**offer_dict) for offer_dict in offers_data
+        )
+        # bulk_create skips post_save, so fill the career field table here
+        CareerOffer.sync_career_fields(offers)
+        bump_catalog_version(CareerOffer, CareerOfferField)
+        build_catalog_bundles()
+        created_count = len(offers)
+        for offer in offers:
             self.stdout.write(
-                self.style.SUCCESS(f'[OK] Created: {offer_dict["title_de"][:50]}...')
+                self.style.SUCCESS(f'[OK] Created: {offer.title_de[:50]}...')
             )
 
         self.stdout.write(
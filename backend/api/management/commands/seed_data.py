@@ -8,6 +8,7 @@ Usage:
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import datetime, timedelta
+from api.bundles import build_catalog_bundles
 from api.models import (
     User, ExaminationRegulation, Module, MilestoneDefinition,
     MilestoneProgress, UserModuleCompletion, CareerGoal,
@@ -68,6 +69,8 @@ class Command(BaseCommand):
         self.stdout.write('Creating notifications...')
         self.create_notifications(users, milestones)
 
+        build_catalog_bundles()
+
         self.stdout.write(self.style.SUCCESS('Successfully seeded database!'))
         self.stdout.write(f'Created:')
         self.stdout.write(f'  - {ExaminationRegulation.objects.count()} examination regulations')
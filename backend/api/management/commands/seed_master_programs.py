@@ -6,6 +6,7 @@ Usage:
     python manage.py seed_master_programs
 """
 from django.core.management.base import BaseCommand
+from api.bundles import build_catalog_bundles
 from api.models import MasterProgram
 
 
@@ -119,6 +120,7 @@ class Command(BaseCommand):
                 updated_count += 1
                 self.stdout.write(f'  Updated: {obj.name}')
 
+        build_catalog_bundles()
         self.stdout.write(
             self.style.SUCCESS(
                 f'\nDone! {created_count} created, {updated_count} updated. '
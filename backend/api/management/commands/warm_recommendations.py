@@ -0,0 +1,125 @@
+"""
+Management command to precompute the cached recommendation lists of users
+with career interests, so the dashboard is served from the cache even
+right after a catalog import or at semester start.
+
+Users whose cached list still matches their inputs are skipped. Users
+without interests get the cheap fallback list on their next request.
+
+The lists only reach the web workers through a shared cache, so the
+command refuses to run with a process-local CACHE_BACKEND (locmem).
+
+Usage:
+    python manage.py warm_recommendations
+    python manage.py warm_recommendations --force          # Recompute every list
+    python manage.py warm_recommendations --interval 300   # Keep running, every 5 minutes
+"""
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+
+from api.cache import catalog_version, is_process_local
+from api.models import User, UserCareerInterest, UserModuleCompletion
+from api.recommendations import (
+    RECOMMENDATION_CACHE_SIZE, RECOMMENDATION_SOURCES, rank_modules,
+    recommendation_cache_key, recommendation_inputs_digest
+)
+
+
+class Command(BaseCommand):
+    help = 'Precompute cached recommendation lists for users with career interests'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of users loaded per batch',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Recompute lists even if their inputs did not change',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Repeat every N seconds instead of running once',
+        )
+
+    def handle(self, *args, **options):
+        # Both the lists and the catalog versions in their digests must be
+        # the ones the web workers see
+        for alias in ('default', 'catalog'):
+            if is_process_local(alias):
+                raise CommandError(
+                    f'The "{alias}" cache is local to this process, so the web workers '
+                    f'would never see the warmed lists. Set CACHE_BACKEND to file, shm '
+                    f'or a shared cache server.'
+                )
+
+        while True:
+            started = time.perf_counter()
+            computed, skipped = self.warm(options['chunk_size'], options['force'])
+            self.stdout.write(self.style.SUCCESS(
+                f'Computed {computed} recommendation lists, {skipped} unchanged '
+                f'({time.perf_counter() - started:.1f}s)'
+            ))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def warm(self, chunk_size, force):
+        version = catalog_version(*RECOMMENDATION_SOURCES)
+        users = User.objects.filter(
+            career_interests__isnull=False
+        ).distinct().order_by('id').values_list('id', 'examination_regulation_id')
+
+        computed = skipped = 0
+        last_id = 0
+        while True:
+            chunk = list(users.filter(id__gt=last_id)[:chunk_size])
+            if not chunk:
+                break
+            last_id = chunk[-1][0]
+            user_ids = [user_id for user_id, _ in chunk]
+
+            interests = defaultdict(dict)
+            for user_id, career_pk, level in UserCareerInterest.objects.filter(
+                user_id__in=user_ids
+            ).values_list('user_id', 'career_path_id', 'interest_level'):
+                interests[user_id][career_pk] = level
+
+            excluded = defaultdict(list)
+            for user_id, module_id in UserModuleCompletion.objects.filter(
+                user_id__in=user_ids, status__in=['completed', 'in_progress']
+            ).values_list('user_id', 'module_id'):
+                excluded[user_id].append(module_id)
+
+            keys = {user_id: recommendation_cache_key(user_id) for user_id in user_ids}
+            cached = cache.get_many(list(keys.values()))
+
+            entries = {}
+            for user_id, regulation_id in chunk:
+                digest = recommendation_inputs_digest(
+                    interests[user_id], excluded[user_id], regulation_id, version
+                )
+                entry = cached.get(keys[user_id])
+                if not force and entry is not None and entry['digest'] == digest:
+                    skipped += 1
+                    continue
+                entries[keys[user_id]] = {
+                    'digest': digest,
+                    'recommendations': rank_modules(
+                        user_id, interests[user_id], excluded[user_id], regulation_id,
+                        RECOMMENDATION_CACHE_SIZE
+                    ),
+                }
+            cache.set_many(entries, timeout=settings.RECOMMENDATION_CACHE_TIMEOUT)
+            computed += len(entries)
+
+        return computed, skipped
@@ -0,0 +1,247 @@
+"""
+Per-request instrumentation for the API.
+
+RequestMetricsMiddleware measures every /api/ request: number of SQL
+queries and time spent in the database (via connection.execute_wrapper),
+time spent in the renderer, and total latency. The render time covers
+only encoding response.data (e.g. JSON); serializer work such as
+serializer.data runs inside the view and is part of the total. The
+figures are
+
+- sent back in a Server-Timing header, so they show up in the browser's
+  network panel,
+- attached to the response as `response.request_metrics` (used by tests),
+- aggregated per view in METRICS and exposed in Prometheus text format at
+  /api/metrics/ (which needs settings.METRICS_TOKEN; without one it is
+  closed).
+  Requests that resolve to no view are counted as "unresolved".
+
+Views can declare query budgets per action or HTTP method:
+
+    class CareerPathViewSet(...):
+        query_budgets = {'list': 2, 'retrieve': 2}
+
+Requests exceeding their budget are logged and counted; the test suite
+asserts the budgets (see api/tests.py).
+
+Aggregates are kept per process; with several workers every process
+reports its own counters.
+"""
+import logging
+import threading
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+@dataclass
+class RequestMetrics:
+    view: str = ''
+    query_budget: int = None
+    queries: int = 0
+    db_time: float = 0.0
+    render_time: float = 0.0
+    total_time: float = 0.0
+    started: float = 0.0
+
+    @property
+    def over_budget(self):
+        return self.query_budget is not None and self.queries > self.query_budget
+
+    def server_timing(self):
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+            f'render;dur={self.render_time * 1000:.1f};desc="renderer"',
+            f'total;dur={self.total_time * 1000:.1f}',
+        ])
+
+
+class QueryCollector:
+    """execute_wrapper counting queries and the time spent executing them."""
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.metrics.queries += 1
+            self.metrics.db_time += time.perf_counter() - start
+
+
+class MetricsRegistry:
+    """Thread-safe per-view aggregates of RequestMetrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.views = {}
+
+    def record(self, metrics, method, status_code):
+        key = (metrics.view, method, str(status_code))
+        with self._lock:
+            entry = self.views.get(key)
+            if entry is None:
+                entry = self.views[key] = {
+                    'requests': 0, 'queries': 0, 'db_time': 0.0, 'render_time': 0.0,
+                    'total_time': 0.0, 'over_budget': 0,
+                    'buckets': [0] * len(LATENCY_BUCKETS),
+                }
+            entry['requests'] += 1
+            entry['queries'] += metrics.queries
+            entry['db_time'] += metrics.db_time
+            entry['render_time'] += metrics.render_time
+            entry['total_time'] += metrics.total_time
+            entry['over_budget'] += metrics.over_budget
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if metrics.total_time <= bound:
+                    entry['buckets'][i] += 1
+
+    def render_prometheus(self):
+        """Return the aggregates in the Prometheus text exposition format."""
+        with self._lock:
+            views = {key: dict(entry, buckets=list(entry['buckets'])) for key, entry in self.views.items()}
+
+        def labels(view, method, status_code, **extra):
+            pairs = {'view': view, 'method': method, 'status': status_code, **extra}
+            return ','.join(f'{name}="{value}"' for name, value in pairs.items())
+
+        lines = []
+        counters = [
+            ('api_requests_total', 'counter', 'Number of API requests', 'requests'),
+            ('api_db_queries_total', 'counter', 'SQL queries issued by API requests', 'queries'),
+            ('api_db_seconds_total', 'counter', 'Time spent executing SQL', 'db_time'),
+            ('api_render_seconds_total', 'counter', 'Time spent in the response renderer', 'render_time'),
+            ('api_query_budget_exceeded_total', 'counter', 'Requests exceeding their query budget', 'over_budget'),
+        ]
+        for name, kind, help_text, field in counters:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for (view, method, status_code), entry in sorted(views.items()):
+                lines.append(f'{name}{{{labels(view, method, status_code)}}} {entry[field]}')
+
+        name = 'api_request_duration_seconds'
+        lines.append(f'# HELP {name} Total API request latency')
+        lines.append(f'# TYPE {name} histogram')
+        for (view, method, status_code), entry in sorted(views.items()):
+            for bound, count in zip(LATENCY_BUCKETS, entry['buckets']):
+                lines.append(f'{name}_bucket{{{labels(view, method, status_code, le=bound)}}} {count}')
+            lines.append(f'{name}_bucket{{{labels(view, method, status_code, le="+Inf")}}} {entry["requests"]}')
+            lines.append(f'{name}_sum{{{labels(view, method, status_code)}}} {entry["total_time"]}')
+            lines.append(f'{name}_count{{{labels(view, method, status_code)}}} {entry["requests"]}')
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = MetricsRegistry()
+
+
+def view_label(view_func, method):
+    """
+    Name a view for metrics and budgets: "CareerPathViewSet.list",
+    "RecommendationView.get", or the function name for plain views.
+    Returns (label, query_budget).
+    """
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return view_func.__name__, None
+
+    actions = getattr(view_func, 'actions', None)
+    handler = actions.get(method, method) if actions else method
+    budget = getattr(view_class, 'query_budgets', {}).get(handler)
+    return f'{view_class.__name__}.{handler}', budget
+
+
+class RequestMetricsMiddleware:
+    """Measure queries, DB time, renderer time and latency of API requests."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not request.path.startswith('/api/'):
+            return self.get_response(request)
+
+        metrics, collector = self.start(request)
+        with ExitStack() as stack:
+            self.install_collector(stack, collector)
+            response = self.get_response(request)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        if not request.path.startswith('/api/'):
+            return await self.get_response(request)
+
+        metrics, collector = self.start(request)
+        # The async ORM runs queries in the request's thread-sensitive sync
+        # thread, whose connections are not the event loop's; install the
+        # wrappers there.
+        stack = ExitStack()
+        await sync_to_async(self.install_collector)(stack, collector)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.finish(request, response, metrics)
+
+    def start(self, request):
+        # Replaced in process_view; requests no view resolves for share one
+        # label, so arbitrary paths cannot grow the registry
+        metrics = RequestMetrics(view='unresolved')
+        metrics.started = time.perf_counter()
+        request.request_metrics = metrics
+        return metrics, QueryCollector(metrics)
+
+    @staticmethod
+    def install_collector(stack, collector):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(collector))
+
+    def finish(self, request, response, metrics):
+        metrics.total_time = time.perf_counter() - metrics.started
+        if metrics.over_budget:
+            logger.warning(
+                '%s issued %d queries (budget %d)',
+                metrics.view, metrics.queries, metrics.query_budget
+            )
+        METRICS.record(metrics, request.method, response.status_code)
+        response['Server-Timing'] = metrics.server_timing()
+        response.request_metrics = metrics
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = getattr(request, 'request_metrics', None)
+        if metrics is not None:
+            metrics.view, metrics.query_budget = view_label(view_func, request.method.lower())
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns; time that step.
+        # Serializers have already run inside the view by now.
+        metrics = getattr(request, 'request_metrics', None)
+        if metrics is not None:
+            render_start = time.perf_counter()
+
+            def rendered(response):
+                metrics.render_time = time.perf_counter() - render_start
+
+            response.add_post_render_callback(rendered)
+        return response
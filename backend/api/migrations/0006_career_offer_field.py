@@ -0,0 +1,40 @@
+# Generated by Django 5.2.9 on 2026-10-18 07:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_career_offer_fields(apps, schema_editor):
+    CareerOffer = apps.get_model('api', 'CareerOffer')
+    CareerOfferField = apps.get_model('api', 'CareerOfferField')
+    CareerOfferField.objects.bulk_create([
+        CareerOfferField(offer=offer, career_field=career_field)
+        for offer in CareerOffer.objects.all()
+        for career_field in dict.fromkeys(offer.career_fields)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_add_master_program'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CareerOfferField',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('career_field', models.CharField(choices=[('industry', 'Industry/Company'), ('research', 'Research/Academia'), ('startup', 'Startup/Entrepreneurship'), ('consulting', 'Consulting'), ('public_sector', 'Public Sector'), ('freelance', 'Freelance'), ('other', 'Other')], help_text='Career field the offer applies to', max_length=50)),
+                ('offer', models.ForeignKey(help_text='The career offer', on_delete=django.db.models.deletion.CASCADE, related_name='field_memberships', to='api.careeroffer')),
+            ],
+            options={
+                'verbose_name': 'Career Offer Field',
+                'verbose_name_plural': 'Career Offer Fields',
+                'db_table': 'career_offer_fields',
+                'indexes': [models.Index(fields=['career_field', 'offer'], name='career_offe_career__71de5b_idx')],
+                'unique_together': {('offer', 'career_field')},
+            },
+        ),
+        migrations.RunPython(populate_career_offer_fields, migrations.RunPython.noop),
+    ]
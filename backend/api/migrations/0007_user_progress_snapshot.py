@@ -0,0 +1,35 @@
+# Generated by Django 5.2.9 on 2026-10-18 07:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_career_offer_field'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserProgressSnapshot',
+            fields=[
+                ('user', models.OneToOneField(help_text='The user these statistics belong to', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='progress_snapshot', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_credits', models.IntegerField(default=0, help_text='Credit points of all completed modules')),
+                ('credits_by_category', models.JSONField(blank=True, default=dict, help_text='Completed credit points per module category')),
+                ('completed_count', models.IntegerField(default=0, help_text='Number of completed modules')),
+                ('in_progress_count', models.IntegerField(default=0, help_text='Number of modules currently in progress')),
+                ('total_module_count', models.IntegerField(default=0, help_text="Number of modules in the user's examination regulation")),
+                ('gpa', models.DecimalField(blank=True, decimal_places=2, help_text='Credit-weighted average grade of graded, completed modules', max_digits=3, null=True)),
+                ('required_credits', models.IntegerField(blank=True, help_text="Total CP required by the user's examination regulation", null=True)),
+                ('percent_complete', models.DecimalField(decimal_places=1, default=0, help_text='Completed credits as a percentage of the required credits', max_digits=5)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'User Progress Snapshot',
+                'verbose_name_plural': 'User Progress Snapshots',
+                'db_table': 'user_progress_snapshots',
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.9 on 2026-10-18 07:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_user_progress_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModulePopularity',
+            fields=[
+                ('module', models.OneToOneField(help_text='The ranked module', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='popularity', serialize=False, to='api.module')),
+                ('category', models.CharField(choices=[('Pflichtbereich', 'Pflichtbereich'), ('Wahlpflichtbereich', 'Wahlpflichtbereich'), ('Informatik-Wahlbereich', 'Informatik-Wahlbereich'), ('Studienbegleitende Leistungen', 'Studienbegleitende Leistungen'), ('Studium Generale', 'Studium Generale'), ('Abschlussbereich', 'Abschlussbereich')], help_text='Copied from the module so rankings can be read by index', max_length=50)),
+                ('completion_count', models.IntegerField(default=0, help_text='Number of users who completed or are taking the module')),
+                ('career_breadth', models.IntegerField(default=0, help_text='Number of career paths the module is relevant for')),
+                ('score', models.FloatField(default=0, help_text='Combined popularity and breadth score')),
+                ('rank', models.IntegerField(help_text='Position within the regulation and category (1 = best)')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('examination_regulation', models.ForeignKey(help_text='Copied from the module so rankings can be read by index', on_delete=django.db.models.deletion.CASCADE, related_name='module_popularity', to='api.examinationregulation')),
+            ],
+            options={
+                'verbose_name': 'Module Popularity',
+                'verbose_name_plural': 'Module Popularity',
+                'db_table': 'module_popularity',
+                'ordering': ['examination_regulation', 'category', 'rank'],
+                'indexes': [models.Index(fields=['examination_regulation', 'category', 'rank'], name='module_popu_examina_dfdc8c_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.9 on 2026-10-18 08:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_notification_feed_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModuleSimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(help_text='Cosine similarity of the TF-IDF vectors (0-1)')),
+                ('rank', models.IntegerField(help_text="Position among the module's neighbours (1 = most similar)")),
+                ('module', models.ForeignKey(help_text='The module the neighbours belong to', on_delete=django.db.models.deletion.CASCADE, related_name='similar_modules', to='api.module')),
+                ('similar_module', models.ForeignKey(help_text='A module with similar content', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.module')),
+            ],
+            options={
+                'verbose_name': 'Module Similarity',
+                'verbose_name_plural': 'Module Similarities',
+                'db_table': 'module_similarity',
+                'ordering': ['module', 'rank'],
+                'constraints': [models.UniqueConstraint(fields=('module', 'rank'), name='unique_module_similarity_rank')],
+            },
+        ),
+    ]
@@ -0,0 +1,271 @@
+"""
+Rule evaluation for milestone progress.
+
+MilestoneDefinition.rule_payload describes when a station on the roadmap is
+reached. The rules understood here depend only on a user's module
+completions:
+
+    {"cp_required": 30}       total completed CP >= 30
+    {"min_cp": 150}           same, used by thesis milestones
+    {"group": "Foundations"}  every module of that group completed
+
+evaluate_milestones() is called whenever completions change and only
+recomputes the milestones the changed modules can influence, writing the
+results back with bulk operations. evaluate_milestones_for_users() applies
+the same rules to many users at once (generate_cohort).
+"""
+from collections import defaultdict
+
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import (
+    MilestoneDefinition, MilestoneProgress, Module, UserModuleCompletion
+)
+
+
+CREDIT_RULE_KEYS = ('cp_required', 'min_cp')
+
+
+def _credit_rule(rule_payload):
+    for key in CREDIT_RULE_KEYS:
+        if rule_payload.get(key) is not None:
+            return rule_payload[key]
+    return None
+
+
+def affected_milestones(regulation_ids, modules=None):
+    """
+    Milestones whose outcome can change when `modules` change.
+
+    Every credit-based milestone is affected by any module, group-based ones
+    only by modules of their group. With modules=None all rule-based
+    milestones of the given regulations are returned.
+    """
+    rule_filter = Q()
+    for key in CREDIT_RULE_KEYS:
+        rule_filter |= Q(rule_payload__has_key=key)
+
+    if modules is None:
+        rule_filter |= Q(rule_payload__has_key='group')
+    else:
+        groups = {module.group_name for module in modules if module.group_name}
+        if groups:
+            rule_filter |= Q(rule_payload__group__in=list(groups))
+
+    queryset = MilestoneDefinition.objects.filter(rule_filter)
+    if regulation_ids is not None:
+        queryset = queryset.filter(examination_regulation_id__in=regulation_ids)
+    return list(queryset)
+
+
+def _group_progress(users, milestones):
+    """
+    Return ({(regulation_id, group): modules}, {(user_id, regulation_id, group): completed})
+    for the group milestones.
+    """
+    groups = {
+        (m.examination_regulation_id, m.rule_payload['group'])
+        for m in milestones if m.rule_payload.get('group')
+    }
+    if not groups:
+        return {}, {}
+
+    regulation_ids = {regulation_id for regulation_id, _ in groups}
+    group_names = {group for _, group in groups}
+    totals = {
+        (row['examination_regulation_id'], row['group_name']): row['total']
+        for row in Module.objects.filter(
+            examination_regulation_id__in=regulation_ids, group_name__in=group_names,
+        ).values('examination_regulation_id', 'group_name').annotate(
+            total=Count('id')
+        ).order_by()
+    }
+    completed = {
+        (row['user_id'], row['module__examination_regulation_id'], row['module__group_name']): row['completed']
+        for row in UserModuleCompletion.objects.filter(
+            user__in=[user.pk for user in users],
+            status='completed',
+            module__examination_regulation_id__in=regulation_ids,
+            module__group_name__in=group_names,
+        ).values('user_id', 'module__examination_regulation_id', 'module__group_name').annotate(
+            completed=Count('module', distinct=True)
+        ).order_by()
+    }
+    return totals, completed
+
+
+def _completed_credits(users):
+    """Return {user_id: completed CP} with one grouped query."""
+    credits = dict(
+        UserModuleCompletion.objects.filter(
+            user__in=[user.pk for user in users], status='completed'
+        ).values('user_id').annotate(
+            total=Sum('module__credits')
+        ).values_list('user_id', 'total').order_by()
+    )
+    return {user.pk: credits.get(user.pk) or 0 for user in users}
+
+
+def _needs_credits(milestones):
+    return any(_credit_rule(m.rule_payload) is not None for m in milestones)
+
+
+def _evaluate(milestone, user_id, total_credits, group_progress):
+    """Return (satisfied, has_progress, explanation) for one milestone."""
+    cp_required = _credit_rule(milestone.rule_payload)
+    if cp_required is not None:
+        return (
+            total_credits >= cp_required,
+            total_credits > 0,
+            f'{total_credits}/{cp_required} CP completed',
+        )
+
+    group = milestone.rule_payload['group']
+    totals, completed_by_user = group_progress
+    key = (milestone.examination_regulation_id, group)
+    total = totals.get(key, 0)
+    completed = completed_by_user.get((user_id, *key), 0)
+    return (
+        total > 0 and completed >= total,
+        completed > 0,
+        f'{completed}/{total} modules completed in {group}',
+    )
+
+
+def _status(user, milestone, satisfied, has_progress):
+    if satisfied:
+        return 'completed'
+    if (
+        user.semester and milestone.expected_by_semester
+        and user.semester > milestone.expected_by_semester
+    ):
+        return 'overdue'
+    if has_progress:
+        return 'in_progress'
+    return 'available'
+
+
+def _write_progress(evaluations):
+    """
+    Evaluate (user, milestones, total_credits) triples and write the
+    resulting MilestoneProgress rows with bulk operations. Returns the rows
+    that were created or changed.
+    """
+    evaluations = [evaluation for evaluation in evaluations if evaluation[1]]
+    if not evaluations:
+        return []
+
+    users = [user for user, _, _ in evaluations]
+    milestones = list({
+        milestone.pk: milestone
+        for _, user_milestones, _ in evaluations
+        for milestone in user_milestones
+    }.values())
+    group_progress = _group_progress(users, milestones)
+    existing = {
+        (progress.user_id, progress.milestone_id): progress
+        for progress in MilestoneProgress.objects.filter(
+            user__in=[user.pk for user in users], milestone__in=milestones
+        )
+    }
+
+    now = timezone.now()
+    to_create = []
+    to_update = []
+    for user, user_milestones, total_credits in evaluations:
+        for milestone in user_milestones:
+            satisfied, has_progress, explanation = _evaluate(
+                milestone, user.pk, total_credits, group_progress
+            )
+            new_status = _status(user, milestone, satisfied, has_progress)
+
+            progress = existing.get((user.pk, milestone.id))
+            if progress is None:
+                to_create.append(MilestoneProgress(
+                    user=user,
+                    milestone=milestone,
+                    status=new_status,
+                    achieved_at=now if satisfied else None,
+                    computed_explanation=explanation,
+                ))
+                continue
+
+            if progress.status == new_status and progress.computed_explanation == explanation:
+                continue
+            if satisfied and progress.status != 'completed':
+                progress.achieved_at = now
+            elif not satisfied:
+                progress.achieved_at = None
+            progress.status = new_status
+            progress.computed_explanation = explanation
+            progress.updated_at = now
+            to_update.append(progress)
+
+    if to_create:
+        MilestoneProgress.objects.bulk_create(to_create, batch_size=2000)
+    if to_update:
+        MilestoneProgress.objects.bulk_update(
+            to_update, ['status', 'achieved_at', 'computed_explanation', 'updated_at'],
+            batch_size=2000,
+        )
+    return to_create + to_update
+
+
+def evaluate_milestones(user, modules=None, total_credits=None):
+    """
+    Recompute the user's milestone progress affected by `modules`.
+
+    Pass the modules whose completion state just changed; pass None to
+    evaluate every rule-based milestone of the user's regulation. If the
+    caller already knows the user's completed credits it can pass them as
+    total_credits to save the aggregate. Returns the MilestoneProgress rows
+    that were created or changed.
+    """
+    if user.examination_regulation_id:
+        regulation_ids = [user.examination_regulation_id]
+    elif modules is not None:
+        regulation_ids = list({module.examination_regulation_id for module in modules})
+    else:
+        regulation_ids = None
+
+    milestones = affected_milestones(regulation_ids, modules)
+    if not milestones:
+        return []
+
+    if total_credits is None and _needs_credits(milestones):
+        total_credits = _completed_credits([user])[user.pk]
+    return _write_progress([(user, milestones, total_credits or 0)])
+
+
+def evaluate_milestones_for_users(users, total_credits=None):
+    """
+    Recompute every rule-based milestone of many users at once, with the
+    same rules as evaluate_milestones() and a fixed number of queries.
+
+    total_credits optionally maps user primary keys to their completed
+    credits (e.g. from refresh_progress_snapshots()). Returns the
+    MilestoneProgress rows that were created or changed.
+    """
+    users = list(users)
+    regulation_ids = {user.examination_regulation_id for user in users}
+    milestones = affected_milestones(None if None in regulation_ids else list(regulation_ids))
+    if not milestones:
+        return []
+
+    by_regulation = defaultdict(list)
+    for milestone in milestones:
+        by_regulation[milestone.examination_regulation_id].append(milestone)
+    if total_credits is None and _needs_credits(milestones):
+        total_credits = _completed_credits(users)
+    total_credits = total_credits or {}
+    return _write_progress([
+        (
+            user,
+            # Users without a regulation are checked against every milestone,
+            # like evaluate_milestones(user) does
+            by_regulation[user.examination_regulation_id] if user.examination_regulation_id else milestones,
+            total_credits.get(user.pk, 0),
+        )
+        for user in users
+    ])
@@ -48,6 +48,10 @@ class User(AbstractUser):
 
     def get_total_credits(self):
         """Calculate total earned credits from completed modules."""
+        try:
+            return self.progress_snapshot.total_credits
+        except UserProgressSnapshot.DoesNotExist:
+            pass
         return self.module_completions.filter(
             status='completed'
         ).aggregate(
@@ -423,6 +427,69 @@ class UserModuleCompletion(models.Model):
         return f"{self.user.username} - {self.module.module_code}: {self.status}"
 
 
+class UserProgressSnapshot(models.Model):
+    """
+    Denormalized completion statistics for one user.
+    Refreshed in the same transaction as every module completion change,
+    so progress figures can be read without aggregating completions.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='progress_snapshot',
+        help_text="The user these statistics belong to"
+    )
+    total_credits = models.IntegerField(
+        default=0,
+        help_text="Credit points of all completed modules"
+    )
+    credits_by_category = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Completed credit points per module category"
+    )
+    completed_count = models.IntegerField(
+        default=0,
+        help_text="Number of completed modules"
+    )
+    in_progress_count = models.IntegerField(
+        default=0,
+        help_text="Number of modules currently in progress"
+    )
+    total_module_count = models.IntegerField(
+        default=0,
+        help_text="Number of modules in the user's examination regulation"
+    )
+    gpa = models.DecimalField(
+        max_digits=3,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        help_text="Credit-weighted average grade of graded, completed modules"
+    )
+    required_credits = models.IntegerField(
+        null=True,
+        blank=True,
+        help_text="Total CP required by the user's examination regulation"
+    )
+    percent_complete = models.DecimalField(
+        max_digits=5,
+        decimal_places=1,
+        default=0,
+        help_text="Completed credits as a percentage of the required credits"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'user_progress_snapshots'
+        verbose_name = 'User Progress Snapshot'
+        verbose_name_plural = 'User Progress Snapshots'
+
+    def __str__(self):
+        return f"{self.user_id}: {self.total_credits} CP"
+
+
 class CareerGoal(models.Model):
     """
     User's career interests and goals that influence roadmap recommendations.
@@ -617,6 +684,50 @@ class CareerOffer(models.Model):
     def __str__(self):
         return f"{self.title_de} ({self.provider})"
 
+    @classmethod
+    def sync_career_fields(cls, offers):
+        """
+        Rebuild the CareerOfferField rows of the given offers from their
+        career_fields lists, using one delete and one bulk insert.
+        """
+        offers = list(offers)
+        CareerOfferField.objects.filter(offer__in=offers).delete()
+        CareerOfferField.objects.bulk_create([
+            CareerOfferField(offer=offer, career_field=career_field)
+            for offer in offers
+            for career_field in dict.fromkeys(offer.career_fields)
+        ])
+
+
+class CareerOfferField(models.Model):
+    """
+    Normalized career field membership of a CareerOffer.
+    Mirrors CareerOffer.career_fields so offers can be filtered by field in SQL.
+    """
+    offer = models.ForeignKey(
+        CareerOffer,
+        on_delete=models.CASCADE,
+        related_name='field_memberships',
+        help_text="The career offer"
+    )
+    career_field = models.CharField(
+        max_length=50,
+        choices=CareerGoal.GOAL_TYPE_CHOICES,
+        help_text="Career field the offer applies to"
+    )
+
+    class Meta:
+        db_table = 'career_offer_fields'
+        verbose_name = 'Career Offer Field'
+        verbose_name_plural = 'Career Offer Fields'
+        unique_together = ('offer', 'career_field')
+        indexes = [
+            models.Index(fields=['career_field', 'offer']),
+        ]
+
+    def __str__(self):
+        return f"{self.offer_id} -> {self.career_field}"
+
 
 class Notification(models.Model):
     """
@@ -698,6 +809,8 @@ class Notification(models.Model):
             models.Index(fields=['user', 'type']),
             models.Index(fields=['due_at']),
             models.Index(fields=['created_at']),
+            # Keyset-paginated feed (see NotificationCursorPagination)
+            models.Index(fields=['user', '-created_at', '-id']),
         ]
 
     def __str__(self):
@@ -822,6 +935,98 @@ class ModuleCareerRelevance(models.Model):
         return f"{self.module.module_code} -> {self.career_path.career_id}: {self.relevance_score}%"
 
 
+class ModulePopularity(models.Model):
+    """
+    Precomputed cold-start ranking of a module within its examination
+    regulation and category, built by the build_module_popularity command
+    from completion counts and career breadth.
+    """
+    module = models.OneToOneField(
+        Module,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='popularity',
+        help_text="The ranked module"
+    )
+    examination_regulation = models.ForeignKey(
+        ExaminationRegulation,
+        on_delete=models.CASCADE,
+        related_name='module_popularity',
+        help_text="Copied from the module so rankings can be read by index"
+    )
+    category = models.CharField(
+        max_length=50,
+        choices=Module.CATEGORY_CHOICES,
+        help_text="Copied from the module so rankings can be read by index"
+    )
+    completion_count = models.IntegerField(
+        default=0,
+        help_text="Number of users who completed or are taking the module"
+    )
+    career_breadth = models.IntegerField(
+        default=0,
+        help_text="Number of career paths the module is relevant for"
+    )
+    score = models.FloatField(
+        default=0,
+        help_text="Combined popularity and breadth score"
+    )
+    rank = models.IntegerField(
+        help_text="Position within the regulation and category (1 = best)"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'module_popularity'
+        verbose_name = 'Module Popularity'
+        verbose_name_plural = 'Module Popularity'
+        ordering = ['examination_regulation', 'category', 'rank']
+        indexes = [
+            models.Index(fields=['examination_regulation', 'category', 'rank']),
+        ]
+
+    def __str__(self):
+        return f"{self.category} #{self.rank}: {self.module_id}"
+
+
+class ModuleSimilarity(models.Model):
+    """
+    Precomputed nearest neighbours of a module by TF-IDF similarity of its
+    learning content and objectives, built by the build_module_similarity
+    command. Only the top-k modules of the same regulation are stored.
+    """
+    module = models.ForeignKey(
+        Module,
+        on_delete=models.CASCADE,
+        related_name='similar_modules',
+        help_text="The module the neighbours belong to"
+    )
+    similar_module = models.ForeignKey(
+        Module,
+        on_delete=models.CASCADE,
+        related_name='+',
+        help_text="A module with similar content"
+    )
+    score = models.FloatField(
+        help_text="Cosine similarity of the TF-IDF vectors (0-1)"
+    )
+    rank = models.IntegerField(
+        help_text="Position among the module's neighbours (1 = most similar)"
+    )
+
+    class Meta:
+        db_table = 'module_similarity'
+        verbose_name = 'Module Similarity'
+        verbose_name_plural = 'Module Similarities'
+        ordering = ['module', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['module', 'rank'], name='unique_module_similarity_rank'),
+        ]
+
+    def __str__(self):
+        return f"{self.module_id} #{self.rank}: {self.similar_module_id}"
+
+
 class MasterProgram(models.Model):
     """
     TU Darmstadt Department of Computer Science Master's programs.
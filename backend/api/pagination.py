@@ -0,0 +1,29 @@
+from rest_framework.pagination import CursorPagination
+
+
+class ModuleCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the module catalog.
+
+    Pages are addressed by an opaque cursor over the primary key, so
+    fetching a later page costs the same as fetching the first one. DRF
+    encodes the cursor position from the first ordering field only, so that
+    field must be unique; module_code repeats across regulations.
+    """
+    ordering = ('id',)
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class NotificationCursorPagination(CursorPagination):
+    """
+    Keyset pagination for a user's notification feed, newest first.
+
+    The cursor walks (created_at, id) through the (user, created_at, id)
+    index, so long-lived accounts page as cheaply as new ones.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -0,0 +1,116 @@
+"""
+Cold-start module ranking.
+
+Users without career interests get recommendations from ModulePopularity:
+every module is ranked within its examination regulation and category by
+how many students take it and how many career paths it is relevant for.
+rebuild_module_popularity() recomputes the table with two grouped queries;
+fallback_module_ids() reads the top of it through the
+(examination_regulation, category, rank) index and jitters the order with a
+per-user seed, so a user sees a stable selection while different users see
+different ones.
+"""
+import random
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .cache import bump_catalog_version
+from .models import Module, ModulePopularity, UserModuleCompletion
+
+
+# Categories suggested to users without career interests
+FALLBACK_CATEGORIES = ['Wahlpflichtbereich', 'Informatik-Wahlbereich']
+
+# Relevance a career needs to count towards a module's breadth
+BREADTH_MIN_RELEVANCE = 20
+
+POPULARITY_WEIGHT = 0.6
+BREADTH_WEIGHT = 0.4
+
+# How many positions the per-user shuffle may move a module down
+SHUFFLE_WINDOW = 10
+
+
+def rebuild_module_popularity():
+    """Recompute the ranking of every module. Returns the number of rows written."""
+    modules = list(
+        Module.objects.annotate(
+            career_breadth=Count(
+                'career_relevances',
+                filter=Q(career_relevances__relevance_score__gte=BREADTH_MIN_RELEVANCE)
+            )
+        ).values('id', 'module_code', 'examination_regulation_id', 'category', 'career_breadth')
+    )
+    completion_counts = dict(
+        UserModuleCompletion.objects.filter(
+            status__in=['completed', 'in_progress']
+        ).values('module_id').annotate(count=Count('id')).values_list('module_id', 'count').order_by()
+    )
+
+    groups = defaultdict(list)
+    for module in modules:
+        module['completion_count'] = completion_counts.get(module['id'], 0)
+        groups[(module['examination_regulation_id'], module['category'])].append(module)
+
+    rows = []
+    for (regulation_id, category), members in groups.items():
+        max_completions = max(m['completion_count'] for m in members) or 1
+        max_breadth = max(m['career_breadth'] for m in members) or 1
+        for module in members:
+            module['score'] = (
+                POPULARITY_WEIGHT * module['completion_count'] / max_completions
+                + BREADTH_WEIGHT * module['career_breadth'] / max_breadth
+            )
+        members.sort(key=lambda m: (-m['score'], m['module_code'], m['id']))
+        rows.extend(
+            ModulePopularity(
+                module_id=module['id'],
+                examination_regulation_id=regulation_id,
+                category=category,
+                completion_count=module['completion_count'],
+                career_breadth=module['career_breadth'],
+                score=module['score'],
+                rank=rank,
+            )
+            for rank, module in enumerate(members, start=1)
+        )
+
+    with transaction.atomic():
+        ModulePopularity.objects.all().delete()
+        ModulePopularity.objects.bulk_create(rows, batch_size=500)
+
+    # Bulk writes bypass model signals
+    bump_catalog_version(ModulePopularity)
+    return len(rows)
+
+
+def fallback_module_ids(user_id, excluded_ids, regulation_id, limit):
+    """
+    Pick `limit` popular modules for a user without interests.
+
+    Reads the best ranked modules of the fallback categories (interleaved
+    by rank) and shuffles them with the user id as seed. Each module moves
+    by less than SHUFFLE_WINDOW positions, so the first n picks are the
+    same whatever limit is requested.
+    """
+    rankings = ModulePopularity.objects.filter(
+        category__in=FALLBACK_CATEGORIES
+    ).exclude(module_id__in=list(excluded_ids))
+    if regulation_id:
+        rankings = rankings.filter(examination_regulation_id=regulation_id)
+
+    # Without a regulation, ranks repeat across regulations; module_id
+    # keeps the order independent of the database
+    candidates = list(
+        rankings.order_by('rank', 'category', 'module_id').values_list(
+            'module_id', flat=True
+        )[:limit + SHUFFLE_WINDOW]
+    )
+    rng = random.Random(user_id)
+    jittered = sorted(
+        (position + rng.random() * SHUFFLE_WINDOW, module_id)
+        for position, module_id in enumerate(candidates)
+    )
+    return [module_id for _, module_id in jittered[:limit]]
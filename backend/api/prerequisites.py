@@ -0,0 +1,204 @@
+"""
+In-memory prerequisite graph.
+
+Module.prerequisites forms a directed graph (module -> module it requires).
+PrerequisiteGraph loads it for one examination regulation with two flat
+queries and answers transitive questions in memory: everything that must be
+finished before a module, cycle detection for imports, and a topologically
+ordered, credit-balanced semester plan. Graphs are cached per process and
+rebuilt once the Module catalog version changes (see api/cache.py).
+"""
+import math
+import threading
+
+from .cache import catalog_version
+from .models import Module
+
+
+class PrerequisiteCycleError(ValueError):
+    """Raised when module prerequisites form a cycle."""
+
+    def __init__(self, cycle):
+        self.cycle = cycle
+        super().__init__(' -> '.join(cycle))
+
+
+class PrerequisiteGraph:
+    """Directed graph of module prerequisites for one regulation."""
+
+    def __init__(self, modules, edges, version=None):
+        self.version = version
+        self.modules = {module['id']: module for module in modules}
+        self.prerequisites = {module_id: set() for module_id in self.modules}
+        self.required_for = {module_id: set() for module_id in self.modules}
+        for module_id, prerequisite_id in edges:
+            if module_id in self.modules and prerequisite_id in self.modules:
+                self.prerequisites[module_id].add(prerequisite_id)
+                self.required_for[prerequisite_id].add(module_id)
+        self._closure = {}
+
+    @classmethod
+    def build(cls, regulation_id=None, version=None):
+        """Load modules and prerequisite edges of a regulation (None = all)."""
+        modules = Module.objects.all()
+        edges = Module.prerequisites.through.objects.all()
+        if regulation_id is not None:
+            modules = modules.filter(examination_regulation_id=regulation_id)
+            edges = edges.filter(from_module__examination_regulation_id=regulation_id)
+
+        return cls(
+            modules.order_by('module_code', 'id').values(
+                'id', 'module_code', 'name', 'credits', 'category'
+            ),
+            edges.values_list('from_module_id', 'to_module_id'),
+            version,
+        )
+
+    def _code(self, module_id):
+        return self.modules[module_id]['module_code']
+
+    def find_cycle(self):
+        """Return the module codes of one prerequisite cycle, or None."""
+        WHITE, GREY, BLACK = 0, 1, 2
+        color = dict.fromkeys(self.modules, WHITE)
+
+        for start in self.modules:
+            if color[start] != WHITE:
+                continue
+            path = [start]
+            stack = [iter(sorted(self.prerequisites[start]))]
+            color[start] = GREY
+            while stack:
+                next_id = next(stack[-1], None)
+                if next_id is None:
+                    color[path.pop()] = BLACK
+                    stack.pop()
+                elif color[next_id] == GREY:
+                    cycle = path[path.index(next_id):] + [next_id]
+                    return [self._code(module_id) for module_id in cycle]
+                elif color[next_id] == WHITE:
+                    color[next_id] = GREY
+                    path.append(next_id)
+                    stack.append(iter(sorted(self.prerequisites[next_id])))
+        return None
+
+    def check_acyclic(self):
+        """Raise PrerequisiteCycleError if the graph contains a cycle."""
+        cycle = self.find_cycle()
+        if cycle:
+            raise PrerequisiteCycleError(cycle)
+
+    def all_prerequisites(self, module_id):
+        """Every module that must be finished before module_id (memoized)."""
+        if module_id in self._closure:
+            return self._closure[module_id]
+
+        seen = set()
+        stack = list(self.prerequisites.get(module_id, ()))
+        while stack:
+            current = stack.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            if current in self._closure:
+                seen |= self._closure[current]
+            else:
+                stack.extend(self.prerequisites[current])
+        seen.discard(module_id)
+        result = frozenset(seen)
+        self._closure[module_id] = result
+        return result
+
+    def topological_order(self, module_ids):
+        """Order module_ids so every prerequisite comes before its dependents."""
+        module_ids = set(module_ids)
+        pending = {
+            module_id: len(self.prerequisites[module_id] & module_ids)
+            for module_id in module_ids
+        }
+        ready = sorted(
+            (module_id for module_id, count in pending.items() if count == 0),
+            key=self._code
+        )
+        order = []
+        while ready:
+            module_id = ready.pop(0)
+            order.append(module_id)
+            for dependent in sorted(self.required_for[module_id] & module_ids, key=self._code):
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    ready.append(dependent)
+        if len(order) != len(module_ids):
+            self.check_acyclic()
+        return order
+
+    def plan_semesters(self, target_ids, completed_ids=(), max_credits=30):
+        """
+        Spread the target modules (and their missing prerequisites) over
+        semesters.
+
+        A module is only placed after all its prerequisites are completed
+        or placed in an earlier semester. Modules on the longest remaining
+        prerequisite chain go first, and each semester is filled towards
+        an even share of the total credits, never above max_credits unless
+        a single module is larger. Returns a list of semesters, each a list
+        of module rows.
+        """
+        done = set(completed_ids)
+        remaining = set()
+        for module_id in target_ids:
+            if module_id in self.modules and module_id not in done:
+                remaining.add(module_id)
+                remaining |= self.all_prerequisites(module_id) - done
+        if not remaining:
+            return []
+
+        order = self.topological_order(remaining)
+
+        # Length of the longest chain of remaining modules depending on each one
+        depth = {}
+        for module_id in reversed(order):
+            dependents = self.required_for[module_id] & remaining
+            depth[module_id] = 1 + max((depth[d] for d in dependents), default=0)
+
+        total_credits = sum(self.modules[m]['credits'] for m in remaining)
+        semester_count = max(math.ceil(total_credits / max_credits), max(depth.values()))
+        target_credits = min(max_credits, math.ceil(total_credits / semester_count))
+
+        semesters = []
+        while remaining:
+            available = sorted(
+                (m for m in remaining if not (self.prerequisites[m] & remaining)),
+                key=lambda m: (-depth[m], -self.modules[m]['credits'], self._code(m))
+            )
+            semester, credits = [], 0
+            for module_id in available:
+                module_credits = self.modules[module_id]['credits']
+                if semester and credits + module_credits > target_credits:
+                    # Critical-path modules may stretch a semester up to max_credits
+                    if depth[module_id] < depth[available[0]] or credits + module_credits > max_credits:
+                        continue
+                semester.append(module_id)
+                credits += module_credits
+            remaining -= set(semester)
+            semesters.append([self.modules[module_id] for module_id in semester])
+        return semesters
+
+
+_graphs = {}
+_graphs_lock = threading.Lock()
+
+
+def get_prerequisite_graph(regulation_id=None):
+    """Return the cached prerequisite graph of a regulation (None = all)."""
+    version = catalog_version(Module)
+    graph = _graphs.get(regulation_id)
+    if graph is not None and graph.version == version:
+        return graph
+
+    with _graphs_lock:
+        graph = _graphs.get(regulation_id)
+        if graph is None or graph.version != version:
+            graph = PrerequisiteGraph.build(regulation_id, version)
+            _graphs[regulation_id] = graph
+        return graph
@@ -0,0 +1,181 @@
+"""
+Per-user progress bookkeeping.
+
+refresh_progress_snapshot() recomputes a user's UserProgressSnapshot from
+their module completions with a single grouped query, and
+refresh_progress_snapshots() does the same for many users at once. Views
+that change completions call on_completions_changed(), which refreshes the
+snapshot and re-evaluates the affected milestones inside the caller's
+transaction; they wrap the write in refreshing_progress() so the
+completion signals do not delete the snapshot they are about to upsert.
+Writes outside the API (admin, imports changing module credits, a user's
+regulation or its required credits) only invalidate the snapshots via
+invalidate_progress_snapshots() (see api/signals.py);
+get_progress_snapshot() recomputes them on next access.
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum
+
+from .events import notify_users
+from .milestones import evaluate_milestones
+from .models import (
+    ExaminationRegulation, Module, UserModuleCompletion, UserProgressSnapshot
+)
+
+
+# Users whose snapshot the running code path refreshes itself
+_refreshing_users = ContextVar('refreshing_users', default=frozenset())
+
+SNAPSHOT_FIELDS = [
+    'total_credits', 'credits_by_category', 'completed_count', 'in_progress_count',
+    'total_module_count', 'gpa', 'required_credits', 'percent_complete',
+]
+
+
+def refresh_progress_snapshot(user):
+    """Recompute and store the user's completion statistics."""
+    return refresh_progress_snapshots([user])[0]
+
+
+def refresh_progress_snapshots(users):
+    """
+    Recompute and store the completion statistics of many users with one
+    grouped query and one upsert. Returns the snapshots in user order.
+    """
+    users = list(users)
+    graded = Q(status='completed', grade__isnull=False)
+    rows = UserModuleCompletion.objects.filter(
+        user__in=[user.pk for user in users]
+    ).values('user_id', 'status', 'module__category').annotate(
+        modules=Count('id'),
+        credits=Sum('module__credits'),
+        graded_credits=Sum('module__credits', filter=graded),
+        weighted_grades=Sum(
+            ExpressionWrapper(
+                F('grade') * F('module__credits'),
+                output_field=DecimalField(max_digits=8, decimal_places=1)
+            ),
+            filter=graded
+        ),
+    ).order_by()
+    rows_by_user = defaultdict(list)
+    for row in rows:
+        rows_by_user[row['user_id']].append(row)
+
+    regulation_ids = {user.examination_regulation_id for user in users} - {None}
+    required_by_regulation = dict(
+        ExaminationRegulation.objects.filter(
+            pk__in=regulation_ids
+        ).values_list('pk', 'total_credits_required')
+    ) if regulation_ids else {}
+    module_counts = dict(
+        Module.objects.filter(
+            examination_regulation_id__in=regulation_ids
+        ).values('examination_regulation_id').annotate(
+            count=Count('id')
+        ).values_list('examination_regulation_id', 'count').order_by()
+    ) if regulation_ids else {}
+
+    snapshots = []
+    for user in users:
+        credits_by_category = {}
+        completed_count = in_progress_count = 0
+        graded_credits = 0
+        weighted_grades = Decimal(0)
+        for row in rows_by_user[user.pk]:
+            if row['status'] == 'completed':
+                category = row['module__category']
+                credits_by_category[category] = credits_by_category.get(category, 0) + (row['credits'] or 0)
+                completed_count += row['modules']
+                graded_credits += row['graded_credits'] or 0
+                weighted_grades += Decimal(row['weighted_grades'] or 0)
+            elif row['status'] == 'in_progress':
+                in_progress_count += row['modules']
+
+        total_credits = sum(credits_by_category.values())
+        gpa = None
+        if graded_credits:
+            gpa = (weighted_grades / graded_credits).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+        required_credits = required_by_regulation.get(user.examination_regulation_id)
+        percent_complete = Decimal(0)
+        if required_credits:
+            percent_complete = min(
+                Decimal(total_credits * 100) / required_credits, Decimal(100)
+            ).quantize(Decimal('0.1'), rounding=ROUND_HALF_UP)
+
+        snapshots.append(UserProgressSnapshot(
+            user=user,
+            total_credits=total_credits,
+            credits_by_category=credits_by_category,
+            completed_count=completed_count,
+            in_progress_count=in_progress_count,
+            total_module_count=module_counts.get(user.examination_regulation_id, 0),
+            gpa=gpa,
+            required_credits=required_credits,
+            percent_complete=percent_complete,
+        ))
+
+    UserProgressSnapshot.objects.bulk_create(
+        snapshots,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=SNAPSHOT_FIELDS + ['updated_at'],
+    )
+    return snapshots
+
+
+def get_progress_snapshot(user):
+    """Return the user's snapshot, computing it on first access."""
+    try:
+        return UserProgressSnapshot.objects.get(user=user)
+    except UserProgressSnapshot.DoesNotExist:
+        return refresh_progress_snapshot(user)
+
+
+def invalidate_progress_snapshots(**filters):
+    """
+    Delete the snapshots matching `filters` (UserProgressSnapshot lookups,
+    e.g. user_id=...), so they are recomputed on next access.
+    """
+    UserProgressSnapshot.objects.filter(**filters).delete()
+
+
+@contextmanager
+def refreshing_progress(user):
+    """
+    Mark completion writes in this block as handled by the caller, who calls
+    on_completions_changed() before leaving it; the completion signals then
+    leave the user's snapshot alone instead of deleting it.
+    """
+    token = _refreshing_users.set(_refreshing_users.get() | {user.pk})
+    try:
+        yield
+    finally:
+        _refreshing_users.reset(token)
+
+
+def is_refreshing_progress(user_id):
+    """Whether the running code path refreshes this user's snapshot itself."""
+    return user_id in _refreshing_users.get()
+
+
+def on_completions_changed(user, modules=None):
+    """
+    Update everything derived from a user's module completions.
+
+    `modules` are the modules whose completion state changed (None means
+    "anything may have changed"). Returns the refreshed snapshot.
+    """
+    with transaction.atomic():
+        snapshot = refresh_progress_snapshot(user)
+        if evaluate_milestones(user, modules, total_credits=snapshot.total_credits):
+            # Written with bulk operations, which send no post_save
+            notify_users([user.pk])
+    return snapshot
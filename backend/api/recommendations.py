@@ -0,0 +1,359 @@
+"""
+In-memory relevance matrix used by the recommendation endpoint.
+
+ModuleCareerRelevance is loaded once per process into a sparse module x
+career matrix, partitioned by examination regulation. For every career,
+each regulation also keeps its relevant modules sorted by score. Ranking
+a user's interests walks the heads of those lists for the user's careers
+in their regulation only, and stops as soon as the top k is settled;
+usually only a small prefix of each list is visited and the database is
+not touched. The matrix remembers the catalog version it was built from
+(see api/cache.py) and is rebuilt on next use once modules, career paths
+or relevance rows change, in this or any other process.
+
+Each user's ranked list is cached as well, together with a digest of its
+inputs: their interests, their completed/in-progress modules and the
+catalog version. A request whose inputs still match is served from the
+cache without scoring or touching Module; anything else is recomputed on
+the spot. warm_recommendations precomputes the lists ahead of time.
+"""
+import hashlib
+import heapq
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import catalog_version
+from .models import Module, CareerPath, ModuleCareerRelevance, ModulePopularity
+from .popularity import fallback_module_ids
+
+
+OBJECTIVES_PREVIEW_LENGTH = 300
+
+# Number of ranked modules kept per user; larger limits bypass the cache
+RECOMMENDATION_CACHE_SIZE = 50
+RECOMMENDATION_KEY_PREFIX = 'recommendations:'
+
+
+def _preview(text, length=OBJECTIVES_PREVIEW_LENGTH):
+    """Shorten long text the same way the recommendation payload always did."""
+    return text[:length] + '...' if len(text) > length else text
+
+
+class _RegulationRelevance:
+    """The relevance rows of the modules of one examination regulation."""
+
+    def __init__(self, modules):
+        self.modules = modules
+        # Sparse view of each row: {career column: score}
+        self.rows = [{} for _ in modules]
+        # Per career column, the (score, row) pairs with a positive score,
+        # best first
+        self.postings = defaultdict(list)
+
+    def add(self, i, j, score):
+        self.rows[i][j] = score
+        if score > 0:
+            self.postings[j].append((score, i))
+
+    def finish(self):
+        for posting in self.postings.values():
+            # Equal scores keep module order, which breaks ties in the ranking
+            posting.sort(key=lambda entry: (-entry[0], entry[1]))
+
+    def row_score(self, i, weights):
+        row = self.rows[i]
+        return sum(row.get(j, 0) * weight for j, weight in weights)
+
+    def top_rows(self, weights, limit, excluded):
+        """
+        Return up to `limit` (score, row) pairs with the highest weighted
+        score, best first.
+
+        Walks the sorted posting lists of the weighted careers in step
+        (Fagin's threshold algorithm): every row met is scored in full, and
+        the walk stops once the `limit`-th best score beats the best score
+        any row not yet met could still reach.
+        """
+        postings = [(self.postings.get(j, ()), weight) for j, weight in weights]
+        seen = set()
+        best = []  # min-heap of (score, -row)
+        depth = 0
+        while True:
+            threshold = 0
+            exhausted = True
+            for posting, weight in postings:
+                if depth >= len(posting):
+                    continue
+                exhausted = False
+                score, i = posting[depth]
+                threshold += score * weight
+                if i in seen:
+                    continue
+                seen.add(i)
+                if self.modules[i]['id'] in excluded:
+                    continue
+                entry = (self.row_score(i, weights), -i)
+                if len(best) < limit:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+            if exhausted or (len(best) == limit and best[0][0] > threshold):
+                break
+            depth += 1
+        return [(score, -negative_i) for score, negative_i in sorted(best, reverse=True)]
+
+
+class RelevanceMatrix:
+    """
+    Module x career relevance scores, partitioned by examination regulation.
+
+    Each regulation keeps a sparse row per module (ordered by module_code)
+    and, per career path, the modules relevant to it sorted by score. A
+    ranking only walks the heads of the lists of the user's careers within
+    their own regulation (see _RegulationRelevance.top_rows).
+    """
+
+    def __init__(self, modules, careers, relevances, version=None):
+        self.version = version
+        self.careers = careers
+        self.career_index = {career['id']: j for j, career in enumerate(careers)}
+
+        modules_by_regulation = defaultdict(list)
+        for module in modules:
+            modules_by_regulation[module['examination_regulation_id']].append(module)
+        self.regulations = {
+            regulation_id: _RegulationRelevance(regulation_modules)
+            for regulation_id, regulation_modules in modules_by_regulation.items()
+        }
+        module_rows = {
+            module['id']: (partition, i)
+            for partition in self.regulations.values()
+            for i, module in enumerate(partition.modules)
+        }
+
+        for module_id, career_pk, score in relevances:
+            row = module_rows.get(module_id)
+            j = self.career_index.get(career_pk)
+            if row is None or j is None:
+                continue
+            partition, i = row
+            partition.add(i, j, score)
+
+        for partition in self.regulations.values():
+            partition.finish()
+
+    @classmethod
+    def build(cls, version=None):
+        """Load the whole relevance table with three flat queries."""
+        modules = [
+            {
+                'id': module['id'],
+                'examination_regulation_id': module['examination_regulation_id'],
+                'module_code': module['module_code'],
+                'name': module['name'],
+                'name_en': module['name_en'],
+                'credits': module['credits'],
+                'category': module['category'],
+                'language': module['language'],
+                'learning_objectives': _preview(module['learning_objectives']),
+            }
+            for module in Module.objects.order_by('module_code', 'id').values(
+                'id', 'examination_regulation_id', 'module_code', 'name', 'name_en',
+                'credits', 'category', 'language', 'learning_objectives',
+            )
+        ]
+        careers = list(
+            CareerPath.objects.order_by('id').values('id', 'career_id', 'title_en')
+        )
+        relevances = ModuleCareerRelevance.objects.values_list(
+            'module_id', 'career_path_id', 'relevance_score'
+        )
+        return cls(modules, careers, relevances, version)
+
+    def _weights(self, interest_weights):
+        """(career column, weight) pairs of the user's known, non-zero interests."""
+        return [
+            (self.career_index[career_pk], level / 100)
+            for career_pk, level in interest_weights.items()
+            if level and career_pk in self.career_index
+        ]
+
+    def top_modules(self, interest_weights, limit, exclude_ids=(), regulation_id=None):
+        """
+        Return the `limit` best modules for the given interests.
+
+        interest_weights maps CareerPath primary keys to interest levels
+        (0-100); a module scores the sum of its relevance to each career
+        times that level / 100. Only modules of `regulation_id` (all
+        regulations if None) with a positive score are returned.
+
+        Each entry is a (module, score, matching_careers) tuple, where module
+        is the cached module row and matching_careers lists the user's
+        careers this module is relevant for, highest relevance first.
+        """
+        weights = self._weights(interest_weights)
+        if not weights or limit <= 0:
+            return []
+        excluded = set(exclude_ids)
+        if regulation_id is None:
+            partitions = list(self.regulations.values())
+        else:
+            partitions = [self.regulations[regulation_id]] if regulation_id in self.regulations else []
+
+        # Each partition yields its own best rows; across regulations, equal
+        # scores keep module_code order like within one
+        ranked = sorted(
+            (
+                (score, partition, i)
+                for partition in partitions
+                for score, i in partition.top_rows(weights, limit, excluded)
+            ),
+            key=lambda entry: (
+                -entry[0], entry[1].modules[entry[2]]['module_code'], entry[1].modules[entry[2]]['id']
+            ),
+        )[:limit]
+
+        interest_columns = {j for j, _ in weights}
+        results = []
+        for score, partition, i in ranked:
+            matching_careers = [
+                {
+                    'career_id': self.careers[j]['career_id'],
+                    'career_title': self.careers[j]['title_en'],
+                    'relevance_score': relevance,
+                }
+                for j, relevance in sorted(
+                    partition.rows[i].items(), key=lambda entry: (-entry[1], entry[0])
+                )
+                if j in interest_columns
+            ]
+            results.append((partition.modules[i], score, matching_careers))
+        return results
+
+
+# Tables the matrix is built from; their catalog versions decide when it is stale
+MATRIX_SOURCES = (Module, CareerPath, ModuleCareerRelevance)
+# Tables any ranked list (including the cold-start fallback) depends on
+RECOMMENDATION_SOURCES = MATRIX_SOURCES + (ModulePopularity,)
+
+_matrix = None
+_matrix_lock = threading.Lock()
+
+
+def get_relevance_matrix():
+    """Return the process-wide relevance matrix, rebuilding it if stale."""
+    global _matrix
+    version = catalog_version(*MATRIX_SOURCES)
+    matrix = _matrix
+    if matrix is not None and matrix.version == version:
+        return matrix
+
+    with _matrix_lock:
+        if _matrix is None or _matrix.version != version:
+            # A change during the build bumps the version again, so the
+            # next request rebuilds instead of keeping a stale matrix.
+            _matrix = RelevanceMatrix.build(version)
+        return _matrix
+
+
+def _recommendation(module, score, matching_careers, reason):
+    return {
+        'id': module['id'],
+        'module_code': module['module_code'],
+        'name': module['name'],
+        'name_en': module['name_en'],
+        'credits': module['credits'],
+        'category': module['category'],
+        'language': module['language'],
+        'relevance_score': round(score),
+        'matching_careers': matching_careers,
+        'recommendation_reason': reason,
+        'learning_objectives': module['learning_objectives'],
+    }
+
+
+def rank_modules(user_id, interest_weights, excluded_ids, regulation_id, limit):
+    """Score modules for a user's interests; falls back to popular picks without interests."""
+    if not interest_weights:
+        return fallback_recommendations(user_id, excluded_ids, regulation_id, limit)
+
+    ranked_modules = get_relevance_matrix().top_modules(
+        interest_weights,
+        limit=limit,
+        exclude_ids=excluded_ids,
+        regulation_id=regulation_id,
+    )
+    return [
+        _recommendation(
+            module, score, matching_careers,
+            f"Relevant for: {', '.join(c['career_title'] for c in matching_careers[:3])}"
+        )
+        for module, score, matching_careers in ranked_modules
+    ]
+
+
+def fallback_recommendations(user_id, excluded_ids, regulation_id, limit):
+    """Popular modules for users without career interests (see api/popularity.py)."""
+    module_ids = fallback_module_ids(user_id, excluded_ids, regulation_id, limit)
+    modules = Module.objects.in_bulk(module_ids)
+    return [
+        _recommendation(
+            {
+                'id': module.id,
+                'module_code': module.module_code,
+                'name': module.name,
+                'name_en': module.name_en,
+                'credits': module.credits,
+                'category': module.category,
+                'language': module.language,
+                'learning_objectives': _preview(module.learning_objectives),
+            },
+            0, [], 'Set your career interests for personalized recommendations'
+        )
+        for module in (modules[module_id] for module_id in module_ids if module_id in modules)
+    ]
+
+
+def recommendation_inputs_digest(interest_weights, excluded_ids, regulation_id, version=None):
+    """Digest of everything a user's ranked list depends on."""
+    if version is None:
+        version = catalog_version(*RECOMMENDATION_SOURCES)
+    interests = ','.join(f'{pk}:{level}' for pk, level in sorted(interest_weights.items()))
+    completions = ','.join(str(pk) for pk in sorted(set(excluded_ids)))
+    return hashlib.sha1(
+        f'{regulation_id}|{interests}|{completions}|{version}'.encode()
+    ).hexdigest()
+
+
+def recommendation_cache_key(user_id):
+    return f'{RECOMMENDATION_KEY_PREFIX}{user_id}'
+
+
+def get_recommendations(user, interest_weights, excluded_ids, limit):
+    """
+    Return the user's top `limit` recommendations, from the cache when the
+    cached list was computed from the same inputs.
+    """
+    regulation_id = user.examination_regulation_id
+    if limit > RECOMMENDATION_CACHE_SIZE:
+        return rank_modules(user.pk, interest_weights, excluded_ids, regulation_id, limit)
+
+    digest = recommendation_inputs_digest(interest_weights, excluded_ids, regulation_id)
+    key = recommendation_cache_key(user.pk)
+    cached = cache.get(key)
+    if cached is not None and cached['digest'] == digest:
+        return cached['recommendations'][:limit]
+
+    recommendations = rank_modules(
+        user.pk, interest_weights, excluded_ids, regulation_id, RECOMMENDATION_CACHE_SIZE
+    )
+    # One entry per user, replaced whenever the inputs change
+    cache.set(
+        key,
+        {'digest': digest, 'recommendations': recommendations},
+        timeout=settings.RECOMMENDATION_CACHE_TIMEOUT
+    )
+    return recommendations[:limit]
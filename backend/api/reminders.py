@@ -0,0 +1,144 @@
+"""
+Milestone and deadline reminders.
+
+generate_reminders() scans the milestone definitions against every active
+user's semester and MilestoneProgress and writes the due reminders as
+Notification rows:
+
+    milestone_reminder  a milestone expected by the user's current semester
+                        (or an earlier one) is not completed yet
+    deadline_warning    a milestone's expected_by_date falls within the
+                        next `lead_days` days and is not completed yet
+
+A milestone with both expected_by_semester and expected_by_date can get
+both reminders; each type is deduplicated on its own.
+
+Users are processed in id-ordered chunks with a fixed number of queries
+per chunk (completed milestones, recent reminders, one bulk insert), so
+the cost grows with the number of chunks, not users. A reminder is
+skipped while the user still has an unread one for the same milestone, or
+got one within the last `repeat_days` days.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import MilestoneDefinition, MilestoneProgress, Notification, User
+
+
+REMINDER_TYPES = ['milestone_reminder', 'deadline_warning']
+
+
+def _reminder_milestones(today, lead_days):
+    """Return ({regulation_id: [semester milestones]}, {regulation_id: [dated milestones]})."""
+    by_semester, by_date = {}, {}
+    for milestone in MilestoneDefinition.objects.filter(
+        Q(expected_by_semester__isnull=False)
+        | Q(expected_by_date__range=(today, today + timedelta(days=lead_days)))
+    ).order_by('examination_regulation_id', 'order_index'):
+        regulation_id = milestone.examination_regulation_id
+        if milestone.expected_by_date and today <= milestone.expected_by_date <= today + timedelta(days=lead_days):
+            by_date.setdefault(regulation_id, []).append(milestone)
+        if milestone.expected_by_semester:
+            by_semester.setdefault(regulation_id, []).append(milestone)
+    return by_semester, by_date
+
+
+def _semester_reminder(user_id, semester, milestone):
+    overdue = semester > milestone.expected_by_semester
+    if overdue:
+        title = f'Overdue: {milestone.label}'
+        message = (
+            f'"{milestone.label}" was expected by semester {milestone.expected_by_semester}. '
+            f'Check your roadmap to catch up.'
+        )
+    else:
+        title = f'Due this semester: {milestone.label}'
+        message = f'"{milestone.label}" is expected by the end of this semester.'
+    return Notification(
+        user_id=user_id,
+        type='milestone_reminder',
+        priority='high' if overdue else 'medium',
+        title=title[:200],
+        message=message,
+        related_milestone=milestone,
+        action_url='/roadmap',
+    )
+
+
+def _deadline_reminder(user_id, milestone, today):
+    days_left = (milestone.expected_by_date - today).days
+    due_at = timezone.make_aware(datetime.combine(milestone.expected_by_date, time(23, 59)))
+    when = 'today' if days_left == 0 else f'in {days_left} day{"s" if days_left != 1 else ""}'
+    return Notification(
+        user_id=user_id,
+        type='deadline_warning',
+        priority='urgent' if days_left <= 1 else 'high',
+        title=f'Deadline {when}: {milestone.label}'[:200],
+        message=f'"{milestone.label}" is due on {milestone.expected_by_date:%d.%m.%Y}.',
+        due_at=due_at,
+        related_milestone=milestone,
+        action_url='/roadmap',
+    )
+
+
+def generate_reminders(chunk_size=2000, lead_days=14, repeat_days=7, today=None):
+    """Write due reminders for all active users. Returns the number created."""
+    now = timezone.now()
+    today = today or timezone.localdate(now)
+    by_semester, by_date = _reminder_milestones(today, lead_days)
+    if not by_semester and not by_date:
+        return 0
+    milestone_ids = [
+        milestone.pk
+        for milestones in (*by_semester.values(), *by_date.values())
+        for milestone in milestones
+    ]
+    repeat_cutoff = now - timedelta(days=repeat_days)
+
+    users = User.objects.filter(
+        is_active=True,
+        examination_regulation_id__in=list(by_semester.keys() | by_date.keys()),
+    ).order_by('id').values_list('id', 'examination_regulation_id', 'semester')
+
+    created = 0
+    last_id = 0
+    while True:
+        chunk = list(users.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            break
+        last_id = chunk[-1][0]
+        user_ids = [user_id for user_id, _, _ in chunk]
+
+        completed = set(MilestoneProgress.objects.filter(
+            user_id__in=user_ids, milestone_id__in=milestone_ids, status='completed'
+        ).values_list('user_id', 'milestone_id'))
+        already_reminded = set(Notification.objects.filter(
+            Q(read_at__isnull=True) | Q(created_at__gte=repeat_cutoff),
+            user_id__in=user_ids,
+            type__in=REMINDER_TYPES,
+            related_milestone_id__in=milestone_ids,
+        ).values_list('user_id', 'type', 'related_milestone_id'))
+
+        reminders = []
+        for user_id, regulation_id, semester in chunk:
+            if semester:
+                for milestone in by_semester.get(regulation_id, ()):
+                    if (
+                        semester >= milestone.expected_by_semester
+                        and (user_id, milestone.pk) not in completed
+                        and (user_id, 'milestone_reminder', milestone.pk) not in already_reminded
+                    ):
+                        reminders.append(_semester_reminder(user_id, semester, milestone))
+            for milestone in by_date.get(regulation_id, ()):
+                if (
+                    (user_id, milestone.pk) not in completed
+                    and (user_id, 'deadline_warning', milestone.pk) not in already_reminded
+                ):
+                    reminders.append(_deadline_reminder(user_id, milestone, today))
+
+        Notification.objects.bulk_create(reminders, batch_size=1000)
+        created += len(reminders)
+
+    return created
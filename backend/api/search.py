@@ -0,0 +1,318 @@
+"""
+Full-text module search backed by a prebuilt inverted index.
+
+The index covers name, name_en, learning_content, learning_objectives and
+description of every module. Text is folded to lowercase ASCII (umlauts,
+accents, ß), long German compounds are additionally indexed under their
+parts (e.g. "softwaretechnik" -> "software", "technik"), and documents are
+ranked with BM25 over field-weighted term frequencies. The last query term
+is also matched as a prefix so the endpoint can serve type-ahead.
+
+The ae/oe/ue spellings of ä/ö/ü ("Uebersetzer") are not folded, because
+most such letter pairs are no umlaut ("Feuer", "true"). A word containing
+one is additionally matched as its umlaut form only if that form occurs in
+the catalog, in the index and in queries alike.
+
+import_course_data builds the index and writes it to
+settings.SEARCH_INDEX_PATH; run build_search_index after editing modules
+in the admin. Workers only load that file, and reload it when it is
+replaced; requests never rebuild the index.
+"""
+import bisect
+import json
+import logging
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+from django.conf import settings
+
+from .models import Module
+
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT = 2
+
+# Field weights for the term frequencies (BM25F-style)
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'name_en': 3.0,
+    'description': 1.5,
+    'learning_content': 1.0,
+    'learning_objectives': 1.0,
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+MIN_COMPOUND_LENGTH = 10
+MIN_COMPOUND_PART = 4
+MAX_PREFIX_EXPANSIONS = 50
+PREFIX_WEIGHT = 0.7
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+# ae/oe/ue may be alternative spellings of ä/ö/ü (but not in "que")
+GERMAN_DIGRAPH_RE = re.compile(r'(?<!q)([aou])e')
+
+
+def fold(text):
+    """
+    Lowercase and fold to ASCII so that "Übersetzer" and "Ubersetzer" both
+    become "ubersetzer".
+    """
+    text = unicodedata.normalize('NFKD', text.lower().replace('ß', 'ss'))
+    return ''.join(char for char in text if not unicodedata.combining(char))
+
+
+def umlaut_variant(token, vocabulary):
+    """
+    Return the token with ae/oe/ue read as umlauts ("uebersetzer" ->
+    "ubersetzer") if that form is in the vocabulary, else None.
+    """
+    variant = GERMAN_DIGRAPH_RE.sub(r'\1', token)
+    if variant != token and variant in vocabulary:
+        return variant
+    return None
+
+
+STOPWORDS = frozenset(fold(word) for word in '''
+    aber als am an auch auf aus bei bis das dass dem den der des die durch ein eine
+    einem einen einer eines es für im in ist mit nach nicht oder sich sie sind so
+    sowie über um und von vor werden wie wird zu zum zur
+    a an and are as at be by for from in into is it of on or that the their this to
+    with
+'''.split())
+
+
+def tokenize(text):
+    """Split text into folded tokens without stopwords."""
+    return [token for token in TOKEN_RE.findall(fold(text or '')) if token not in STOPWORDS]
+
+
+def split_compound(token, vocabulary):
+    """
+    Split a long compound into known words, allowing a linking 's'.
+
+    Returns the list of parts, or None if no complete split exists.
+    """
+    if len(token) < MIN_COMPOUND_LENGTH:
+        return None
+
+    # best[i] = shortest list of parts covering token[:i]
+    best = {0: []}
+    for end in range(MIN_COMPOUND_PART, len(token) + 1):
+        for start in range(0, end - MIN_COMPOUND_PART + 1):
+            # The whole token is no split, even though it is in the vocabulary
+            if start not in best or (start == 0 and end == len(token)):
+                continue
+            part = token[start:end]
+            if part not in vocabulary:
+                # Fugen-s: "forschungsmethoden" -> "forschung" + "methoden"
+                if not (part.endswith('s') and part[:-1] in vocabulary and len(part) > MIN_COMPOUND_PART):
+                    continue
+                part = part[:-1]
+            candidate = best[start] + [part]
+            if end not in best or len(candidate) < len(best[end]):
+                best[end] = candidate
+
+    parts = best.get(len(token))
+    if parts and len(parts) > 1:
+        return parts
+    return None
+
+
+class SearchIndex:
+    """Inverted index over the module catalog with BM25 ranking."""
+
+    def __init__(self, documents, postings, doc_lengths):
+        self.documents = documents
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self.avg_length = (sum(doc_lengths) / len(doc_lengths)) if doc_lengths else 0.0
+        self.terms = sorted(postings)
+        self.vocabulary = frozenset(postings)
+
+    @classmethod
+    def build(cls, modules):
+        """Build the index from module dicts holding the indexed fields."""
+        documents = []
+        field_tokens = []
+        vocabulary = set()
+        for module in modules:
+            documents.append({
+                'id': module['id'],
+                'examination_regulation_id': module['examination_regulation_id'],
+                'module_code': module['module_code'],
+                'name': module['name'],
+                'name_en': module['name_en'],
+                'credits': module['credits'],
+                'category': module['category'],
+            })
+            tokens = {field: tokenize(module[field]) for field in FIELD_WEIGHTS}
+            field_tokens.append(tokens)
+            for field_values in tokens.values():
+                vocabulary.update(field_values)
+
+        postings = defaultdict(dict)
+        doc_lengths = []
+        for doc_index, tokens in enumerate(field_tokens):
+            length = 0.0
+            for field, weight in FIELD_WEIGHTS.items():
+                for token in tokens[field]:
+                    variant = umlaut_variant(token, vocabulary)
+                    terms = [token] + ([variant] if variant else [])
+                    terms += split_compound(variant or token, vocabulary) or []
+                    for term in terms:
+                        postings[term][doc_index] = postings[term].get(doc_index, 0.0) + weight
+                    length += weight
+            doc_lengths.append(length)
+
+        return cls(
+            documents,
+            {term: sorted(entries.items()) for term, entries in postings.items()},
+            doc_lengths,
+        )
+
+    def to_dict(self):
+        return {
+            'format': INDEX_FORMAT,
+            'documents': self.documents,
+            'postings': self.postings,
+            'doc_lengths': self.doc_lengths,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('format') != INDEX_FORMAT:
+            raise ValueError('Unsupported search index format')
+        return cls(
+            data['documents'],
+            {term: [tuple(entry) for entry in entries] for term, entries in data['postings'].items()},
+            data['doc_lengths'],
+        )
+
+    def _prefix_terms(self, prefix):
+        start = bisect.bisect_left(self.terms, prefix)
+        matches = []
+        for term in self.terms[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        return matches
+
+    def _query_terms(self, query, prefix=True):
+        """Map query tokens to weighted index terms."""
+        tokens = tokenize(query)
+        weighted = {}
+        for position, token in enumerate(tokens):
+            variant = umlaut_variant(token, self.vocabulary)
+            if token in self.vocabulary or variant:
+                known = [term for term in (token, variant) if term in self.vocabulary]
+            else:
+                known = split_compound(token, self.vocabulary) or []
+            for term in known:
+                weighted[term] = max(weighted.get(term, 0.0), 1.0)
+
+            if prefix and position == len(tokens) - 1 and len(token) >= 2:
+                for term in self._prefix_terms(token):
+                    weighted.setdefault(term, PREFIX_WEIGHT)
+        return weighted
+
+    def search(self, query, limit=20, regulation_id=None, prefix=True):
+        """Return (document, score) pairs for the best matches."""
+        if not self.documents:
+            return []
+
+        doc_count = len(self.documents)
+        scores = defaultdict(float)
+        for term, query_weight in self._query_terms(query, prefix).items():
+            entries = self.postings.get(term, ())
+            if not entries:
+                continue
+            idf = math.log(1 + (doc_count - len(entries) + 0.5) / (len(entries) + 0.5))
+            for doc_index, tf in entries:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc_index] / self.avg_length)
+                scores[doc_index] += query_weight * idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        results = []
+        for doc_index, score in ranked:
+            document = self.documents[doc_index]
+            if regulation_id is not None and document['examination_regulation_id'] != regulation_id:
+                continue
+            results.append((document, score))
+            if len(results) >= limit:
+                break
+        return results
+
+
+def build_search_index(path=None):
+    """Build the index from the database and persist it."""
+    modules = Module.objects.order_by('module_code', 'id').values(
+        'id', 'examination_regulation_id', 'module_code', 'credits', 'category',
+        *FIELD_WEIGHTS
+    )
+    index = SearchIndex.build(list(modules))
+    save_search_index(index, path)
+    return index
+
+
+def save_search_index(index, path=None):
+    """Write the index atomically so running workers never read half a file."""
+    path = str(path or settings.SEARCH_INDEX_PATH)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index.to_dict(), f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def load_search_index(path=None):
+    """Load a persisted index, or return None if there is none."""
+    path = str(path or settings.SEARCH_INDEX_PATH)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return SearchIndex.from_dict(json.load(f))
+    except (OSError, ValueError):
+        return None
+
+
+_index = None
+_index_mtime = None
+_index_lock = threading.Lock()
+
+
+def _index_file_mtime():
+    try:
+        return os.stat(settings.SEARCH_INDEX_PATH).st_mtime
+    except OSError:
+        return None
+
+
+def get_search_index():
+    """
+    Return the process-wide search index.
+
+    The persisted file is loaded on first use and reloaded when it is
+    replaced. Without a file the index is empty until build_search_index
+    or import_course_data writes one.
+    """
+    global _index, _index_mtime
+    mtime = _index_file_mtime()
+    if _index is not None and _index_mtime == mtime:
+        return _index
+
+    with _index_lock:
+        mtime = _index_file_mtime()
+        if _index is None or _index_mtime != mtime:
+            index = load_search_index()
+            if index is None:
+                logger.warning(
+                    'No search index at %s; run build_search_index', settings.SEARCH_INDEX_PATH
+                )
+                index = SearchIndex([], {}, [])
+            _index, _index_mtime = index, mtime
+        return _index
@@ -1,10 +1,33 @@
+from decimal import Decimal
+
 from rest_framework import serializers
 from .models import (
     User, Module, ExaminationRegulation, MilestoneDefinition,
     MilestoneProgress, UserModuleCompletion, CareerGoal,
     SupportService, Notification, CareerPath, ModuleCareerRelevance,
-    UserCareerInterest, CareerOffer, MasterProgram
+    UserCareerInterest, CareerOffer, MasterProgram, UserProgressSnapshot
 )
+from .transcripts import normalize_semester
+
+
+# ============================================
+# SHARED HELPERS
+# ============================================
+
+class DynamicFieldsMixin:
+    """
+    Serializer mixin that limits the output to a subset of fields.
+
+    Pass `fields=[...]` when instantiating the serializer; unknown names
+    are ignored.
+    """
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
 
 
 # ============================================
@@ -49,10 +72,10 @@ class ExaminationRegulationSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class ModuleSerializer(serializers.ModelSerializer):
+class ModuleSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Basic serializer for Module model.
-    Used for module lists.
+    Used for module lists; supports field projection via `fields`.
     """
     class Meta:
         model = Module
@@ -100,6 +123,55 @@ class UserModuleCompletionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'user', 'created_at', 'updated_at']
 
 
+class CompletionRecordSerializer(serializers.Serializer):
+    """
+    One entry of a batch completion import.
+    The module is given by primary key (`module`) or by `module_code`.
+    """
+    module = serializers.IntegerField(required=False)
+    module_code = serializers.CharField(max_length=50, required=False)
+    status = serializers.ChoiceField(
+        choices=UserModuleCompletion.STATUS_CHOICES, required=False
+    )
+    grade = serializers.DecimalField(
+        max_digits=2, decimal_places=1, min_value=Decimal('1.0'),
+        max_value=Decimal('5.0'), required=False, allow_null=True
+    )
+    semester_taken = serializers.CharField(max_length=50, required=False, allow_blank=True)
+
+    def to_internal_value(self, data):
+        # Accept German decimal commas ("2,3")
+        if isinstance(data, dict) and isinstance(data.get('grade'), str):
+            data = {**data, 'grade': data['grade'].replace(',', '.')}
+        return super().to_internal_value(data)
+
+    def validate_semester_taken(self, value):
+        return normalize_semester(value)
+
+    def validate(self, attrs):
+        if not attrs.get('module') and not attrs.get('module_code'):
+            raise serializers.ValidationError('Either module or module_code is required.')
+        return attrs
+
+
+class UserProgressSnapshotSerializer(serializers.ModelSerializer):
+    """
+    Serializer for UserProgressSnapshot model.
+    Field names match what the frontend's completion stats expect.
+    """
+    earned_credits = serializers.IntegerField(source='total_credits', read_only=True)
+    total_count = serializers.IntegerField(source='total_module_count', read_only=True)
+
+    class Meta:
+        model = UserProgressSnapshot
+        fields = [
+            'earned_credits', 'required_credits', 'percent_complete',
+            'credits_by_category', 'completed_count', 'in_progress_count',
+            'total_count', 'gpa', 'updated_at'
+        ]
+        read_only_fields = fields
+
+
 # ============================================
 # MILESTONE SERIALIZERS
 # ============================================
@@ -225,12 +297,16 @@ class CareerPathSerializer(serializers.ModelSerializer):
         }
 
     def get_module_count(self, obj):
-        """Count related modules."""
+        """Count related modules (uses the view's annotation when present)."""
+        if hasattr(obj, 'module_count'):
+            return obj.module_count
         return obj.module_relevances.count()
 
 
 class CareerPathDetailSerializer(CareerPathSerializer):
     """Detailed serializer with related modules."""
+    TOP_MODULES_LIMIT = 10
+
     top_modules = serializers.SerializerMethodField()
 
     class Meta(CareerPathSerializer.Meta):
@@ -238,7 +314,12 @@ class CareerPathDetailSerializer(CareerPathSerializer):
 
     def get_top_modules(self, obj):
         """Get top 10 most relevant modules for this career."""
-        relevances = obj.module_relevances.select_related('module').order_by('-relevance_score')[:10]
+        if hasattr(obj, 'top_relevances'):
+            relevances = obj.top_relevances
+        else:
+            relevances = obj.module_relevances.select_related('module').order_by(
+                '-relevance_score'
+            )[:self.TOP_MODULES_LIMIT]
         return [
             {
                 'module_code': rel.module.module_code,
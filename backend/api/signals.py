@@ -0,0 +1,109 @@
+"""
+Signal handlers keeping caches and derived tables in sync with the database.
+"""
+from django.db.models.signals import post_save, post_delete, pre_save, m2m_changed
+from django.dispatch import receiver
+
+from .cache import bump_catalog_version
+from .events import notify_users
+from .models import (
+    Module, CareerPath, ModuleCareerRelevance, CareerOffer, CareerOfferField,
+    MasterProgram, SupportService, Notification, MilestoneProgress,
+    UserModuleCompletion, User, ExaminationRegulation
+)
+from .progress import invalidate_progress_snapshots, is_refreshing_progress
+
+
+@receiver([post_save, post_delete], sender=Module)
+@receiver([post_save, post_delete], sender=CareerPath)
+@receiver([post_save, post_delete], sender=ModuleCareerRelevance)
+@receiver([post_save, post_delete], sender=CareerOffer)
+@receiver([post_save, post_delete], sender=CareerOfferField)
+@receiver([post_save, post_delete], sender=MasterProgram)
+@receiver([post_save, post_delete], sender=SupportService)
+def catalog_data_changed(sender, **kwargs):
+    """
+    Bump the catalog version of the changed model. This invalidates cached
+    catalog responses and the recommendation matrix built from it.
+    """
+    bump_catalog_version(sender)
+
+
+@receiver(m2m_changed, sender=Module.prerequisites.through)
+def module_prerequisites_changed(sender, **kwargs):
+    """Module details embed prerequisites, so treat edits as a Module change."""
+    bump_catalog_version(Module)
+
+
+@receiver(m2m_changed, sender=SupportService.related_milestones.through)
+def support_service_milestones_changed(sender, **kwargs):
+    bump_catalog_version(SupportService)
+
+
+@receiver(post_save, sender=CareerOffer)
+def career_offer_saved(sender, instance, **kwargs):
+    """Keep the normalized career field table in sync with career_fields."""
+    CareerOffer.sync_career_fields([instance])
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_save, sender=MilestoneProgress)
+def user_event_saved(sender, instance, **kwargs):
+    """Wake the user's open event streams in this process (see api/events.py)."""
+    notify_users([instance.user_id])
+
+
+@receiver([post_save, post_delete], sender=UserModuleCompletion)
+def module_completion_changed(sender, instance, **kwargs):
+    """
+    Drop the user's progress snapshot after admin edits and other writes.
+    API writes refresh it through on_completions_changed() instead.
+    """
+    if not is_refreshing_progress(instance.user_id):
+        invalidate_progress_snapshots(user_id=instance.user_id)
+
+
+@receiver(pre_save, sender=Module)
+def module_credits_changing(sender, instance, **kwargs):
+    """Snapshots sum credits per category, so drop them when either changes."""
+    if instance.pk is None:
+        return
+    old = Module.objects.filter(pk=instance.pk).values('credits', 'category').first()
+    if old and (old['credits'], old['category']) != (instance.credits, instance.category):
+        invalidate_progress_snapshots(user__module_completions__module_id=instance.pk)
+
+
+@receiver(post_save, sender=Module)
+@receiver(post_delete, sender=Module)
+def module_added_or_removed(sender, instance, **kwargs):
+    """Snapshots count the modules of the user's regulation."""
+    # post_delete sends no `created`
+    if kwargs.get('created', True):
+        invalidate_progress_snapshots(
+            user__examination_regulation_id=instance.examination_regulation_id
+        )
+
+
+@receiver(pre_save, sender=User)
+def user_regulation_changing(sender, instance, update_fields=None, **kwargs):
+    """Snapshots store the required credits and module count of the regulation."""
+    if instance.pk is None:
+        return
+    if update_fields is not None and 'examination_regulation' not in update_fields:
+        # e.g. the last_login update on every login
+        return
+    old = User.objects.filter(pk=instance.pk).values_list('examination_regulation_id', flat=True).first()
+    if old != instance.examination_regulation_id:
+        invalidate_progress_snapshots(user_id=instance.pk)
+
+
+@receiver(pre_save, sender=ExaminationRegulation)
+def regulation_credits_changing(sender, instance, **kwargs):
+    """Snapshots store the required credits and the percentage derived from them."""
+    if instance.pk is None:
+        return
+    old = ExaminationRegulation.objects.filter(pk=instance.pk).values_list(
+        'total_credits_required', flat=True
+    ).first()
+    if old != instance.total_credits_required:
+        invalidate_progress_snapshots(user__examination_regulation_id=instance.pk)
@@ -0,0 +1,114 @@
+"""
+"Similar modules" from precomputed text similarity.
+
+rebuild_module_similarity() turns the learning content and objectives of
+every module into a TF-IDF vector. Tokens come from the search tokenizer
+(api/search.py), so folding, stopwords and compound splitting match the
+module search. It then stores each module's top-k most similar modules of
+the same examination regulation in ModuleSimilarity.
+
+Similarities are computed through an inverted index: a module is only
+compared with modules sharing at least one term. A rebuild over the
+whole catalog takes well under a second. Requests read the stored
+neighbours and do no text processing.
+
+import_course_data rebuilds the table after every import; it can also be
+rebuilt with the build_module_similarity command.
+"""
+import math
+from collections import Counter, defaultdict
+
+from django.db import transaction
+
+from .cache import bump_catalog_version
+from .models import Module, ModuleSimilarity
+from .search import split_compound, tokenize
+
+
+SIMILARITY_FIELDS = ['learning_content', 'learning_objectives']
+
+DEFAULT_TOP_K = 10
+
+# Neighbours scoring below this are not stored
+MIN_SIMILARITY = 0.05
+
+
+def _term_counts(modules):
+    """Token counts per module, with compounds also counted under their parts."""
+    tokens = [
+        [token for field in SIMILARITY_FIELDS for token in tokenize(module[field])]
+        for module in modules
+    ]
+    vocabulary = frozenset(token for module_tokens in tokens for token in module_tokens)
+    counts = []
+    for module_tokens in tokens:
+        terms = Counter(module_tokens)
+        for token in module_tokens:
+            terms.update(split_compound(token, vocabulary) or ())
+        counts.append(terms)
+    return counts
+
+
+def _tfidf_vectors(counts):
+    """L2-normalised TF-IDF vectors (sublinear tf) as {term: weight} dicts."""
+    document_frequency = Counter(term for terms in counts for term in terms)
+    doc_count = len(counts)
+    vectors = []
+    for terms in counts:
+        vector = {
+            term: (1 + math.log(count)) * math.log(1 + doc_count / document_frequency[term])
+            for term, count in terms.items()
+            # Terms in every document carry no information
+            if document_frequency[term] < doc_count
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        vectors.append({term: weight / norm for term, weight in vector.items()} if norm else {})
+    return vectors
+
+
+def _nearest_neighbours(vectors, top_k):
+    """Yield (index, [(other index, cosine similarity)]) with the top_k neighbours."""
+    postings = defaultdict(list)
+    for index, vector in enumerate(vectors):
+        for term, weight in vector.items():
+            postings[term].append((index, weight))
+
+    for index, vector in enumerate(vectors):
+        scores = defaultdict(float)
+        for term, weight in vector.items():
+            for other, other_weight in postings[term]:
+                if other != index:
+                    scores[other] += weight * other_weight
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        yield index, [(other, score) for other, score in ranked[:top_k] if score >= MIN_SIMILARITY]
+
+
+def rebuild_module_similarity(top_k=DEFAULT_TOP_K):
+    """Recompute the neighbours of every module. Returns the number of rows written."""
+    by_regulation = defaultdict(list)
+    for module in Module.objects.order_by('module_code', 'id').values(
+        'id', 'examination_regulation_id', *SIMILARITY_FIELDS
+    ):
+        by_regulation[module['examination_regulation_id']].append(module)
+
+    rows = []
+    for modules in by_regulation.values():
+        vectors = _tfidf_vectors(_term_counts(modules))
+        for index, neighbours in _nearest_neighbours(vectors, top_k):
+            rows.extend(
+                ModuleSimilarity(
+                    module_id=modules[index]['id'],
+                    similar_module_id=modules[other]['id'],
+                    score=round(score, 4),
+                    rank=rank,
+                )
+                for rank, (other, score) in enumerate(neighbours, start=1)
+            )
+
+    with transaction.atomic():
+        ModuleSimilarity.objects.all().delete()
+        ModuleSimilarity.objects.bulk_create(rows, batch_size=500)
+
+    # Bulk writes bypass model signals
+    bump_catalog_version(ModuleSimilarity)
+    return len(rows)
@@ -1,3 +1,1643 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from . import recommendations
+from .bundles import build_catalog_bundles
+from .cache import catalog_version
+from .events import issue_stream_ticket
+from .progress import get_progress_snapshot
+from .reminders import generate_reminders
+from .middleware import METRICS
+from .milestones import evaluate_milestones
+from .popularity import SHUFFLE_WINDOW, fallback_module_ids, rebuild_module_popularity
+from .prerequisites import PrerequisiteCycleError, PrerequisiteGraph
+from .search import build_search_index, tokenize
+from .similarity import rebuild_module_similarity
+from .transcripts import parse_transcript
+from .models import (
+    ExaminationRegulation, Module, CareerPath, ModuleCareerRelevance,
+    MilestoneDefinition, MilestoneProgress, ModulePopularity, Notification, User,
+    UserCareerInterest, UserModuleCompletion, UserProgressSnapshot
+)
+from .views import CareerPathViewSet, ModuleViewSet, NotificationViewSet, RecommendationView
+
+
+def create_regulation(**fields):
+    """The examination regulation most tests build on; `fields` override its defaults."""
+    return ExaminationRegulation.objects.create(**{
+        'name': 'B.Sc. Informatik',
+        'version': '2022',
+        'program': 'B.Sc. Informatik',
+        'total_credits_required': 180,
+        'effective_date': date(2022, 10, 1),
+        **fields,
+    })
+
+
+def create_modules(regulation, count, name='Module {i}', **fields):
+    """
+    Create modules 20-00-0000, 20-00-0001, ... of `regulation` worth 5 CP.
+    `name` is formatted with the index; `fields` override the defaults.
+    """
+    return [
+        Module.objects.create(**{
+            'examination_regulation': regulation,
+            'module_code': f'20-00-{i:04d}',
+            'name': name.format(i=i),
+            'credits': 5,
+            **fields,
+        })
+        for i in range(count)
+    ]
+
+
+class CareerPathQueryCountTests(APITestCase):
+    """/careers/ must not issue one query per career path."""
+
+    @classmethod
+    def setUpTestData(cls):
+        regulation = create_regulation()
+        modules = create_modules(regulation, 15)
+        cls.careers = [
+            CareerPath.objects.create(
+                career_id=f'career_{i}',
+                title_en=f'Career {i}',
+                title_de=f'Karriere {i}',
+            )
+            for i in range(5)
+        ]
+        for i, career in enumerate(cls.careers):
+            for j, module in enumerate(modules[:10 + i]):
+                ModuleCareerRelevance.objects.create(
+                    module=module,
+                    career_path=career,
+                    relevance_score=j * 5,
+                    is_core=j * 5 >= 50,
+                )
+
+    def setUp(self):
+        caches['catalog'].clear()
+
+    def test_list_uses_single_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/careers/')
+
+        self.assertEqual(response.status_code, 200)
+        counts = {career['career_id']: career['module_count'] for career in response.data}
+        self.assertEqual(counts, {f'career_{i}': 10 + i for i in range(5)})
+
+    def test_detail_uses_two_queries(self):
+        career = self.careers[4]
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/careers/{career.pk}/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['module_count'], 14)
+        scores = [module['relevance_score'] for module in response.data['top_modules']]
+        self.assertEqual(scores, [65, 60, 55, 50, 45, 40, 35, 30, 25, 20])
+
+
+class CatalogBundleTests(APITestCase):
+    """Catalog bundles are immutable files named after their content."""
+
+    @classmethod
+    def setUpTestData(cls):
+        regulation = create_regulation()
+        module = create_modules(regulation, 1)[0]
+        cls.career = CareerPath.objects.create(
+            career_id='career_0',
+            title_en='Career 0',
+            title_de='Karriere 0',
+        )
+        ModuleCareerRelevance.objects.create(
+            module=module,
+            career_path=cls.career,
+            relevance_score=80,
+            is_core=True,
+        )
+
+    def setUp(self):
+        caches['catalog'].clear()
+
+    def test_catalog_bundles_are_content_hashed(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(CATALOG_BUNDLE_DIR=directory):
+            manifest = build_catalog_bundles()
+            self.assertEqual(build_catalog_bundles(), manifest)
+
+            entry = next(iter(manifest['bundles'].values()))['en']
+            response = self.client.get(f'/api/catalog/bundles/{entry["file"]}', HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertIn('immutable', response['Cache-Control'])
+
+            CareerPath.objects.filter(pk=self.career.pk).update(title_en='Renamed')
+            changed = build_catalog_bundles()
+            changed_entry = next(iter(changed['bundles'].values()))['en']
+            self.assertNotEqual(changed_entry['hash'], entry['hash'])
+            # The previous bundle stays available for clients with the old manifest
+            self.assertTrue(os.path.exists(os.path.join(directory, entry['file'])))
+            response = self.client.get('/api/catalog/manifest/')
+            self.assertEqual(response.data['generated_at'], changed['generated_at'])
+
+    def test_bundle_encoding_follows_q_values(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(CATALOG_BUNDLE_DIR=directory):
+            manifest = build_catalog_bundles()
+            url = '/api/catalog/bundles/' + next(iter(manifest['bundles'].values()))['en']['file']
+            has_brotli = os.path.exists(os.path.join(directory, url.rsplit('/', 1)[1] + '.br'))
+
+            cases = [
+                ('br;q=0, gzip', 'gzip'),
+                ('gzip;q=0', None),
+                ('br;q=0, gzip;q=0.0', None),
+                ('identity', None),
+                ('*', 'br' if has_brotli else 'gzip'),
+                ('*;q=0.5, br;q=0', 'gzip'),
+                ('GZIP; q=1', 'gzip'),
+            ]
+            for header, encoding in cases:
+                with self.subTest(header=header):
+                    response = self.client.get(url, HTTP_ACCEPT_ENCODING=header)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.get('Content-Encoding'), encoding)
+                    self.assertIn('Accept-Encoding', response['Vary'])
+                    response.close()
+
+
+class RendererTests(APITestCase):
+    """The orjson renderer must produce the same documents as DRF's JSONRenderer."""
+
+    @classmethod
+    def setUpTestData(cls):
+        regulation = create_regulation()
+        cls.career = CareerPath.objects.create(
+            career_id='career_0',
+            title_en='Career 0',
+            title_de='Karriere 0',
+        )
+        for i, module in enumerate(create_modules(regulation, 5, name='Modul {i} – Übersicht')):
+            ModuleCareerRelevance.objects.create(
+                module=module,
+                career_path=cls.career,
+                relevance_score=i * 20,
+                is_core=i >= 3,
+            )
+
+    def setUp(self):
+        caches['catalog'].clear()
+
+    def test_orjson_renderer_matches_json_renderer(self):
+        response = self.client.get(f'/api/careers/{self.career.pk}/')
+
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(
+            json.loads(response.content),
+            json.loads(JSONRenderer().render(response.data)),
+        )
+
+
+class CatalogResponseCacheTests(APITestCase):
+    """cache_catalog_response: ETag revalidation and invalidation on writes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        regulation = create_regulation()
+        cls.module = create_modules(regulation, 1)[0]
+        cls.career = CareerPath.objects.create(
+            career_id='career_0',
+            title_en='Career 0',
+            title_de='Karriere 0',
+        )
+        cls.relevance = ModuleCareerRelevance.objects.create(
+            module=cls.module,
+            career_path=cls.career,
+            relevance_score=80,
+        )
+
+    def setUp(self):
+        caches['catalog'].clear()
+        self.url = f'/api/careers/{self.career.pk}/'
+
+    def test_matching_etag_gets_304(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_cached_body_is_served_without_queries(self):
+        first = self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second.data, first.data)
+
+    def test_model_saves_invalidate(self):
+        def fetch(etag):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], etag)
+            return response
+
+        response = self.client.get(self.url)
+
+        self.career.title_en = 'Data Engineer'
+        self.career.save()
+        response = fetch(response['ETag'])
+        self.assertEqual(response.data['title_en'], 'Data Engineer')
+
+        self.module.name = 'Datenbanken'
+        self.module.save()
+        response = fetch(response['ETag'])
+        self.assertEqual(response.data['top_modules'][0]['name'], 'Datenbanken')
+
+        self.relevance.relevance_score = 40
+        self.relevance.save()
+        response = fetch(response['ETag'])
+        self.assertEqual(response.data['top_modules'][0]['relevance_score'], 40)
+
+
+class QueryBudgetTests(APITestCase):
+    """Endpoints must stay within the query budgets declared on their views."""
+
+    @classmethod
+    def setUpTestData(cls):
+        regulation = create_regulation()
+        modules = create_modules(regulation, 20)
+        cls.careers = [
+            CareerPath.objects.create(
+                career_id=f'career_{i}',
+                title_en=f'Career {i}',
+                title_de=f'Karriere {i}',
+            )
+            for i in range(3)
+        ]
+        for i, career in enumerate(cls.careers):
+            for j, module in enumerate(modules):
+                ModuleCareerRelevance.objects.create(
+                    module=module,
+                    career_path=career,
+                    relevance_score=(i * 7 + j * 11) % 100,
+                )
+
+        cls.user = User.objects.create_user(
+            username='student', password='secret', examination_regulation=regulation
+        )
+        for level, career in enumerate(cls.careers[:2], start=3):
+            UserCareerInterest.objects.create(user=cls.user, career_path=career, interest_level=level)
+        for module in modules[:3]:
+            UserModuleCompletion.objects.create(user=cls.user, module=module, status='completed')
+        Notification.objects.bulk_create(
+            Notification(user=cls.user, type='system', title=f'Notice {i}', message='...')
+            for i in range(30)
+        )
+
+    def setUp(self):
+        caches['catalog'].clear()
+        caches['default'].clear()
+
+    def assertWithinBudget(self, response, view_class, handler):
+        budget = view_class.query_budgets[handler]
+        metrics = response.request_metrics
+        self.assertEqual(metrics.view, f'{view_class.__name__}.{handler}')
+        self.assertEqual(metrics.query_budget, budget)
+        self.assertLessEqual(
+            metrics.queries, budget,
+            f'{metrics.view} issued {metrics.queries} queries, budget is {budget}'
+        )
+
+    def test_career_list_budget(self):
+        response = self.client.get('/api/careers/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertWithinBudget(response, CareerPathViewSet, 'list')
+
+    def test_career_detail_budget(self):
+        response = self.client.get(f'/api/careers/{self.careers[0].pk}/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertWithinBudget(response, CareerPathViewSet, 'retrieve')
+
+    def test_recommendations_budget(self):
+        self.client.force_authenticate(self.user)
+        # Cold process: the first request builds the relevance matrix
+        recommendations._matrix = None
+
+        response = self.client.get('/api/recommendations/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['recommendations']), 10)
+        self.assertEqual(response.data['user_stats']['completed_credits'], 15)
+        self.assertWithinBudget(response, RecommendationView, 'get')
+
+        caches['default'].clear()
+        response = self.client.get('/api/recommendations/')
+        self.assertLessEqual(response.request_metrics.queries, 2)
+
+    def test_notification_budgets(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get('/api/notifications/')
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertWithinBudget(response, NotificationViewSet, 'list')
+
+        response = self.client.get('/api/notifications/unread-count/')
+        self.assertEqual(response.data, {'unread_count': 30})
+        self.assertWithinBudget(response, NotificationViewSet, 'unread_count')
+
+        response = self.client.post('/api/notifications/mark-all-read/')
+        self.assertEqual(response.data, {'updated': 30})
+        self.assertWithinBudget(response, NotificationViewSet, 'mark_all_read')
+
+    def test_similar_modules_budget(self):
+        topics = ['Datenbanken SQL Transaktionen', 'Compilerbau Parser Grammatiken', 'Neuronale Netze Lernen']
+        modules = list(Module.objects.order_by('module_code'))
+        for i, module in enumerate(modules):
+            module.learning_content = f'{topics[i % 3]} Modul {i}'
+            module.save(update_fields=['learning_content'])
+        rebuild_module_similarity(top_k=5)
+
+        response = self.client.get(f'/api/modules/{modules[0].pk}/similar/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [result['id'] for result in response.data['results']],
+            [module.pk for module in modules[3::3][:5]],
+        )
+        self.assertWithinBudget(response, ModuleViewSet, 'similar')
+
+    def test_server_timing_header(self):
+        response = self.client.get('/api/careers/')
+
+        timing = response['Server-Timing']
+        self.assertIn('db;dur=', timing)
+        self.assertIn('render;dur=', timing)
+        self.assertIn('total;dur=', timing)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_endpoint(self):
+        METRICS.reset()
+        self.client.get('/api/careers/')
+        self.client.get('/api/no-such-endpoint/')
+        self.client.get('/api/another/missing/path/')
+
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 401)
+        response = self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer secret')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('api_requests_total{view="CareerPathViewSet.list",method="GET",status="200"} 1', body)
+        self.assertIn('api_request_duration_seconds_count{view="CareerPathViewSet.list"', body)
+        self.assertIn('api_requests_total{view="unresolved",method="GET",status="404"} 2', body)
+        self.assertNotIn('no-such-endpoint', body)
+
+    @override_settings(METRICS_TOKEN='', DEBUG=True)
+    def test_metrics_closed_without_token(self):
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+
+
+class ProgressSnapshotTests(APITestCase):
+    """Every write path must leave the progress snapshot (credits, GPA) current."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.regulation = create_regulation()
+        cls.modules = [
+            Module.objects.create(
+                examination_regulation=cls.regulation,
+                module_code=f'20-00-{i:04d}',
+                name=f'Module {i}',
+                credits=credits,
+            )
+            for i, credits in enumerate([5, 10, 5])
+        ]
+        cls.user = User.objects.create_user(
+            username='student', password='secret', examination_regulation=cls.regulation
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+        self.completion = UserModuleCompletion.objects.create(
+            user=self.user, module=self.modules[0], status='completed', grade='2.0'
+        )
+        # Computes the initial snapshot: 5 credits, GPA 2.0
+        get_progress_snapshot(self.user)
+
+    def assertProgress(self, credits, gpa):
+        response = self.client.get('/api/user/completion-stats/')
+        self.assertEqual(response.data['earned_credits'], credits)
+        self.assertEqual(response.data['gpa'], gpa)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.get_total_credits(), credits)
+
+    def test_create(self):
+        response = self.client.post('/api/user/modules/', {
+            'module': self.modules[1].pk, 'status': 'completed', 'grade': '1.0',
+        })
+
+        self.assertEqual(response.status_code, 201)
+        self.assertProgress(15, '1.33')
+
+    def test_update(self):
+        response = self.client.patch(f'/api/user/modules/{self.completion.pk}/', {'grade': '1.0'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertProgress(5, '1.00')
+
+    def test_destroy(self):
+        response = self.client.delete(f'/api/user/modules/{self.completion.pk}/')
+
+        self.assertEqual(response.status_code, 204)
+        self.assertProgress(0, None)
+
+    def test_mark_and_unmark_complete(self):
+        self.client.post(f'/api/user/modules/{self.modules[2].pk}/complete/')
+        self.assertProgress(10, '2.00')
+
+        self.client.delete(f'/api/user/modules/{self.modules[2].pk}/complete/')
+        self.assertProgress(5, '2.00')
+
+    def test_batch(self):
+        response = self.client.post('/api/user/modules/batch/', {'records': [
+            {'module': self.modules[1].pk, 'status': 'completed', 'grade': '1,0'},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertProgress(15, '1.33')
+
+    def test_write_outside_the_api(self):
+        self.completion.grade = '4.0'
+        self.completion.save()
+
+        self.assertProgress(5, '4.00')
+
+    def test_module_credit_change(self):
+        module = self.modules[0]
+        module.credits = 8
+        module.save()
+
+        self.assertProgress(8, '2.00')
+
+    def test_required_credits_change(self):
+        self.regulation.total_credits_required = 10
+        self.regulation.save()
+
+        response = self.client.get('/api/user/completion-stats/')
+        self.assertEqual(response.data['required_credits'], 10)
+        self.assertEqual(response.data['percent_complete'], '50.0')
+
+    def test_regulation_change(self):
+        other = create_regulation(
+            name='M.Sc. Informatik', version='2023', program='M.Sc. Informatik',
+            total_credits_required=120, effective_date=date(2023, 10, 1),
+        )
+        self.user.examination_regulation = other
+        self.user.save()
+
+        response = self.client.get('/api/user/completion-stats/')
+        self.assertEqual(response.data['required_credits'], 120)
+        self.assertEqual(response.data['total_count'], 0)
+
+    def test_api_write_updates_snapshot_in_place(self):
+        snapshot_id = UserProgressSnapshot.objects.get(user=self.user).pk
+        with mock.patch('api.signals.invalidate_progress_snapshots') as invalidate:
+            self.client.post(f'/api/user/modules/{self.modules[2].pk}/complete/')
+            self.client.delete(f'/api/user/modules/{self.modules[2].pk}/complete/')
+
+        invalidate.assert_not_called()
+        self.assertEqual(UserProgressSnapshot.objects.get(user=self.user).pk, snapshot_id)
+        self.assertProgress(5, '2.00')
+
+
+class EventStreamTicketTests(APITransactionTestCase):
+    """/events/ only accepts short-lived stream tickets, never the API token."""
+
+    # The view reads the database from the shared thread pool, which only
+    # sees committed rows
+    def setUp(self):
+        self.user = User.objects.create_user(username='student', password='secret')
+        Notification.objects.create(user=self.user, type='system', title='Hello', message='...')
+
+    def test_ticket_requires_authentication(self):
+        response = self.client.post('/api/events/ticket/')
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_stream_with_ticket(self):
+        self.client.force_authenticate(self.user)
+        ticket = self.client.post('/api/events/ticket/').data['ticket']
+        self.client.force_authenticate(None)
+
+        response = self.client.get('/api/events/', {'ticket': ticket, 'last_event_id': '0:0'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('event: notification', response.content.decode())
+
+    def test_api_token_is_rejected(self):
+        token = Token.objects.create(user=self.user)
+
+        response = self.client.get('/api/events/', {'token': token.key})
+
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(EVENT_STREAM_TICKET_MAX_AGE=-1)
+    def test_expired_ticket_is_rejected(self):
+        response = self.client.get('/api/events/', {'ticket': issue_stream_ticket(self.user)})
+
+        self.assertEqual(response.status_code, 401)
+
+
+class WarmRecommendationsTests(APITestCase):
+    """warm_recommendations must fill the cache the web workers read from."""
+
+    @classmethod
+    def setUpTestData(cls):
+        regulation = create_regulation()
+        career = CareerPath.objects.create(career_id='career_0', title_en='Career', title_de='Karriere')
+        for i, module in enumerate(create_modules(regulation, 12)):
+            ModuleCareerRelevance.objects.create(module=module, career_path=career, relevance_score=50 + i)
+        cls.user = User.objects.create_user(
+            username='student', password='secret', examination_regulation=regulation
+        )
+        UserCareerInterest.objects.create(user=cls.user, career_path=career, interest_level=5)
+
+    def test_refuses_process_local_cache(self):
+        with self.assertRaisesMessage(CommandError, 'local to this process'):
+            call_command('warm_recommendations')
+
+    def test_warmed_list_is_served_without_recomputation(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(CACHES={
+            alias: {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': os.path.join(directory, alias),
+            }
+            for alias in ('default', 'catalog')
+        }):
+            call_command('warm_recommendations', stdout=io.StringIO())
+            self.client.force_authenticate(self.user)
+
+            with mock.patch('api.recommendations.rank_modules', side_effect=AssertionError('recomputed')):
+                response = self.client.get('/api/recommendations/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['recommendations']), 10)
+
+
+class RelevanceMatrixTests(APITestCase):
+    """The threshold walk must rank exactly like scoring every module."""
+
+    def setUp(self):
+        modules = [
+            {'id': i, 'examination_regulation_id': i % 2, 'module_code': f'20-00-{i:04d}'}
+            for i in range(60)
+        ]
+        careers = [{'id': j, 'career_id': f'career_{j}', 'title_en': f'Career {j}'} for j in range(4)]
+        # Many equal scores, so ties have to be broken by module_code
+        self.relevances = [
+            (i, j, (i * 7 + j * 13) % 5 * 20)
+            for i in range(60) for j in range(4)
+            if (i + j) % 3
+        ]
+        self.modules = modules
+        self.matrix = recommendations.RelevanceMatrix(modules, careers, self.relevances)
+
+    def brute_force(self, interests, limit, excluded, regulation_id):
+        scores = {}
+        for module_id, career_pk, score in self.relevances:
+            scores[module_id] = scores.get(module_id, 0) + score * (interests.get(career_pk, 0) / 100)
+        ranked = sorted(
+            (
+                (-score, module['module_code'])
+                for module in self.modules
+                for score in [scores.get(module['id'], 0)]
+                if score > 0
+                and module['id'] not in excluded
+                and regulation_id in (None, module['examination_regulation_id'])
+            )
+        )
+        return [(code, -score) for score, code in ranked[:limit]]
+
+    def test_matches_brute_force(self):
+        cases = [
+            ({0: 100}, 5, set(), 0),
+            ({0: 30, 2: 100}, 10, {2, 4, 6}, 0),
+            ({1: 50, 2: 50, 3: 50}, 7, {1}, 1),
+            ({0: 10, 1: 90, 3: 40}, 50, set(), None),
+            ({3: 100}, 8, set(), None),
+        ]
+        for interests, limit, excluded, regulation_id in cases:
+            with self.subTest(interests=interests, regulation_id=regulation_id):
+                ranked = self.matrix.top_modules(interests, limit, excluded, regulation_id)
+                self.assertEqual(
+                    [(module['module_code'], score) for module, score, _ in ranked],
+                    self.brute_force(interests, limit, excluded, regulation_id),
+                )
+
+    def test_only_the_users_regulation_is_ranked(self):
+        ranked = self.matrix.top_modules({0: 100, 1: 100}, 50, regulation_id=1)
+        self.assertTrue(ranked)
+        self.assertEqual({module['examination_regulation_id'] for module, _, _ in ranked}, {1})
+        self.assertEqual(self.matrix.top_modules({0: 100}, 10, regulation_id=99), [])
+
+    def test_matching_careers_are_limited_to_interests(self):
+        module, _, matching_careers = self.matrix.top_modules({2: 100}, 1, regulation_id=0)[0]
+        self.assertEqual([career['career_id'] for career in matching_careers], ['career_2'])
+
+
+class TranscriptParserTests(APITestCase):
+    """parse_transcript must report every code-like line it cannot turn into a record."""
+
+    def test_code_formats(self):
+        records, unparsed = parse_transcript(
+            '20-00-0004-iv Funktionale Programmierung 2,3 WiSe 2022/23\n'
+            '18-0000 Elektrotechnik 1,7\n'
+            '04-10-0118/de Mathematik I 9,0 3,0\n'
+            '18-sm-1010 Seminar bestanden\n'
+        )
+        self.assertEqual(
+            [record['module_code'] for record in records],
+            ['20-00-0004', '18-0000', '04-10-0118', '18-sm-1010']
+        )
+        self.assertEqual(records[0]['semester_taken'], 'WS2022')
+        self.assertEqual([record.get('grade') for record in records], ['2.3', '1.7', '3.0', None])
+        self.assertEqual(unparsed, [])
+
+    def test_credit_column_before_grade(self):
+        records, _ = parse_transcript('20-00-0004 Modul 5,0 2,3 bestanden')
+        self.assertEqual(records[0]['grade'], '2.3')
+        self.assertEqual(records[0]['status'], 'completed')
+
+    def test_ungraded_pass_and_failure(self):
+        records, _ = parse_transcript(
+            '20-00-0004 Modul 5,0 bestanden\n'
+            '20-00-0005 Modul 5,0 nicht bestanden\n'
+        )
+        self.assertNotIn('grade', records[0])
+        self.assertEqual(records[0]['status'], 'completed')
+        self.assertEqual(records[1]['grade'], '5.0')
+        self.assertEqual(records[1]['status'], 'failed')
+
+    def test_unparseable_code_is_reported(self):
+        records, unparsed = parse_transcript(
+            'Leistungsspiegel\n'
+            '  20-00-004 Tippfehler 2,0  \n'
+            '20-00-0004 Modul 1,0\n'
+        )
+        self.assertEqual(len(records), 1)
+        self.assertEqual(unparsed, ['20-00-004 Tippfehler 2,0'])
+
+    def test_batch_keeps_stored_status_when_omitted(self):
+        regulation = create_regulation()
+        modules = [
+            Module.objects.create(
+                examination_regulation=regulation,
+                module_code=code,
+                name=code,
+                credits=5,
+            )
+            for code in ('20-00-0004', '18-0000')
+        ]
+        user = User.objects.create_user(
+            username='student', password='secret', examination_regulation=regulation
+        )
+        UserModuleCompletion.objects.create(user=user, module=modules[0], status='in_progress')
+        self.client.force_authenticate(user)
+
+        response = self.client.post('/api/user/modules/batch/', {'records': [
+            {'module_code': '20-00-0004', 'semester_taken': 'SoSe 24'},
+            {'module_code': '18-0000/de', 'grade': '1,3'},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['unresolved'], [])
+        stored = {
+            completion.module_id: completion
+            for completion in UserModuleCompletion.objects.filter(user=user)
+        }
+        self.assertEqual(stored[modules[0].pk].status, 'in_progress')
+        self.assertEqual(stored[modules[0].pk].semester_taken, 'SS2024')
+        self.assertEqual(stored[modules[1].pk].status, 'completed')
+
+
+class MilestoneTestCase(APITestCase):
+    """A regulation with two 'Foundations' modules and a 10 CP module outside the group."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.regulation = create_regulation()
+        cls.foundations = create_modules(
+            cls.regulation, 2, name='Foundation {i}', group_name='Foundations'
+        )
+        cls.elective = Module.objects.create(
+            examination_regulation=cls.regulation,
+            module_code='20-00-0100',
+            name='Elective',
+            credits=10,
+        )
+        cls.user = User.objects.create_user(
+            username='student', password='secret',
+            examination_regulation=cls.regulation, semester=1,
+        )
+
+    def add_milestone(self, order_index, rule_payload, **fields):
+        return MilestoneDefinition.objects.create(
+            examination_regulation=self.regulation,
+            order_index=order_index,
+            type=fields.pop('type', 'cp_threshold'),
+            label=f'Milestone {order_index}',
+            rule_payload=rule_payload,
+            **fields
+        )
+
+    def complete(self, module, status='completed'):
+        UserModuleCompletion.objects.update_or_create(
+            user=self.user, module=module, defaults={'status': status}
+        )
+        return evaluate_milestones(self.user, [module])
+
+    def progress(self, milestone):
+        return MilestoneProgress.objects.get(user=self.user, milestone=milestone)
+
+
+class MilestoneCreditRuleTests(MilestoneTestCase):
+    """cp_required and min_cp compare the user's completed credits."""
+
+    def test_cp_required(self):
+        milestone = self.add_milestone(1, {'cp_required': 15})
+
+        evaluate_milestones(self.user)
+        self.assertEqual(self.progress(milestone).status, 'available')
+
+        self.complete(self.foundations[0])
+        progress = self.progress(milestone)
+        self.assertEqual(progress.status, 'in_progress')
+        self.assertEqual(progress.computed_explanation, '5/15 CP completed')
+
+        self.complete(self.elective)
+        progress = self.progress(milestone)
+        self.assertEqual(progress.status, 'completed')
+        self.assertEqual(progress.computed_explanation, '15/15 CP completed')
+
+    def test_min_cp(self):
+        milestone = self.add_milestone(1, {'min_cp': 10}, type='thesis')
+
+        self.complete(self.elective)
+        self.assertEqual(self.progress(milestone).status, 'completed')
+
+    def test_only_completed_modules_count(self):
+        milestone = self.add_milestone(1, {'cp_required': 10})
+
+        self.complete(self.elective, status='in_progress')
+        self.assertEqual(self.progress(milestone).computed_explanation, '0/10 CP completed')
+
+    def test_total_credits_from_caller(self):
+        milestone = self.add_milestone(1, {'cp_required': 10})
+
+        evaluate_milestones(self.user, [self.elective], total_credits=10)
+        self.assertEqual(self.progress(milestone).status, 'completed')
+
+
+class MilestoneGroupRuleTests(MilestoneTestCase):
+    """group milestones need every module of the group and ignore other modules."""
+
+    def test_every_group_module_required(self):
+        milestone = self.add_milestone(1, {'group': 'Foundations'}, type='module_group')
+
+        self.complete(self.foundations[0])
+        progress = self.progress(milestone)
+        self.assertEqual(progress.status, 'in_progress')
+        self.assertEqual(progress.computed_explanation, '1/2 modules completed in Foundations')
+
+        self.complete(self.foundations[1])
+        self.assertEqual(self.progress(milestone).status, 'completed')
+
+    def test_other_modules_do_not_affect_group(self):
+        milestone = self.add_milestone(1, {'group': 'Foundations'}, type='module_group')
+
+        self.assertEqual(self.complete(self.elective), [])
+        self.assertFalse(MilestoneProgress.objects.filter(milestone=milestone).exists())
+
+    def test_empty_group_is_never_completed(self):
+        milestone = self.add_milestone(1, {'group': 'Missing'}, type='module_group')
+
+        evaluate_milestones(self.user)
+        self.assertEqual(self.progress(milestone).status, 'available')
+
+
+class MilestoneStatusTests(MilestoneTestCase):
+    """Status transitions, achieved_at and the bulk create/update path."""
+
+    def test_achieved_at_set_and_cleared(self):
+        milestone = self.add_milestone(1, {'cp_required': 10})
+
+        self.complete(self.elective)
+        achieved_at = self.progress(milestone).achieved_at
+        self.assertIsNotNone(achieved_at)
+
+        # Re-evaluating a completed milestone keeps the original timestamp
+        evaluate_milestones(self.user)
+        self.assertEqual(self.progress(milestone).achieved_at, achieved_at)
+
+        self.complete(self.elective, status='failed')
+        progress = self.progress(milestone)
+        self.assertEqual(progress.status, 'available')
+        self.assertIsNone(progress.achieved_at)
+
+    def test_overdue(self):
+        milestone = self.add_milestone(1, {'cp_required': 30}, expected_by_semester=2)
+        self.user.semester = 3
+        self.user.save(update_fields=['semester'])
+
+        self.complete(self.elective)
+        self.assertEqual(self.progress(milestone).status, 'overdue')
+
+    def test_bulk_create_then_update(self):
+        milestones = [
+            self.add_milestone(1, {'cp_required': 5}),
+            self.add_milestone(2, {'cp_required': 100}),
+            self.add_milestone(3, {'group': 'Foundations'}, type='module_group'),
+        ]
+
+        with self.assertNumQueries(6):
+            # milestones, credits, group sizes, group completions, existing rows, bulk insert
+            created = evaluate_milestones(self.user)
+        self.assertEqual(len(created), 3)
+        self.assertTrue(all(progress.status == 'available' for progress in created))
+
+        UserModuleCompletion.objects.create(user=self.user, module=self.elective, status='completed')
+        changed = evaluate_milestones(self.user)
+        # The group milestone did not change and is not written again
+        self.assertEqual(
+            sorted(progress.milestone_id for progress in changed),
+            [milestones[0].pk, milestones[1].pk]
+        )
+        self.assertEqual(self.progress(milestones[0]).status, 'completed')
+        self.assertEqual(self.progress(milestones[1]).status, 'in_progress')
+        self.assertEqual(MilestoneProgress.objects.filter(user=self.user).count(), 3)
+
+        self.assertEqual(evaluate_milestones(self.user), [])
+
+
+class PrerequisiteGraphTests(APITestCase):
+    """Transitive prerequisites, ordering, cycles and semester plans."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.regulation = create_regulation()
+        # a <- b <- c, a <- d, e on its own
+        cls.modules = {
+            name: Module.objects.create(
+                examination_regulation=cls.regulation,
+                module_code=f'20-00-000{index}',
+                name=name,
+                credits=credits,
+                category='Pflichtbereich',
+            )
+            for index, (name, credits) in enumerate(
+                [('a', 10), ('b', 10), ('c', 5), ('d', 5), ('e', 10)]
+            )
+        }
+        cls.modules['b'].prerequisites.add(cls.modules['a'])
+        cls.modules['c'].prerequisites.add(cls.modules['b'])
+        cls.modules['d'].prerequisites.add(cls.modules['a'])
+        cls.user = User.objects.create_user(
+            username='student', password='secret', examination_regulation=cls.regulation
+        )
+
+    def ids(self, *names):
+        return [self.modules[name].pk for name in names]
+
+    def test_all_prerequisites(self):
+        graph = PrerequisiteGraph.build(self.regulation.id)
+        self.assertEqual(graph.all_prerequisites(self.modules['c'].pk), set(self.ids('a', 'b')))
+        self.assertEqual(graph.all_prerequisites(self.modules['a'].pk), set())
+
+    def test_topological_order(self):
+        graph = PrerequisiteGraph.build(self.regulation.id)
+        order = graph.topological_order(self.ids('c', 'd', 'b', 'a'))
+        self.assertEqual(order, self.ids('a', 'b', 'd', 'c'))
+
+    def test_cycle(self):
+        self.assertIsNone(PrerequisiteGraph.build(self.regulation.id).find_cycle())
+
+        self.modules['a'].prerequisites.add(self.modules['c'])
+        graph = PrerequisiteGraph.build(self.regulation.id)
+        self.assertEqual(graph.find_cycle(), ['20-00-0000', '20-00-0002', '20-00-0001', '20-00-0000'])
+        with self.assertRaises(PrerequisiteCycleError):
+            graph.topological_order(self.ids('a', 'b', 'c'))
+
+    def test_plan_semesters(self):
+        graph = PrerequisiteGraph.build(self.regulation.id)
+        plan = graph.plan_semesters(self.ids('c', 'd', 'e'), max_credits=20)
+
+        placed = {module['name']: index for index, semester in enumerate(plan) for module in semester}
+        self.assertEqual(set(placed), {'a', 'b', 'c', 'd', 'e'})
+        self.assertLess(placed['a'], placed['b'])
+        self.assertLess(placed['b'], placed['c'])
+        self.assertLess(placed['a'], placed['d'])
+        self.assertTrue(all(sum(module['credits'] for module in semester) <= 20 for semester in plan))
+
+        # Completed prerequisites are not planned again
+        plan = graph.plan_semesters(self.ids('c'), completed_ids=self.ids('a'))
+        self.assertEqual([[module['name'] for module in semester] for semester in plan], [['b'], ['c']])
+
+    def test_semester_plan_view(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get('/api/user/semester-plan/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_credits'], 40)
+
+    def test_semester_plan_requires_regulation(self):
+        user = User.objects.create_user(username='newcomer', password='secret')
+        self.client.force_authenticate(user)
+        response = self.client.get('/api/user/semester-plan/')
+        self.assertEqual(response.status_code, 400)
+
+    def test_import_rejects_cycle(self):
+        modules = [
+            {'module_code': '20-00-1000', 'name_de': 'X', 'prerequisites': ['20-00-1001']},
+            {'module_code': '20-00-1001', 'name_de': 'Y', 'prerequisites': ['20-00-1000']},
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            modules_file = os.path.join(directory, 'modules.json')
+            with open(modules_file, 'w') as f:
+                json.dump(modules, f)
+            with self.assertRaisesMessage(CommandError, 'Prerequisite cycle detected'):
+                call_command(
+                    'import_course_data', modules_file=modules_file,
+                    careers_file=os.path.join(directory, 'missing.json'), stdout=io.StringIO()
+                )
+
+        self.assertFalse(Module.objects.filter(module_code='20-00-1000').exists())
+
+    def test_import_writes_prerequisites(self):
+        modules = [
+            {'module_code': '20-00-1000', 'name_de': 'X'},
+            {'module_code': '20-00-1001', 'name_de': 'Y', 'prerequisites': ['20-00-1000']},
+        ]
+        with tempfile.TemporaryDirectory() as directory, override_settings(
+            CATALOG_BUNDLE_DIR=directory, SEARCH_INDEX_PATH=os.path.join(directory, 'index.json')
+        ):
+            modules_file = os.path.join(directory, 'modules.json')
+            with open(modules_file, 'w') as f:
+                json.dump(modules, f)
+            call_command(
+                'import_course_data', '--bulk', modules_file=modules_file,
+                careers_file=os.path.join(directory, 'missing.json'), stdout=io.StringIO()
+            )
+
+        dependent = Module.objects.get(module_code='20-00-1001')
+        self.assertEqual(
+            list(dependent.prerequisites.values_list('module_code', flat=True)), ['20-00-1000']
+        )
+
+
+class BulkImportTests(APITestCase):
+    """import_course_data --bulk writes only what changed and bumps the catalog version."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        settings_override = override_settings(
+            CATALOG_BUNDLE_DIR=self.directory,
+            SEARCH_INDEX_PATH=os.path.join(self.directory, 'index.json'),
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.careers = [
+            {'id': 'backend', 'title_en': 'Backend Developer', 'title_de': 'Backend-Entwickler'},
+            {'id': 'data', 'title_en': 'Data Scientist', 'title_de': 'Data Scientist'},
+        ]
+        self.modules = [
+            {'module_code': '20-00-0001', 'name_de': 'Datenbanken', 'credits': 5,
+             'category': 'Pflichtbereich', 'career_relevance': {'backend': 80, 'data': 40}},
+            {'module_code': '20-00-0002', 'name_de': 'Statistik', 'credits': 5,
+             'category': 'Pflichtbereich', 'career_relevance': {'data': 90}},
+        ]
+
+    def run_import(self):
+        for name, data in (('careers.json', self.careers), ('modules.json', self.modules)):
+            with open(os.path.join(self.directory, name), 'w') as f:
+                json.dump(data, f)
+        out = io.StringIO()
+        call_command(
+            'import_course_data', '--bulk',
+            modules_file=os.path.join(self.directory, 'modules.json'),
+            careers_file=os.path.join(self.directory, 'careers.json'),
+            stdout=out,
+        )
+        return out.getvalue()
+
+    def relevances(self):
+        return dict(
+            ((module_code, career_id), score)
+            for module_code, career_id, score in ModuleCareerRelevance.objects.values_list(
+                'module__module_code', 'career_path__career_id', 'relevance_score'
+            )
+        )
+
+    def test_insert(self):
+        output = self.run_import()
+
+        self.assertIn('Modules: 2 inserted, 0 updated, 0 unchanged', output)
+        self.assertIn('Module-career relevances: 3 inserted, 0 updated, 0 deleted, 0 unchanged', output)
+        self.assertEqual(Module.objects.get(module_code='20-00-0001').name, 'Datenbanken')
+        self.assertEqual(self.relevances(), {
+            ('20-00-0001', 'backend'): 80,
+            ('20-00-0001', 'data'): 40,
+            ('20-00-0002', 'data'): 90,
+        })
+
+    def test_update_unchanged_and_deleted(self):
+        self.run_import()
+        module_ids = dict(Module.objects.values_list('module_code', 'id'))
+
+        self.modules[0]['credits'] = 6
+        self.modules[0]['career_relevance'] = {'backend': 70}
+        output = self.run_import()
+
+        self.assertIn('Modules: 0 inserted, 1 updated, 1 unchanged', output)
+        self.assertIn('Module-career relevances: 0 inserted, 1 updated, 1 deleted, 1 unchanged', output)
+        self.assertEqual(dict(Module.objects.values_list('module_code', 'id')), module_ids)
+        self.assertEqual(Module.objects.get(module_code='20-00-0001').credits, 6)
+        self.assertEqual(self.relevances(), {
+            ('20-00-0001', 'backend'): 70,
+            ('20-00-0002', 'data'): 90,
+        })
+
+    def test_unchanged_import_writes_nothing(self):
+        self.run_import()
+        updated_at = dict(Module.objects.values_list('module_code', 'updated_at'))
+
+        output = self.run_import()
+
+        self.assertIn('Modules: 0 inserted, 0 updated, 2 unchanged', output)
+        self.assertIn('Module-career relevances: 0 inserted, 0 updated, 0 deleted, 3 unchanged', output)
+        self.assertEqual(dict(Module.objects.values_list('module_code', 'updated_at')), updated_at)
+
+    def test_catalog_version_bumped(self):
+        before = catalog_version(Module, CareerPath, ModuleCareerRelevance)
+        self.run_import()
+        self.assertNotEqual(catalog_version(Module, CareerPath, ModuleCareerRelevance), before)
+
+
+class ModuleSearchTests(APITestCase):
+    """Folding, compound matching and ranking of the module search."""
+
+    @classmethod
+    def setUpTestData(cls):
+        regulation = create_regulation()
+        cls.modules = {
+            name: Module.objects.create(
+                examination_regulation=regulation,
+                module_code=f'20-00-{index:04d}',
+                name=name,
+                learning_content=content,
+                credits=5,
+            )
+            for index, (name, content) in enumerate([
+                ('Übersetzerbau', 'Bau optimierender Übersetzer für imperative Sprachen'),
+                ('Softwaretechnik', 'Prozesse und Modelle der Softwareentwicklung'),
+                ('Software Praktikum', 'Technik des Testens, Entwicklung im Team'),
+                ('Netzwerke', 'Feuerwall und Routing; true und false in Protokollen'),
+            ])
+        }
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(SEARCH_INDEX_PATH=os.path.join(directory.name, 'index.json'))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def search(self, query, **params):
+        response = self.client.get('/api/modules/search/', {'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [result['name'] for result in response.data['results']]
+
+    def test_digraphs_are_not_folded(self):
+        self.assertEqual(tokenize('Feuer true Queue Übel'), ['feuer', 'true', 'queue', 'ubel'])
+
+    def test_umlaut_spellings(self):
+        build_search_index()
+
+        self.assertEqual(self.search('Übersetzer')[0], 'Übersetzerbau')
+        self.assertEqual(self.search('Uebersetzer')[0], 'Übersetzerbau')
+        self.assertEqual(self.search('ubersetzer')[0], 'Übersetzerbau')
+        self.assertEqual(self.search('feur', prefix='false'), [])
+
+    def test_compound_matching(self):
+        build_search_index()
+
+        # "softwaretechnik" is indexed under "software" and "technik" as well
+        self.assertIn('Softwaretechnik', self.search('Technik', prefix='false'))
+        # and an unknown compound query matches documents holding its parts
+        self.assertEqual(
+            sorted(self.search('Praktikumsnetzwerke', prefix='false')),
+            ['Netzwerke', 'Software Praktikum']
+        )
+
+    def test_name_matches_rank_first(self):
+        build_search_index()
+
+        self.assertEqual(self.search('Technik', prefix='false'), ['Softwaretechnik', 'Software Praktikum'])
+
+    def test_requests_do_not_build_the_index(self):
+        with mock.patch('api.search.build_search_index', side_effect=AssertionError('rebuilt')), \
+                self.assertLogs('api.search', 'WARNING'):
+            self.assertEqual(self.search('Netzwerke'), [])
+
+        build_search_index()
+        self.assertEqual(self.search('Netzwerke'), ['Netzwerke'])
+
+
+class ModulePaginationTests(APITestCase):
+    """The module cursor must visit every module once, even with repeated codes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for version in ('2015', '2022'):
+            regulation = create_regulation(version=version, effective_date=date(int(version), 10, 1))
+            create_modules(regulation, 3, name=f'Module {{i}} ({version})')
+
+    def test_pages_cover_every_module(self):
+        seen = []
+        response = self.client.get('/api/modules/', {'page_size': 2, 'fields': 'id,name'})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            for result in response.data['results']:
+                self.assertEqual(set(result), {'id', 'name'})
+                seen.append(result['id'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+
+        self.assertEqual(seen, sorted(Module.objects.values_list('id', flat=True)))
+
+
+class SetInterestsTests(APITestCase):
+    """set-interests replaces the user's interests with exactly the submitted set."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.careers = [
+            CareerPath.objects.create(career_id=f'career_{i}', title_en=f'Career {i}', title_de=f'Karriere {i}')
+            for i in range(3)
+        ]
+        cls.user = User.objects.create_user(username='student', password='secret')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+        self.kept = UserCareerInterest.objects.create(
+            user=self.user, career_path=self.careers[0], interest_level=80, is_primary=True
+        )
+        UserCareerInterest.objects.create(user=self.user, career_path=self.careers[1], interest_level=40)
+
+    def interests(self):
+        return dict(
+            UserCareerInterest.objects.filter(user=self.user).values_list(
+                'career_path__career_id', 'interest_level'
+            )
+        )
+
+    def test_replaces_the_set(self):
+        response = self.client.post('/api/user/career-interests/set-interests/', {'interests': [
+            {'career_id': 'career_0', 'interest_level': 60, 'is_primary': True},
+            {'career_id': 'career_2', 'interest_level': 90},
+            {'career_id': 'unknown'},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['unresolved'], ['unknown'])
+        self.assertEqual(self.interests(), {'career_0': 60, 'career_2': 90})
+        # Existing rows are updated in place, not recreated
+        self.assertTrue(UserCareerInterest.objects.filter(pk=self.kept.pk, interest_level=60).exists())
+
+    def test_last_duplicate_wins(self):
+        self.client.post('/api/user/career-interests/set-interests/', {'interests': [
+            {'career_id': 'career_2', 'interest_level': 10},
+            {'career_id': 'career_2', 'interest_level': 70},
+        ]}, format='json')
+
+        self.assertEqual(self.interests(), {'career_2': 70})
+
+    def test_empty_set_clears_interests(self):
+        response = self.client.post(
+            '/api/user/career-interests/set-interests/', {'interests': []}, format='json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.interests(), {})
+
+    def test_unchanged_interests_are_not_written(self):
+        updated_at = self.kept.updated_at
+        self.client.post('/api/user/career-interests/set-interests/', {'interests': [
+            {'career_id': 'career_0', 'interest_level': 80, 'is_primary': True},
+        ]}, format='json')
+
+        self.kept.refresh_from_db()
+        self.assertEqual(self.kept.updated_at, updated_at)
+
+
+
+HANDBOOK_PART = (
+    '\n'
+    '============================================================\n'
+    'PAGE 1\n'
+    '============================================================\n'
+    '\n'
+    ' \n'
+    'Modulhandbuch B. Sc. Informatik \n'
+    ' \n'
+    '12 \n'
+    ' \n'
+    'Modulhandbuch \n'
+    'B. Sc. Informatik \n'
+    ' \n'
+    'A Pflichtbereich \n'
+    ' \n'
+    'Modulbeschreibung \n'
+    'Modulname \n'
+    'Funktionale und objektorientierte Programmierkonzepte \n'
+    'Modul Nr. \n'
+    '20-00-1014 \n'
+    'Leistungspunkte \n'
+    '10 CP \n'
+    '1 \n'
+    'Kurse des Moduls \n'
+    '20-00-1014-iv Funktionale Programmierung 10 integrierte Veranstaltung 6 \n'
+    '2 \n'
+    'Lerninhalt \n'
+    'Funktionale Programmierung mit Racket \n'
+    'Modulbeschreibung \n'
+    ' \n'
+    'Modulname \n'
+    'Mathematik I für Informatik \n'
+    'Modul Nr. \n'
+    '04-10-\n'
+    '0118/de \n'
+    'Leistungspun\n'
+    'kte \n'
+    '9 CP \n'
+    'Arbeitsaufwand \n'
+    '270 h \n'
+    'Selbststudium \n'
+    '180 h \n'
+    'Moduldauer \n'
+    '1 Semester \n'
+    'Angebotsturnus \n'
+    'Jedes 2. \n'
+    'Semester \n'
+    'Sprache \n'
+    'Deutsch \n'
+    'Modulverantwortliche Person \n'
+    'Prof. Dr. Ulrich Kohlenbach \n'
+    '1 \n'
+    'Kurse des Moduls \n'
+    'Kurs Nr. \n'
+    ' Kursname \n'
+    'Arbeitsaufwand \n'
+    '(CP) \n'
+    'Lehrform \n'
+    'SWS \n'
+    '04-00-0128-\n'
+    'vu \n'
+    'Mathematik I \n'
+    '0 \n'
+    'Vorlesung \n'
+    'und Übung \n'
+    '6 \n'
+    '2 \n'
+    'Lerninhalt \n'
+    ' \n'
+    'Mengen, Relationen, Funktionen \n'
+    ' \n'
+    '3 \n'
+    'Qualifikationsziele / Lernergebnisse \n'
+    'Beherrschung der mengentheoretischen Sprechweise \n'
+    '4 \n'
+    'Voraussetzung für die Teilnahme \n'
+    'Keine \n'
+    '5 \n'
+    'Prüfungsform \n'
+    'Klausur \n'
+)
+
+
+class ModuleHandbookParserTests(APITestCase):
+    """parse_module_handbook on a small handbook excerpt."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        with open(os.path.join(self.directory, 'MHB-part-1.txt'), 'w', encoding='utf-8') as f:
+            f.write(HANDBOOK_PART)
+        with open(os.path.join(self.directory, 'modules.json'), 'w', encoding='utf-8') as f:
+            json.dump([{'module_code': '04-10-0118', 'name_en': 'Mathematics I',
+                        'career_relevance': {'data': 60}}], f)
+
+    def parse(self):
+        output = os.path.join(self.directory, 'handbook.json')
+        out = io.StringIO()
+        call_command(
+            'parse_module_handbook', input_dir=self.directory, output=output,
+            relevance_from=os.path.join(self.directory, 'modules.json'), workers=1, stdout=out,
+        )
+        with open(output, encoding='utf-8') as f:
+            return {module['module_code']: module for module in json.load(f)}, out.getvalue()
+
+    def test_modules(self):
+        modules, _ = self.parse()
+
+        self.assertEqual(list(modules), ['04-10-0118', '20-00-1014'])
+        programming = modules['20-00-1014']
+        self.assertEqual(programming['name_de'], 'Funktionale und objektorientierte Programmierkonzepte')
+        self.assertEqual(programming['credits'], 10)
+        self.assertEqual(programming['category'], 'Pflichtbereich')
+        self.assertEqual(programming['learning_content'], 'Funktionale Programmierung mit Racket')
+        self.assertEqual(programming['courses'], [{
+            'course_code': '20-00-1014-iv', 'name': 'Funktionale Programmierung',
+            'credits': 10.0, 'teaching_form': 'integrierte Veranstaltung', 'sws': 6.0,
+        }])
+
+    def test_wrapped_language_suffixed_code(self):
+        modules, _ = self.parse()
+
+        # "04-10-" / "0118/de" in the handbook, matched to the catalog code
+        mathematics = modules['04-10-0118']
+        self.assertEqual(mathematics['name_de'], 'Mathematik I für Informatik')
+        self.assertEqual(mathematics['credits'], 9)
+        self.assertEqual(mathematics['workload_hours'], 270)
+        self.assertEqual(mathematics['offering_frequency'], 'Jedes 2. Semester')
+        self.assertEqual(mathematics['courses'][0]['course_code'], '04-00-0128-vu')
+        self.assertEqual(mathematics['courses'][0]['teaching_form'], 'Vorlesung und Übung')
+        self.assertEqual(mathematics['prerequisites_text'], 'Keine')
+        self.assertEqual(mathematics['exam_form'], 'Klausur')
+        self.assertEqual(mathematics['name_en'], 'Mathematics I')
+        self.assertEqual(mathematics['career_relevance'], {'data': 60})
+
+    def test_unchanged_parts_are_reused(self):
+        self.parse()
+        _, output = self.parse()
+
+        self.assertIn('Parsed 0 part files, reused 1 unchanged', output)
+
+    def test_reused_part_inherits_changed_category(self):
+        # The second part starts without a section divider, so its modules
+        # inherit the category the first part ends with
+        second_part = HANDBOOK_PART.replace(
+            'Modulhandbuch \nB. Sc. Informatik \n \nA Pflichtbereich \n', ''
+        ).replace(
+            '20-00-1014', '20-00-2014'
+        ).replace('0118/de', '0119/de')
+        with open(os.path.join(self.directory, 'MHB-part-2.txt'), 'w', encoding='utf-8') as f:
+            f.write(second_part)
+        modules, _ = self.parse()
+        self.assertEqual(modules['20-00-2014']['category'], 'Pflichtbereich')
+
+        with open(os.path.join(self.directory, 'MHB-part-1.txt'), 'w', encoding='utf-8') as f:
+            f.write(HANDBOOK_PART.replace('A Pflichtbereich', 'B Wahlpflichtbereich'))
+        modules, output = self.parse()
+
+        self.assertIn('Parsed 1 part files, reused 1 unchanged', output)
+        self.assertEqual(modules['20-00-1014']['category'], 'Wahlpflichtbereich')
+        self.assertEqual(modules['20-00-2014']['category'], 'Wahlpflichtbereich')
+
+
+class PopularityFallbackTests(APITestCase):
+    """Users without career interests get popular modules in a stable per-user order."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.regulation = create_regulation()
+        cls.electives = create_modules(
+            cls.regulation, 30, name='Elective {i}', category='Wahlpflichtbereich'
+        )
+        cls.mandatory = Module.objects.create(
+            examination_regulation=cls.regulation,
+            module_code='20-00-0100',
+            name='Mandatory',
+            credits=10,
+            category='Pflichtbereich',
+        )
+        # Elective 29 is the most taken, then 28, then 27
+        for i in range(3):
+            other = User.objects.create_user(username=f'other_{i}', password='secret')
+            for module in cls.electives[27 + i:] + [cls.mandatory]:
+                UserModuleCompletion.objects.create(user=other, module=module, status='completed')
+        cls.user = User.objects.create_user(
+            username='student', password='secret', examination_regulation=cls.regulation
+        )
+        rebuild_module_popularity()
+
+    def test_ranking(self):
+        ranks = dict(
+            ModulePopularity.objects.filter(category='Wahlpflichtbereich').values_list('module_id', 'rank')
+        )
+        self.assertEqual(
+            [ranks[module.pk] for module in self.electives[27:]], [3, 2, 1]
+        )
+        # Ties are broken by module code
+        self.assertEqual(ranks[self.electives[0].pk], 4)
+
+    def test_stable_per_user_and_prefix(self):
+        first = fallback_module_ids(self.user.pk, [], self.regulation.id, 10)
+
+        self.assertEqual(fallback_module_ids(self.user.pk, [], self.regulation.id, 10), first)
+        self.assertEqual(fallback_module_ids(self.user.pk, [], self.regulation.id, 5), first[:5])
+        self.assertNotEqual(fallback_module_ids(self.user.pk + 1, [], self.regulation.id, 10), first)
+
+    def test_order_follows_rank(self):
+        ranks = dict(ModulePopularity.objects.values_list('module_id', 'rank'))
+        picks = fallback_module_ids(self.user.pk, [], self.regulation.id, 10)
+
+        self.assertNotIn(self.mandatory.pk, picks)
+        for position, module_id in enumerate(picks):
+            # The per-user shuffle moves a module down by less than the window
+            self.assertLess(position - (ranks[module_id] - 1), SHUFFLE_WINDOW)
+            self.assertLessEqual(ranks[module_id], 10 + SHUFFLE_WINDOW)
+
+    def test_ties_across_regulations_are_ordered_by_module(self):
+        regulation = create_regulation(
+            name='M.Sc. Informatik', version='2023', program='M.Sc. Informatik',
+            total_credits_required=120, effective_date=date(2023, 10, 1),
+        )
+        create_modules(regulation, 5, name='Elective {i}', category='Wahlpflichtbereich')
+        rebuild_module_popularity()
+        # Store the rows in reverse, so the table order disagrees with module_id
+        rows = list(ModulePopularity.objects.order_by('-module_id'))
+        ModulePopularity.objects.all().delete()
+        ModulePopularity.objects.bulk_create(rows)
+        expected = list(
+            ModulePopularity.objects.filter(category__in=['Wahlpflichtbereich', 'Informatik-Wahlbereich'])
+            .order_by('rank', 'module_id').values_list('module_id', flat=True)[:10]
+        )
+
+        # Without jitter the picks come out in candidate order
+        with mock.patch('api.popularity.random.Random') as rng:
+            rng.return_value.random.return_value = 0
+            self.assertEqual(fallback_module_ids(self.user.pk, [], None, 10), expected)
+
+    def test_recommendations_without_interests(self):
+        UserModuleCompletion.objects.create(user=self.user, module=self.electives[29], status='completed')
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get('/api/recommendations/')
+
+        self.assertEqual(response.status_code, 200)
+        ids = [recommendation['id'] for recommendation in response.data['recommendations']]
+        self.assertEqual(ids, fallback_module_ids(self.user.pk, [self.electives[29].pk], self.regulation.id, 10))
+        self.assertNotIn(self.electives[29].pk, ids)
+        self.assertFalse(response.data['user_stats']['career_interests_set'])
+
+
+class GenerateCohortTests(APITestCase):
+    """generate_cohort leaves every generated user with a current progress snapshot."""
+
+    @classmethod
+    def setUpTestData(cls):
+        regulation = create_regulation()
+        for i in range(40):
+            Module.objects.create(
+                examination_regulation=regulation,
+                module_code=f'20-00-{i:04d}',
+                name=f'Module {i}',
+                credits=5 + i % 2 * 5,
+                category='Pflichtbereich' if i < 20 else 'Wahlpflichtbereich',
+                group_name='Foundations' if i < 3 else '',
+            )
+        MilestoneDefinition.objects.create(
+            examination_regulation=regulation, order_index=1, type='cp_threshold',
+            label='30 CP', rule_payload={'cp_required': 30},
+        )
+        MilestoneDefinition.objects.create(
+            examination_regulation=regulation, order_index=2, type='module_group',
+            label='Foundations', rule_payload={'group': 'Foundations'},
+        )
+
+    def test_snapshots_match_completions(self):
+        call_command('generate_cohort', users=12, chunk_size=5, stdout=io.StringIO())
+
+        users = list(User.objects.filter(username__startswith='cohort_'))
+        self.assertEqual(len(users), 12)
+        for user in users:
+            snapshot = UserProgressSnapshot.objects.get(user=user)
+            completed = UserModuleCompletion.objects.filter(user=user, status='completed')
+            self.assertEqual(snapshot.total_credits, sum(c.module.credits for c in completed))
+            self.assertEqual(snapshot.completed_count, len(completed))
+            self.assertEqual(snapshot.total_module_count, 40)
+
+            progress = MilestoneProgress.objects.get(user=user, milestone__order_index=1)
+            self.assertEqual(progress.computed_explanation, f'{snapshot.total_credits}/30 CP completed')
+            self.assertTrue(MilestoneProgress.objects.filter(user=user, milestone__order_index=2).exists())
+            # The API's evaluation agrees with the generated rows
+            self.assertEqual(evaluate_milestones(user), [])
+
+
+class ReminderTests(APITestCase):
+    """generate_reminders writes due reminders once and processes users in chunks."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = date(2026, 3, 1)
+        regulation = create_regulation()
+        cls.orientation = MilestoneDefinition.objects.create(
+            examination_regulation=regulation, order_index=1, type='cp_threshold',
+            label='Orientation', rule_payload={'cp_required': 30}, expected_by_semester=2,
+        )
+        cls.registration = MilestoneDefinition.objects.create(
+            examination_regulation=regulation, order_index=2, type='deadline',
+            label='Exam registration', expected_by_date=date(2026, 3, 10),
+        )
+        MilestoneDefinition.objects.create(
+            examination_regulation=regulation, order_index=3, type='deadline',
+            label='Far away', expected_by_date=date(2026, 6, 1),
+        )
+        cls.users = [
+            User.objects.create_user(
+                username=f'student_{i}', password='secret',
+                examination_regulation=regulation, semester=semester,
+            )
+            for i, semester in enumerate([1, 2, 3, 4, 5])
+        ]
+
+    def generate(self, **kwargs):
+        return generate_reminders(today=self.today, **kwargs)
+
+    def reminders(self, user):
+        return sorted(
+            Notification.objects.filter(user=user).values_list('type', 'related_milestone__label', 'priority')
+        )
+
+    def test_due_reminders(self):
+        MilestoneProgress.objects.create(user=self.users[4], milestone=self.orientation, status='completed')
+
+        self.assertEqual(self.generate(), 5 + 3)
+
+        self.assertEqual(self.reminders(self.users[0]), [('deadline_warning', 'Exam registration', 'high')])
+        self.assertEqual(self.reminders(self.users[1]), [
+            ('deadline_warning', 'Exam registration', 'high'),
+            ('milestone_reminder', 'Orientation', 'medium'),
+        ])
+        self.assertIn(('milestone_reminder', 'Orientation', 'high'), self.reminders(self.users[2]))
+        # Completed milestones are not reminded
+        self.assertEqual(self.reminders(self.users[4]), [('deadline_warning', 'Exam registration', 'high')])
+
+    def test_unread_reminder_is_not_repeated(self):
+        self.generate()
+        self.assertEqual(self.generate(), 0)
+
+    def test_read_reminder_repeats_after_repeat_days(self):
+        self.generate()
+        user = self.users[1]
+        Notification.objects.filter(user=user).update(read_at=timezone.now())
+        self.assertEqual(self.generate(), 0)
+
+        Notification.objects.filter(user=user).update(
+            created_at=timezone.now() - timedelta(days=8)
+        )
+        self.assertEqual(self.generate(repeat_days=7), 2)
+
+    def test_chunks(self):
+        # One query for the milestones, then per chunk of two users: users,
+        # completed milestones, recent reminders and one insert; one final empty chunk
+        with self.assertNumQueries(1 + 3 * 4 + 1):
+            created = self.generate(chunk_size=2)
+
+        # Every user gets the deadline, semesters 2 to 5 the orientation reminder
+        self.assertEqual(created, 9)
+        self.assertEqual(
+            Notification.objects.filter(type='deadline_warning').count(), len(self.users)
+        )
+
+    def test_semester_and_date_milestone_gets_both_reminders(self):
+        MilestoneDefinition.objects.filter(pk=self.orientation.pk).update(expected_by_date=date(2026, 3, 5))
+
+        self.generate()
+
+        self.assertEqual(self.reminders(self.users[1]), [
+            ('deadline_warning', 'Exam registration', 'high'),
+            ('deadline_warning', 'Orientation', 'high'),
+            ('milestone_reminder', 'Orientation', 'medium'),
+        ])
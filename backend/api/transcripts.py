@@ -0,0 +1,207 @@
+"""
+Batch import of module completions.
+
+parse_transcript() turns a pasted TUCaN-style transcript ("Leistungsspiegel")
+into completion records; apply_completion_records() validates records
+against the user's examination regulation and upserts them with bulk
+queries in one transaction, recomputing derived progress only once.
+"""
+import re
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Module, UserModuleCompletion
+from .progress import on_completions_changed
+
+
+# "20-00-0004", "18-sm-1010" or the short "18-0000", optionally followed by
+# a course suffix such as "-iv" and the handbook's language suffix ("/de")
+MODULE_CODE_RE = re.compile(
+    r'\b(\d{2}-[0-9a-z]{2}-\d{4}|\d{2}-\d{4})(?:-[a-z]{1,3})?(?:/[a-z]{2})?(?![\w/-])',
+    re.IGNORECASE
+)
+# Anything that looks like the start of a module code, parseable or not
+CODE_LIKE_RE = re.compile(r'(?<![\w/.,-])\d{2}-[0-9a-z]+', re.IGNORECASE)
+# Only the grade steps used at TU Darmstadt, so credits like "10,0" are not mistaken for grades
+GRADE_RE = re.compile(r'(?<![\d,.])([1-3][,.][037]|4[,.]0|5[,.]0)(?![\d,.])')
+SEMESTER_RE = re.compile(
+    r'\b(WiSe|WS|Wintersemester|SoSe|SS|Sommersemester)\s*(\d{4}|\d{2})(?:\s*/\s*\d{2,4})?\b',
+    re.IGNORECASE
+)
+FAILED_RE = re.compile(r'\bnicht bestanden\b|\bfailed\b', re.IGNORECASE)
+PASSED_RE = re.compile(r'\bbestanden\b|\bpassed\b', re.IGNORECASE)
+
+
+def normalize_semester(value):
+    """
+    Normalize semester spellings to the stored form ("WiSe 2022/23" ->
+    "WS2022", "SoSe 24" -> "SS2024"). Unrecognized values are returned as is.
+    """
+    match = SEMESTER_RE.search(value or '')
+    if not match:
+        return (value or '').strip()
+    term, year = match.groups()
+    prefix = 'WS' if term.lower().startswith('w') else 'SS'
+    if len(year) == 2:
+        year = f'20{year}'
+    return f'{prefix}{year}'
+
+
+def base_module_code(code):
+    """Strip the handbook's language suffix ("04-10-0118/de" -> "04-10-0118")."""
+    return code.split('/', 1)[0]
+
+
+def parse_transcript(text):
+    """
+    Extract completion records from pasted transcript text.
+
+    Every line containing a module code yields one record. The grade is the
+    first grade-like number after the code, except that a leading 5,0
+    followed by another grade is the credit column. A 5,0 or "nicht
+    bestanden" marks the module as failed, everything else as completed.
+
+    Returns (records, unparsed) where unparsed lists the stripped lines
+    that contain something code-like but no module code.
+    """
+    records = []
+    unparsed = []
+    for line in (text or '').splitlines():
+        code_match = MODULE_CODE_RE.search(line)
+        if not code_match:
+            if CODE_LIKE_RE.search(line):
+                unparsed.append(line.strip())
+            continue
+        rest = line[code_match.end():]
+
+        semester_match = SEMESTER_RE.search(rest)
+        semester_taken = ''
+        if semester_match:
+            semester_taken = normalize_semester(semester_match.group(0))
+            rest = rest[:semester_match.start()] + ' ' + rest[semester_match.end():]
+
+        grades = [Decimal(value.replace(',', '.')) for value in GRADE_RE.findall(rest)]
+        if len(grades) > 1 and grades[0] == Decimal('5.0'):
+            # "5,0 2,3": the 5,0 was the credit column
+            grades.pop(0)
+        grade = grades[0] if grades else None
+
+        failed = bool(FAILED_RE.search(rest))
+        if grade == Decimal('5.0') and PASSED_RE.search(rest) and not failed:
+            # Ungraded pass: the 5,0 was the credit column
+            grade = None
+
+        record = {
+            'module_code': code_match.group(1),
+            'status': 'failed' if failed or grade == Decimal('5.0') else 'completed',
+            'semester_taken': semester_taken,
+        }
+        if grade is not None:
+            record['grade'] = str(grade)
+        records.append(record)
+    return records, unparsed
+
+
+def apply_completion_records(user, records):
+    """
+    Upsert validated completion records for a user.
+
+    Each record names its module by `module` (primary key) or
+    `module_code`; modules outside the user's examination regulation count
+    as unresolved; a handbook language suffix ("/de") on a code is ignored.
+    Fields missing from a record keep their stored value, and new
+    completions without a status are recorded as completed.
+    Returns (completions, unresolved) where completions follow the order of
+    the records and unresolved lists the module references not found.
+    """
+    codes = {
+        base_module_code(record['module_code'])
+        for record in records if record.get('module_code')
+    }
+    ids = {record['module'] for record in records if record.get('module')}
+    modules = Module.objects.filter(Q(module_code__in=codes) | Q(pk__in=ids))
+    if user.examination_regulation_id:
+        modules = modules.filter(examination_regulation_id=user.examination_regulation_id)
+    modules = list(modules.order_by('id'))
+    by_id = {module.pk: module for module in modules}
+    by_code = {}
+    for module in modules:
+        by_code.setdefault(module.module_code, module)
+
+    # Resolve every record; a module listed twice keeps its last record
+    resolved = {}
+    unresolved = []
+    for record in records:
+        if record.get('module'):
+            module = by_id.get(record['module'])
+        else:
+            module = by_code.get(base_module_code(record['module_code']))
+        if module is None:
+            unresolved.append(record.get('module') or record.get('module_code'))
+            continue
+        resolved.pop(module.pk, None)
+        resolved[module.pk] = (module, record)
+
+    now = timezone.now()
+    with transaction.atomic():
+        existing = {
+            completion.module_id: completion
+            for completion in UserModuleCompletion.objects.select_for_update().filter(
+                user=user, module_id__in=list(resolved)
+            )
+        }
+
+        completions, to_create, to_update, changed_modules = [], [], [], []
+        for module, record in resolved.values():
+            completion = existing.get(module.pk)
+            if completion is None:
+                completion = UserModuleCompletion(
+                    user=user, module=module, status=record.get('status', 'completed')
+                )
+                to_create.append(completion)
+                changed = True
+            else:
+                completion.module = module
+                changed = False
+
+            values = {
+                field: record[field]
+                for field in ('status', 'grade', 'semester_taken')
+                if field in record
+            }
+            if values.get('status', completion.status) == 'completed':
+                if completion.status != 'completed' or completion.completed_at is None:
+                    values['completed_at'] = now
+            else:
+                values['completed_at'] = None
+
+            for field, value in values.items():
+                if getattr(completion, field) != value:
+                    setattr(completion, field, value)
+                    changed = True
+
+            if changed:
+                changed_modules.append(module)
+                if completion.pk is not None:
+                    completion.updated_at = now
+                    to_update.append(completion)
+            completions.append(completion)
+
+        if to_update:
+            UserModuleCompletion.objects.bulk_update(
+                to_update, ['status', 'grade', 'semester_taken', 'completed_at', 'updated_at']
+            )
+        if to_create:
+            UserModuleCompletion.objects.bulk_create(
+                to_create,
+                update_conflicts=True,
+                unique_fields=['user', 'module'],
+                update_fields=['status', 'grade', 'semester_taken', 'completed_at', 'updated_at'],
+            )
+        if changed_modules:
+            on_completions_changed(user, changed_modules)
+
+    return completions, unresolved
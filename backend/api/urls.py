@@ -1,4 +1,4 @@
-from django.urls import path, include
+from django.urls import path, re_path, include
 from rest_framework.routers import DefaultRouter
 
 from . import views
@@ -32,15 +32,36 @@ urlpatterns = [
     # Test endpoint
     path('hello/', views.hello_world, name='hello'),
 
+    # Request metrics endpoint (Prometheus text format)
+    path('metrics/', views.metrics, name='metrics'),
+
+    # Server-sent events (notifications, milestone progress)
+    path('events/', views.notification_events, name='events'),
+    path('events/ticket/', views.EventStreamTicketView.as_view(), name='events-ticket'),
+
     # Recommendation endpoint
     path('recommendations/', views.RecommendationView.as_view(), name='recommendations'),
 
+    # Completion statistics endpoint
+    path('user/completion-stats/', views.CompletionStatsView.as_view(), name='completion-stats'),
+
+    # Semester planning endpoint
+    path('user/semester-plan/', views.SemesterPlanView.as_view(), name='semester-plan'),
+
     # Support contact endpoint
     path('support/contact/', views.SupportContactView.as_view(), name='support-contact'),
 
     # Master programs endpoint
     path('master-programs/', views.MasterProgramView.as_view(), name='master-programs'),
 
+    # Content-hashed catalog bundles (see api/bundles.py)
+    path('catalog/manifest/', views.CatalogManifestView.as_view(), name='catalog-manifest'),
+    re_path(
+        r'^catalog/bundles/(?P<name>catalog-\d+-[a-z]{2}\.[0-9a-f]{16}\.json)$',
+        views.catalog_bundle,
+        name='catalog-bundle'
+    ),
+
     # Include router URLs
     path('', include(router.urls)),
 ]
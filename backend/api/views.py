@@ -1,8 +1,18 @@
-from django.http import HttpResponse
+import os
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import require_GET
 from django.utils import timezone
-from django.db.models import Sum, Avg, Q, F
+from django.db import transaction
+from django.db.models import Count, Prefetch, Sum, Avg, Q, F
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.views import APIView
@@ -11,7 +21,8 @@ from .models import (
     Module, ExaminationRegulation, MilestoneDefinition,
     MilestoneProgress, UserModuleCompletion, CareerGoal,
     SupportService, Notification, CareerPath, ModuleCareerRelevance,
-    UserCareerInterest, CareerOffer, MasterProgram
+    UserCareerInterest, CareerOffer, CareerOfferField, MasterProgram,
+    ModuleSimilarity
 )
 from .serializers import (
     ModuleSerializer, ModuleDetailSerializer, UserModuleCompletionSerializer,
@@ -20,8 +31,23 @@ from .serializers import (
     NotificationSerializer, SupportServiceSerializer,
     CareerPathSerializer, CareerPathDetailSerializer,
     UserCareerInterestSerializer, ModuleWithRelevanceSerializer,
-    CareerOfferSerializer, MasterProgramSerializer
+    CareerOfferSerializer, MasterProgramSerializer,
+    UserProgressSnapshotSerializer, CompletionRecordSerializer
 )
+from .async_views import AsyncAPIView, AsyncReadOnlyModelViewSet
+from .bundles import read_manifest
+from .cache import cache_catalog_response
+from .events import (
+    StreamCursor, authenticate_ticket, event_stream, initial_cursor, issue_stream_ticket,
+    pending_messages
+)
+from .middleware import METRICS
+from .pagination import ModuleCursorPagination, NotificationCursorPagination
+from .prerequisites import PrerequisiteCycleError, get_prerequisite_graph
+from .progress import get_progress_snapshot, on_completions_changed, refreshing_progress
+from .recommendations import get_recommendations
+from .search import get_search_index
+from .transcripts import apply_completion_records, parse_transcript
 
 
 # ============================================
@@ -33,23 +59,57 @@ def hello_world(request):
     return HttpResponse("Hello World from Gruppe 31!")
 
 
+def metrics(request):
+    """Per-view request metrics in the Prometheus text format"""
+    token = settings.METRICS_TOKEN
+    if not token:
+        return HttpResponse(status=403)
+    if request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponse(status=401)
+    return HttpResponse(
+        METRICS.render_prometheus(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
 # ============================================
 # MODULE VIEWS
 # ============================================
 
 class ModuleViewSet(viewsets.ReadOnlyModelViewSet):
     """
-    GET /modules/ - List all modules
+    GET /modules/ - List modules (cursor-paginated, ordered by id)
+    GET /modules/?fields=id,module_code,name - List only the given fields
     GET /modules/:id/ - Get module details
+    GET /modules/search/?q=... - Full-text search over the module catalog
+    GET /modules/:id/similar/ - Modules with similar learning content
     """
     queryset = Module.objects.all()
     permission_classes = [AllowAny]
+    pagination_class = ModuleCursorPagination
+    # Maximum SQL queries per action, checked by RequestMetricsMiddleware and api/tests.py
+    query_budgets = {'similar': 2}
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return ModuleDetailSerializer
         return ModuleSerializer
 
+    def get_requested_fields(self):
+        """Return the valid field names from the `fields` query parameter, if any."""
+        if self.action != 'list':
+            return None
+        fields = self.request.query_params.get('fields', '')
+        requested = [name.strip() for name in fields.split(',')]
+        valid = [name for name in requested if name in ModuleSerializer.Meta.fields]
+        return valid or None
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_requested_fields()
+        if fields:
+            kwargs['fields'] = fields
+        return super().get_serializer(*args, **kwargs)
+
     def get_queryset(self):
         """Filter modules by examination regulation if available"""
         queryset = Module.objects.all()
@@ -71,7 +131,109 @@ class ModuleViewSet(viewsets.ReadOnlyModelViewSet):
                 career_relevances__career_path__career_id=career_id
             ).distinct()
 
-        return queryset.order_by('module_code')
+        # Only load the columns the projection needs (plus the cursor key)
+        fields = self.get_requested_fields()
+        if fields:
+            queryset = queryset.only(*{'id', *fields})
+
+        return queryset.order_by('id')
+
+    @cache_catalog_response(Module, ModuleCareerRelevance, CareerPath)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_catalog_response(Module)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @action(detail=True, methods=['get'], url_path='prerequisites')
+    @cache_catalog_response(Module)
+    def all_prerequisites(self, request, pk=None):
+        """
+        GET /modules/:id/prerequisites/
+        Everything that must be finished before this module, in study order.
+        """
+        module = self.get_object()
+        graph = get_prerequisite_graph(module.examination_regulation_id)
+        required_ids = graph.all_prerequisites(module.id)
+
+        return Response({
+            'module_id': module.id,
+            'module_code': module.module_code,
+            'direct': [
+                graph.modules[module_id]
+                for module_id in graph.topological_order(graph.prerequisites[module.id])
+            ],
+            'all': [
+                graph.modules[module_id]
+                for module_id in graph.topological_order(required_ids)
+            ],
+            'total_credits': sum(graph.modules[module_id]['credits'] for module_id in required_ids),
+        })
+
+    @action(detail=True, methods=['get'], url_path='similar')
+    @cache_catalog_response(Module, ModuleSimilarity)
+    def similar(self, request, pk=None):
+        """
+        GET /modules/:id/similar/?limit=5
+        Modules of the same regulation with the most similar learning
+        content and objectives, read from the table built by
+        build_module_similarity.
+        """
+        module = self.get_object()
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+        except ValueError:
+            return Response({
+                'error': 'limit must be an integer'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        neighbours = ModuleSimilarity.objects.filter(module=module).select_related(
+            'similar_module'
+        ).order_by('rank')[:limit]
+        return Response({
+            'module_id': module.id,
+            'module_code': module.module_code,
+            'results': [
+                {**ModuleSerializer(neighbour.similar_module).data, 'score': neighbour.score}
+                for neighbour in neighbours
+            ],
+        })
+
+    @action(detail=False, methods=['get'], url_path='search')
+    def search(self, request):
+        """
+        GET /modules/search/?q=software&regulation=1&limit=20&prefix=true
+        Ranked full-text search over names, descriptions and learning
+        content. The last word is also matched as a prefix unless
+        prefix=false, so the endpoint can back a type-ahead field.
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({
+                'error': 'q is required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), 100)
+            regulation_id = request.query_params.get('regulation')
+            regulation_id = int(regulation_id) if regulation_id else None
+        except ValueError:
+            return Response({
+                'error': 'limit and regulation must be integers'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        prefix = request.query_params.get('prefix', 'true').lower() != 'false'
+
+        results = get_search_index().search(
+            query, limit=max(limit, 1), regulation_id=regulation_id, prefix=prefix
+        )
+        return Response({
+            'query': query,
+            'count': len(results),
+            'results': [
+                {**document, 'score': round(score, 3)}
+                for document, score in results
+            ],
+        })
 
 
 class UserModuleCompletionViewSet(viewsets.ModelViewSet):
@@ -79,6 +241,7 @@ class UserModuleCompletionViewSet(viewsets.ModelViewSet):
     ViewSet for user module completions.
     POST /user/modules/:id/complete - Mark module as completed
     DELETE /user/modules/:id/complete - Unmark module
+    POST /user/modules/batch/ - Import many completions at once
     """
     serializer_class = UserModuleCompletionSerializer
     permission_classes = [IsAuthenticated]
@@ -87,6 +250,24 @@ class UserModuleCompletionViewSet(viewsets.ModelViewSet):
         """Return only current user's module completions"""
         return UserModuleCompletion.objects.filter(user=self.request.user)
 
+    # Generic create/update/delete keep the progress snapshot and
+    # milestones in sync like the actions below
+    def perform_create(self, serializer):
+        with transaction.atomic(), refreshing_progress(self.request.user):
+            completion = serializer.save(user=self.request.user)
+            on_completions_changed(self.request.user, [completion.module])
+
+    def perform_update(self, serializer):
+        previous_module = serializer.instance.module
+        with transaction.atomic(), refreshing_progress(self.request.user):
+            completion = serializer.save()
+            on_completions_changed(self.request.user, {previous_module, completion.module})
+
+    def perform_destroy(self, instance):
+        with transaction.atomic(), refreshing_progress(self.request.user):
+            instance.delete()
+            on_completions_changed(self.request.user, [instance.module])
+
     @action(detail=True, methods=['post'], url_path='complete')
     def mark_complete(self, request, pk=None):
         """Mark a module as completed"""
@@ -97,35 +278,40 @@ class UserModuleCompletionViewSet(viewsets.ModelViewSet):
                 'error': 'Module not found'
             }, status=status.HTTP_404_NOT_FOUND)
 
-        # Check if completion already exists
-        completion, created = UserModuleCompletion.objects.get_or_create(
-            user=request.user,
-            module=module,
-            defaults={
-                'status': 'completed',
-                'completed_at': timezone.now()
-            }
-        )
+        with transaction.atomic(), refreshing_progress(request.user):
+            # Check if completion already exists
+            completion, created = UserModuleCompletion.objects.get_or_create(
+                user=request.user,
+                module=module,
+                defaults={
+                    'status': 'completed',
+                    'completed_at': timezone.now()
+                }
+            )
 
-        if not created:
-            # Update existing completion
-            completion.status = 'completed'
-            completion.completed_at = timezone.now()
-            completion.save()
+            if not created:
+                # Update existing completion
+                completion.status = 'completed'
+                completion.completed_at = timezone.now()
+                completion.save()
+
+            on_completions_changed(request.user, [module])
 
         serializer = self.get_serializer(completion)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
-    @action(detail=True, methods=['delete'], url_path='complete')
+    @mark_complete.mapping.delete
     def unmark_complete(self, request, pk=None):
         """Unmark a module (delete completion record)"""
         try:
             module = Module.objects.get(pk=pk)
-            completion = UserModuleCompletion.objects.get(
-                user=request.user,
-                module=module
-            )
-            completion.delete()
+            with transaction.atomic(), refreshing_progress(request.user):
+                completion = UserModuleCompletion.objects.get(
+                    user=request.user,
+                    module=module
+                )
+                completion.delete()
+                on_completions_changed(request.user, [module])
             return Response({
                 'message': 'Module unmarked successfully'
             }, status=status.HTTP_200_OK)
@@ -138,6 +324,130 @@ class UserModuleCompletionViewSet(viewsets.ModelViewSet):
                 'error': 'Module completion not found'
             }, status=status.HTTP_404_NOT_FOUND)
 
+    @action(detail=False, methods=['post'], url_path='batch')
+    def batch(self, request):
+        """
+        Import many completions in one request.
+
+        Body is either {"records": [{module|module_code, status, grade,
+        semester_taken}, ...]} or {"transcript": "<pasted TUCaN transcript>"}.
+        Everything is written in one transaction and progress, milestones
+        and recommendations are recomputed once. Transcript lines with a
+        code-like token that could not be parsed are returned in `unparsed`.
+        """
+        transcript = request.data.get('transcript')
+        unparsed = []
+        if transcript:
+            records, unparsed = parse_transcript(transcript)
+            if not records:
+                return Response({
+                    'error': 'No module codes found in transcript',
+                    'unparsed': unparsed,
+                }, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            records = request.data.get('records')
+            if not isinstance(records, list) or not records:
+                return Response({
+                    'error': 'records or transcript is required'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+        record_serializer = CompletionRecordSerializer(data=records, many=True)
+        record_serializer.is_valid(raise_exception=True)
+
+        completions, unresolved = apply_completion_records(
+            request.user, record_serializer.validated_data
+        )
+        serializer = self.get_serializer(completions, many=True)
+        return Response({
+            'message': f'Imported {len(completions)} module completions',
+            'completions': serializer.data,
+            'unresolved': unresolved,
+            'unparsed': unparsed,
+        }, status=status.HTTP_200_OK)
+
+
+class CompletionStatsView(APIView):
+    """
+    GET /user/completion-stats/
+    Returns the user's precomputed completion statistics.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        snapshot = get_progress_snapshot(request.user)
+        serializer = UserProgressSnapshotSerializer(snapshot)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class SemesterPlanView(APIView):
+    """
+    GET /user/semester-plan/?modules=1,2,3&max_credits=30
+    Plans the user's remaining modules into semesters, respecting
+    prerequisites. Without `modules`, all not yet completed or started
+    Pflichtbereich modules of the user's regulation are planned. Users
+    without an examination regulation get a 400.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        if not user.examination_regulation_id:
+            return Response({
+                'error': 'Set your examination regulation to plan semesters'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            max_credits = int(request.query_params.get('max_credits', 30))
+            requested_ids = [
+                int(module_id)
+                for module_id in request.query_params.get('modules', '').split(',')
+                if module_id.strip()
+            ]
+        except ValueError:
+            return Response({
+                'error': 'modules and max_credits must be integers'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if max_credits < 1:
+            return Response({
+                'error': 'max_credits must be positive'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        graph = get_prerequisite_graph(user.examination_regulation_id)
+
+        # In-progress modules count as done for planning purposes
+        taken_ids = set(UserModuleCompletion.objects.filter(
+            user=user,
+            status__in=['completed', 'in_progress']
+        ).values_list('module_id', flat=True))
+
+        if requested_ids:
+            target_ids = [module_id for module_id in requested_ids if module_id in graph.modules]
+        else:
+            target_ids = [
+                module_id for module_id, module in graph.modules.items()
+                if module['category'] == 'Pflichtbereich'
+            ]
+
+        try:
+            plan = graph.plan_semesters(target_ids, taken_ids, max_credits)
+        except PrerequisiteCycleError as exc:
+            return Response({
+                'error': f'Prerequisite cycle detected: {exc}'
+            }, status=status.HTTP_409_CONFLICT)
+
+        first_semester = (user.semester or 0) + 1
+        return Response({
+            'semesters': [
+                {
+                    'semester': first_semester + index,
+                    'credits': sum(module['credits'] for module in modules),
+                    'modules': modules,
+                }
+                for index, modules in enumerate(plan)
+            ],
+            'total_credits': sum(module['credits'] for modules in plan for module in modules),
+            'max_credits': max_credits,
+        }, status=status.HTTP_200_OK)
+
 
 # ============================================
 # MILESTONE VIEWS
@@ -188,13 +498,41 @@ class CareerPathViewSet(viewsets.ReadOnlyModelViewSet):
     """
     queryset = CareerPath.objects.filter(is_active=True)
     permission_classes = [AllowAny]
+    # Maximum SQL queries per action, checked by RequestMetricsMiddleware and api/tests.py
+    query_budgets = {'list': 2, 'retrieve': 2}
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return CareerPathDetailSerializer
         return CareerPathSerializer
 
+    def get_queryset(self):
+        """Annotate module counts (and top modules for details) in bulk"""
+        queryset = CareerPath.objects.filter(is_active=True).annotate(
+            module_count=Count('module_relevances')
+        )
+
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related(Prefetch(
+                'module_relevances',
+                queryset=ModuleCareerRelevance.objects.select_related(
+                    'module'
+                ).order_by('-relevance_score')[:CareerPathDetailSerializer.TOP_MODULES_LIMIT],
+                to_attr='top_relevances'
+            ))
+
+        return queryset
+
+    @cache_catalog_response(CareerPath, ModuleCareerRelevance)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_catalog_response(CareerPath, ModuleCareerRelevance, Module)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     @action(detail=True, methods=['get'], url_path='modules')
+    @cache_catalog_response(CareerPath, ModuleCareerRelevance, Module)
     def get_modules(self, request, pk=None):
         """Get all modules relevant to this career path."""
         career_path = self.get_object()
@@ -243,31 +581,81 @@ class UserCareerInterestViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['post'], url_path='set-interests')
     def set_interests(self, request):
-        """Set multiple career interests at once."""
-        interests_data = request.data.get('interests', [])
+        """
+        Replace the user's career interests with the submitted set.
 
-        # Clear existing interests
-        UserCareerInterest.objects.filter(user=request.user).delete()
+        All career_ids are resolved in one query and diffed against the
+        existing rows, so only new, changed and removed interests are
+        written, inside a single transaction. Unknown career_ids are
+        returned in `unresolved`.
+        """
+        interests_data = request.data.get('interests', [])
 
-        created_interests = []
+        # Last entry wins if a career is submitted twice
+        submitted = {}
         for interest in interests_data:
             career_id = interest.get('career_id')
-            try:
-                career_path = CareerPath.objects.get(career_id=career_id)
-                user_interest = UserCareerInterest.objects.create(
-                    user=request.user,
-                    career_path=career_path,
-                    interest_level=interest.get('interest_level', 50),
-                    is_primary=interest.get('is_primary', False)
+            if career_id:
+                submitted[career_id] = interest
+
+        career_paths = CareerPath.objects.in_bulk(list(submitted), field_name='career_id')
+        unresolved = [career_id for career_id in submitted if career_id not in career_paths]
+
+        now = timezone.now()
+        with transaction.atomic():
+            # Lock the user's rows so concurrent replacements apply one after another
+            existing = {
+                interest.career_path_id: interest
+                for interest in UserCareerInterest.objects.select_for_update().filter(user=request.user)
+            }
+
+            interests, to_create, to_update = [], [], []
+            for career_id, data in submitted.items():
+                career_path = career_paths.get(career_id)
+                if career_path is None:
+                    continue
+                interest_level = data.get('interest_level', 50)
+                is_primary = data.get('is_primary', False)
+
+                user_interest = existing.pop(career_path.pk, None)
+                if user_interest is None:
+                    user_interest = UserCareerInterest(
+                        user=request.user,
+                        career_path=career_path,
+                        interest_level=interest_level,
+                        is_primary=is_primary,
+                    )
+                    to_create.append(user_interest)
+                elif (user_interest.interest_level, user_interest.is_primary) != (interest_level, is_primary):
+                    user_interest.interest_level = interest_level
+                    user_interest.is_primary = is_primary
+                    user_interest.updated_at = now
+                    to_update.append(user_interest)
+                user_interest.career_path = career_path
+                interests.append(user_interest)
+
+            if existing:
+                UserCareerInterest.objects.filter(
+                    pk__in=[interest.pk for interest in existing.values()]
+                ).delete()
+            if to_update:
+                UserCareerInterest.objects.bulk_update(
+                    to_update, ['interest_level', 'is_primary', 'updated_at']
+                )
+            if to_create:
+                # A row inserted by a concurrent request is updated instead of failing
+                UserCareerInterest.objects.bulk_create(
+                    to_create,
+                    update_conflicts=True,
+                    unique_fields=['user', 'career_path'],
+                    update_fields=['interest_level', 'is_primary', 'updated_at'],
                 )
-                created_interests.append(user_interest)
-            except CareerPath.DoesNotExist:
-                continue
 
-        serializer = UserCareerInterestSerializer(created_interests, many=True)
+        serializer = UserCareerInterestSerializer(interests, many=True)
         return Response({
-            'message': f'Set {len(created_interests)} career interests',
-            'interests': serializer.data
+            'message': f'Set {len(interests)} career interests',
+            'interests': serializer.data,
+            'unresolved': unresolved,
         })
 
 
@@ -275,7 +663,7 @@ class UserCareerInterestViewSet(viewsets.ModelViewSet):
 # CAREER OFFER VIEWS
 # ============================================
 
-class CareerOfferViewSet(viewsets.ReadOnlyModelViewSet):
+class CareerOfferViewSet(AsyncReadOnlyModelViewSet):
     """
     API endpoint for career offers (yellow-highlighted from Infomappe).
     Supports filtering by career field.
@@ -283,165 +671,85 @@ class CareerOfferViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = CareerOffer.objects.filter(is_active=True)
     serializer_class = CareerOfferSerializer
     permission_classes = [AllowAny]
+    # Opt-in: responses are only paginated when ?limit= is given
+    pagination_class = LimitOffsetPagination
+
+    @cache_catalog_response(CareerOffer)
+    async def list(self, request, *args, **kwargs):
+        return await super().list(request, *args, **kwargs)
+
+    @cache_catalog_response(CareerOffer)
+    async def retrieve(self, request, *args, **kwargs):
+        return await super().retrieve(request, *args, **kwargs)
 
     @action(detail=False, methods=['get'])
-    def by_career_field(self, request):
+    @cache_catalog_response(CareerOffer, CareerOfferField)
+    async def by_career_field(self, request):
         """
-        GET /api/career-offers/by_career_field/?field=industry
+        GET /api/career-offers/by_career_field/?field=industry[&limit=10&offset=0]
         Returns offers where career_fields array contains the specified field.
         """
         field = request.query_params.get('field', None)
         if not field:
             return Response({'error': 'field parameter required'}, status=400)
 
-        # Get all active offers and filter in Python (SQLite-compatible)
-        all_offers = self.queryset.all()
-        filtered_offers = [
-            offer for offer in all_offers
-            if field in offer.career_fields
-        ]
+        # Filter through the indexed career field membership table
+        offers = self.get_queryset().filter(
+            field_memberships__career_field=field
+        ).order_by('-priority', 'category', 'title_de')
 
-        serializer = self.get_serializer(filtered_offers, many=True)
-        return Response(serializer.data)
+        return await self.paginated_response(offers)
 
 
 # ============================================
 # RECOMMENDATION VIEW
 # ============================================
 
-class RecommendationView(APIView):
+class RecommendationView(AsyncAPIView):
     """
     GET /recommendations/
     Get smart course recommendations based on career interests and progress.
     """
     permission_classes = [IsAuthenticated]
+    # Two queries, plus three when this process (re)builds the relevance matrix
+    query_budgets = {'get': 5}
 
-    def get(self, request):
+    async def get(self, request):
         user = request.user
         limit = int(request.query_params.get('limit', 10))
 
         # Get user's career interests
-        career_interests = UserCareerInterest.objects.filter(
+        career_interests = [ci async for ci in UserCareerInterest.objects.filter(
             user=user
-        ).select_related('career_path')
-
-        # Get completed module IDs
-        completed_module_ids = UserModuleCompletion.objects.filter(
-            user=user,
-            status='completed'
-        ).values_list('module_id', flat=True)
+        ).select_related('career_path')]
 
-        # Get in-progress module IDs
-        in_progress_module_ids = UserModuleCompletion.objects.filter(
+        # Completed and in-progress modules are not recommended again
+        completions = [row async for row in UserModuleCompletion.objects.filter(
             user=user,
-            status='in_progress'
-        ).values_list('module_id', flat=True)
-
-        # Base queryset: exclude completed and in-progress modules
-        available_modules = Module.objects.exclude(
-            id__in=list(completed_module_ids) + list(in_progress_module_ids)
+            status__in=['completed', 'in_progress']
+        ).values_list('module_id', 'status', 'module__credits')]
+        completed_module_ids = [module_id for module_id, state, _ in completions if state == 'completed']
+        excluded_module_ids = [module_id for module_id, _, _ in completions]
+
+        # Ranked against the precomputed module x career relevance matrix,
+        # or served from the user's cached list if nothing changed since
+        interest_weights = {ci.career_path_id: ci.interest_level for ci in career_interests}
+        recommendations = await sync_to_async(get_recommendations)(
+            user, interest_weights, excluded_module_ids, limit
         )
 
-        # If user has examination regulation, filter by it
-        if user.examination_regulation:
-            available_modules = available_modules.filter(
-                examination_regulation=user.examination_regulation
-            )
-
-        recommendations = []
-
-        if career_interests.exists():
-            # Smart recommendation based on career interests
-            career_path_ids = [ci.career_path_id for ci in career_interests]
-            interest_weights = {ci.career_path_id: ci.interest_level for ci in career_interests}
-
-            # Get modules with relevance to user's career interests
-            relevant_modules = available_modules.filter(
-                career_relevances__career_path_id__in=career_path_ids
-            ).prefetch_related('career_relevances__career_path').distinct()
-
-            # Calculate weighted score for each module
-            module_scores = {}
-            for module in relevant_modules:
-                total_score = 0
-                matching_careers = []
-
-                for relevance in module.career_relevances.all():
-                    if relevance.career_path_id in interest_weights:
-                        # Weight by both relevance score and user interest level
-                        weighted_score = (
-                            relevance.relevance_score *
-                            interest_weights[relevance.career_path_id] / 100
-                        )
-                        total_score += weighted_score
-                        matching_careers.append({
-                            'career_id': relevance.career_path.career_id,
-                            'career_title': relevance.career_path.title_en,
-                            'relevance_score': relevance.relevance_score
-                        })
-
-                if total_score > 0:
-                    module_scores[module.id] = {
-                        'module': module,
-                        'score': total_score,
-                        'matching_careers': matching_careers
-                    }
-
-            # Sort by score and take top modules
-            sorted_modules = sorted(
-                module_scores.values(),
-                key=lambda x: x['score'],
-                reverse=True
-            )[:limit]
-
-            for item in sorted_modules:
-                module = item['module']
-                career_names = [c['career_title'] for c in item['matching_careers'][:3]]
-                recommendations.append({
-                    'id': module.id,
-                    'module_code': module.module_code,
-                    'name': module.name,
-                    'name_en': module.name_en,
-                    'credits': module.credits,
-                    'category': module.category,
-                    'language': module.language,
-                    'relevance_score': round(item['score']),
-                    'matching_careers': item['matching_careers'],
-                    'recommendation_reason': f"Relevant for: {', '.join(career_names)}",
-                    'learning_objectives': module.learning_objectives[:300] + '...' if len(module.learning_objectives) > 300 else module.learning_objectives
-                })
-        else:
-            # Fallback: recommend by category (elective/specialization)
-            fallback_modules = available_modules.filter(
-                category__in=['elective', 'specialization']
-            ).order_by('?')[:limit]
-
-            for module in fallback_modules:
-                recommendations.append({
-                    'id': module.id,
-                    'module_code': module.module_code,
-                    'name': module.name,
-                    'name_en': module.name_en,
-                    'credits': module.credits,
-                    'category': module.category,
-                    'language': module.language,
-                    'relevance_score': 0,
-                    'matching_careers': [],
-                    'recommendation_reason': "Set your career interests for personalized recommendations",
-                    'learning_objectives': module.learning_objectives[:300] + '...' if len(module.learning_objectives) > 300 else module.learning_objectives
-                })
-
-        # Calculate user stats
-        total_completed_credits = Module.objects.filter(
-            id__in=completed_module_ids
-        ).aggregate(total=Sum('credits'))['total'] or 0
+        # Summed from the rows above, so a user without a progress snapshot
+        # does not have one computed inside this request
+        total_completed_credits = sum(
+            credits for _, state, credits in completions if state == 'completed'
+        )
 
         return Response({
             'recommendations': recommendations,
             'user_stats': {
                 'completed_modules': len(completed_module_ids),
                 'completed_credits': total_completed_credits,
-                'career_interests_set': career_interests.exists(),
+                'career_interests_set': bool(career_interests),
                 'career_interests': [
                     {
                         'career_id': ci.career_path.career_id,
@@ -452,7 +760,7 @@ class RecommendationView(APIView):
                     for ci in career_interests
                 ]
             },
-            'message': 'Personalized recommendations based on your career interests' if career_interests.exists() else 'Set your career interests for personalized recommendations'
+            'message': 'Personalized recommendations based on your career interests' if career_interests else 'Set your career interests for personalized recommendations'
         }, status=status.HTTP_200_OK)
 
 
@@ -462,12 +770,16 @@ class RecommendationView(APIView):
 
 class NotificationViewSet(viewsets.ModelViewSet):
     """
-    GET /notifications/ - Get user's notifications
+    GET /notifications/ - Get user's notifications (cursor-paginated, newest first)
+    GET /notifications/unread-count/ - Number of unread notifications
     PATCH /notifications/:id/read - Mark notification as read
+    POST /notifications/mark-all-read/ - Mark all notifications as read
     DELETE /notifications/:id/ - Delete notification
     """
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = NotificationCursorPagination
+    query_budgets = {'list': 2, 'unread_count': 2, 'mark_all_read': 2}
 
     def get_queryset(self):
         """Return only current user's notifications"""
@@ -480,7 +792,25 @@ class NotificationViewSet(viewsets.ModelViewSet):
         elif read_status == 'false':
             queryset = queryset.filter(read_at__isnull=True)
 
-        return queryset.order_by('-created_at')
+        notification_type = self.request.query_params.get('type', None)
+        if notification_type:
+            queryset = queryset.filter(type=notification_type)
+
+        return queryset.order_by('-created_at', '-id')
+
+    @action(detail=False, methods=['get'], url_path='unread-count')
+    def unread_count(self, request):
+        """Count unread notifications through the (user, read_at) index"""
+        count = Notification.objects.filter(user=request.user, read_at__isnull=True).count()
+        return Response({'unread_count': count}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='mark-all-read')
+    def mark_all_read(self, request):
+        """Mark every unread notification as read with a single UPDATE"""
+        updated = Notification.objects.filter(
+            user=request.user, read_at__isnull=True
+        ).update(read_at=timezone.now())
+        return Response({'updated': updated}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['patch'], url_path='read')
     def mark_as_read(self, request, pk=None):
@@ -496,11 +826,69 @@ class NotificationViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_404_NOT_FOUND)
 
 
+class EventStreamTicketView(APIView):
+    """
+    POST /events/ticket/
+    Issues a ticket for opening /events/ within EVENT_STREAM_TICKET_MAX_AGE
+    seconds, so the API token never appears in the stream URL.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        return Response({
+            'ticket': issue_stream_ticket(request.user),
+            'expires_in': settings.EVENT_STREAM_TICKET_MAX_AGE,
+        }, status=status.HTTP_200_OK)
+
+
+@require_GET
+async def notification_events(request):
+    """
+    GET /events/?ticket=<ticket>[&last_event_id=<id>] - Server-sent events
+    with the user's new notifications and milestone progress changes (see
+    api/events.py). EventSource cannot send headers, so authenticate with
+    a ticket from POST /events/ticket/ rather than the API token.
+    """
+    ticket = request.GET.get('ticket', '')
+    # Shared thread pool: the stream must not hold the request's connection
+    user = await sync_to_async(authenticate_ticket, thread_sensitive=False)(ticket) if ticket else None
+    if user is None:
+        return JsonResponse(
+            {'error': 'A valid stream ticket is required.'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+
+    cursor = StreamCursor.parse(
+        request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    )
+    if cursor is None:
+        cursor = await sync_to_async(initial_cursor, thread_sensitive=False)(user.pk)
+
+    if isinstance(request, ASGIRequest):
+        response = StreamingHttpResponse(
+            event_stream(
+                user.pk, cursor,
+                poll_interval=settings.EVENT_STREAM_POLL_INTERVAL,
+                max_age=settings.EVENT_STREAM_MAX_AGE,
+            ),
+            content_type='text/event-stream'
+        )
+    else:
+        # WSGI cannot hold the connection open; send what is pending and
+        # let the client reconnect
+        payload = await sync_to_async(pending_messages, thread_sensitive=False)(user.pk, cursor)
+        response = HttpResponse(payload, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx-style proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 # ============================================
 # SUPPORT SERVICE VIEWS
 # ============================================
 
-class SupportServiceViewSet(viewsets.ReadOnlyModelViewSet):
+class SupportServiceViewSet(AsyncReadOnlyModelViewSet):
     """
     GET /support/services/ - Get list of support services
     """
@@ -516,7 +904,16 @@ class SupportServiceViewSet(viewsets.ReadOnlyModelViewSet):
         if category:
             queryset = queryset.filter(category=category)
 
-        return queryset.order_by('category', 'name')
+        # Serializing related_milestones must not query inside the event loop
+        return queryset.prefetch_related('related_milestones').order_by('category', 'name')
+
+    @cache_catalog_response(SupportService)
+    async def list(self, request, *args, **kwargs):
+        return await super().list(request, *args, **kwargs)
+
+    @cache_catalog_response(SupportService)
+    async def retrieve(self, request, *args, **kwargs):
+        return await super().retrieve(request, *args, **kwargs)
 
 
 class SupportContactView(APIView):
@@ -539,7 +936,7 @@ class SupportContactView(APIView):
 # MASTER PROGRAM VIEWS
 # ============================================
 
-class MasterProgramView(APIView):
+class MasterProgramView(AsyncAPIView):
     """
     GET /master-programs/
     Returns TU Darmstadt Department of Computer Science Master's programs
@@ -548,8 +945,9 @@ class MasterProgramView(APIView):
     """
     permission_classes = [AllowAny]
 
-    def get(self, request):
-        programs = MasterProgram.objects.filter(is_active=True)
+    @cache_catalog_response(MasterProgram)
+    async def get(self, request):
+        programs = [program async for program in MasterProgram.objects.filter(is_active=True)]
         serializer = MasterProgramSerializer(programs, many=True)
         return Response({
             'programs': serializer.data,
@@ -570,3 +968,81 @@ class MasterProgramView(APIView):
             },
             'section_url': 'https://www.informatik.tu-darmstadt.de/studium_fb20/im_studium/studiengaenge_liste/index.de.jsp',
         })
+
+
+# ============================================
+# CATALOG BUNDLE VIEWS
+# ============================================
+
+class CatalogManifestView(APIView):
+    """
+    GET /catalog/manifest/
+    Current catalog bundle per examination regulation and language (see
+    api/bundles.py). Bundle URLs never change content, so only this
+    manifest has to be revalidated.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        manifest = read_manifest()
+        if manifest is None:
+            return Response({
+                'error': 'No catalog bundles built yet'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        etag = '"{}"'.format(manifest['generated_at'])
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if request.headers.get('If-None-Match') == etag:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        for languages in manifest['bundles'].values():
+            for entry in languages.values():
+                entry['url'] = request.build_absolute_uri(
+                    reverse('catalog-bundle', args=[entry['file']])
+                )
+        return Response(manifest, headers=headers)
+
+
+def _accepts_encoding(accept_encoding, encoding):
+    """
+    Whether an Accept-Encoding header allows `encoding`: listed (or
+    covered by "*") with a q-value above 0.
+    """
+    qualities = {}
+    for item in accept_encoding.split(','):
+        token, *params = [part.strip() for part in item.split(';')]
+        if not token:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[token.lower()] = quality
+    return qualities.get(encoding, qualities.get('*', 0.0)) > 0
+
+
+@require_GET
+def catalog_bundle(request, name):
+    """
+    GET /catalog/bundles/<name>
+    A content-hashed catalog bundle, served from its precompressed brotli
+    or gzip variant when the client accepts one.
+    """
+    path = os.path.join(str(settings.CATALOG_BUNDLE_DIR), name)
+    accepted = request.headers.get('Accept-Encoding', '')
+    for encoding, suffix in (('br', '.br'), ('gzip', '.gz'), (None, '')):
+        if (encoding is None or _accepts_encoding(accepted, encoding)) and os.path.exists(path + suffix):
+            break
+    else:
+        raise Http404('Unknown catalog bundle')
+
+    response = FileResponse(open(path + suffix, 'rb'), content_type='application/json')
+    if encoding:
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ['Accept-Encoding'])
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
@@ -0,0 +1,45 @@
+"""
+Gunicorn configuration for production.
+
+Runs the ASGI application (config/asgi.py) in several Uvicorn worker
+processes, so async views (see api/async_views.py) do not tie up a thread
+while they wait. Every setting can be overridden through the environment.
+
+Usage:
+    gunicorn config.asgi:application -c config/gunicorn.conf.py
+"""
+import multiprocessing
+import os
+
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'uvicorn_worker.UvicornWorker')
+
+# WEB_CONCURRENCY is the conventional name for the worker count. Async
+# workers interleave requests themselves, so one per core is enough.
+# Several workers need a shared CACHE_BACKEND; config/settings.py refuses
+# locmem, so the effective count is exported for it to check.
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+os.environ['WEB_CONCURRENCY'] = str(workers)
+
+# Seconds an idle keep-alive connection stays open; keep above the
+# idle timeout of the proxy in front (traefik) to avoid reset connections
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 75))
+
+# A worker silent for this long is killed and replaced
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+
+# Seconds workers get to finish in-flight requests on restart/shutdown
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+# Recycle workers after this many requests (plus jitter, so they do not
+# all restart at once) to bound slow memory growth; 0 disables it
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+# The proxy terminates TLS; trust its X-Forwarded-* headers
+forwarded_allow_ips = os.getenv('FORWARDED_ALLOW_IPS', '*')
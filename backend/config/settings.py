@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+from importlib.util import find_spec
+from django.core.exceptions import ImproperlyConfigured
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,6 +46,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestMetricsMiddleware',  # Outermost, so its timing covers the whole request
     'corsheaders.middleware.CorsMiddleware',  # Must be before CommonMiddleware
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -95,8 +98,22 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
+    # orjson-based JSON (see api/renderers.py); MessagePack only if installed
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+if find_spec('msgpack'):
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('api.renderers.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].append('api.renderers.MessagePackParser')
+
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
@@ -105,7 +122,36 @@ import os
 
 DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite')
 
+
+def env_flag(name, default):
+    return os.getenv(name, default).lower() in ('1', 'true', 'yes', 'on')
+
+
+# Connection reuse:
+#   DB_POOL            - PostgreSQL only: use psycopg's connection pool.
+#                        Off by default; install psycopg[pool] (it is not
+#                        in requirements.txt) before turning it on
+#   CONN_MAX_AGE       - seconds a connection is kept open for the next
+#                        request, 0 closes it after every request. Django
+#                        keeps these per thread, so under ASGI (gunicorn
+#                        with Uvicorn workers) prefer the pool. Must be 0
+#                        when the pool is used.
+#   CONN_HEALTH_CHECKS - check a reused connection before the request uses it
+DB_POOL = env_flag('DB_POOL', 'false')
+CONN_MAX_AGE = int(os.getenv('CONN_MAX_AGE', 0))
+CONN_HEALTH_CHECKS = env_flag('CONN_HEALTH_CHECKS', 'true')
+
 if DB_ENGINE == 'postgresql':
+    postgres_options = {}
+    if DB_POOL:
+        postgres_options['pool'] = {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+            # Seconds a request waits for a free connection before failing
+            'timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+        }
+        CONN_MAX_AGE = 0
+
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.postgresql',
@@ -114,6 +160,9 @@ if DB_ENGINE == 'postgresql':
             'PASSWORD': os.getenv('DB_PASSWORD', ''),
             'HOST': os.getenv('DB_HOST', 'localhost'),
             'PORT': os.getenv('DB_PORT', '5432'),
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': CONN_HEALTH_CHECKS,
+            'OPTIONS': postgres_options,
         }
     }
 else:
@@ -121,10 +170,103 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': CONN_HEALTH_CHECKS,
+            'OPTIONS': {
+                # Run on every new connection: WAL lets readers work while a
+                # write is in progress, synchronous=NORMAL is safe with WAL
+                # and skips an fsync per commit, and the memory map serves
+                # reads without read() calls.
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    f"PRAGMA mmap_size={int(os.getenv('SQLITE_MMAP_SIZE', 128 * 1024 * 1024))};"
+                    'PRAGMA temp_store=MEMORY;'
+                ),
+                # Seconds to wait for a lock (busy_timeout) before raising
+                # "database is locked"
+                'timeout': float(os.getenv('SQLITE_BUSY_TIMEOUT', 20)),
+                # Take the write lock when a transaction starts, so concurrent
+                # writers wait for the busy timeout instead of failing on
+                # lock upgrade
+                'transaction_mode': 'IMMEDIATE',
+            },
         }
     }
 
 
+# Caching
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# CACHE_BACKEND selects where cached data lives:
+#   locmem - per-process memory (default, only for a single worker: catalog
+#            versions bumped by one process never reach the others)
+#   file   - files under CACHE_LOCATION, shared by all workers on a host
+#   shm    - like file, but under /dev/shm so entries stay in shared memory
+# Any other value is used as a Django cache backend path with CACHE_LOCATION.
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem')
+
+
+def cache_config(name):
+    if CACHE_BACKEND == 'locmem':
+        return {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': name,
+        }
+    if CACHE_BACKEND in ('file', 'shm'):
+        default_root = '/dev/shm/career-roadmap' if CACHE_BACKEND == 'shm' else str(BASE_DIR / '.cache')
+        return {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(Path(os.getenv('CACHE_LOCATION', default_root)) / name),
+        }
+    return {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+        'KEY_PREFIX': name,
+    }
+
+
+CACHES = {
+    'default': cache_config('default'),
+    # Versioned responses of the public catalog endpoints (see api/cache.py)
+    'catalog': cache_config('catalog'),
+}
+
+# Several workers (see config/gunicorn.conf.py) must share one cache, or
+# catalog changes and precomputed recommendations stay invisible to most
+if CACHE_BACKEND == 'locmem' and int(os.getenv('WEB_CONCURRENCY', 1)) > 1:
+    raise ImproperlyConfigured(
+        'CACHE_BACKEND=locmem is per process; use file, shm or a shared '
+        'cache server with WEB_CONCURRENCY > 1'
+    )
+
+# Seconds a cached catalog response is kept; entries are keyed on the
+# catalog version, so this only bounds how long superseded entries linger.
+CATALOG_CACHE_TIMEOUT = int(os.getenv('CATALOG_CACHE_TIMEOUT', 24 * 60 * 60))
+
+# Seconds a user's precomputed recommendation list is kept (see api/recommendations.py)
+RECOMMENDATION_CACHE_TIMEOUT = int(os.getenv('RECOMMENDATION_CACHE_TIMEOUT', 7 * 24 * 60 * 60))
+
+# Prebuilt module search index, written by import_course_data (see api/search.py)
+SEARCH_INDEX_PATH = Path(os.getenv('SEARCH_INDEX_PATH', BASE_DIR / 'search_index.json'))
+
+# Content-hashed catalog bundles, written by import_course_data and the
+# seed commands (see api/bundles.py)
+CATALOG_BUNDLE_DIR = Path(os.getenv('CATALOG_BUNDLE_DIR', BASE_DIR / 'catalog_bundles'))
+
+# /api/events/ streams: seconds between database polls (picks up changes
+# made by other workers) and seconds before a stream is closed so the
+# client reconnects, which lets workers restart gracefully
+EVENT_STREAM_POLL_INTERVAL = float(os.getenv('EVENT_STREAM_POLL_INTERVAL', 15))
+EVENT_STREAM_MAX_AGE = float(os.getenv('EVENT_STREAM_MAX_AGE', 600))
+# Seconds a stream ticket (POST /api/events/ticket/) may be used to connect
+EVENT_STREAM_TICKET_MAX_AGE = int(os.getenv('EVENT_STREAM_TICKET_MAX_AGE', 60))
+
+# Bearer token required by /api/metrics/ (see api/middleware.py); if empty the
+# endpoint is closed
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -1,10 +1,14 @@
 from django.contrib import admin
+from django.contrib.staticfiles.urls import staticfiles_urlpatterns
 from django.urls import path, include, re_path
 from django.views.generic import TemplateView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("api.urls")),
+    # runserver serves static files itself; under gunicorn this pattern
+    # does (only while DEBUG is on)
+    *staticfiles_urlpatterns(),
     # Serve React app for all other routes
     re_path(r'^(?!api/|admin/|static/).*$', TemplateView.as_view(template_name='index.html')),
 ]
@@ -1,8 +1,10 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import {
-  getNotifications,
+  getNotificationsPage,
+  getUnreadCount,
   markAsRead,
+  subscribeToNotificationEvents,
   markAllAsRead,
   getNotificationTypeInfo
 } from '../services/notificationService';
@@ -11,6 +13,9 @@ import ErrorMessage from './ErrorMessage';
 
 const NotificationsPage = ({ language }) => {
   const [notifications, setNotifications] = useState([]);
+  const [nextPage, setNextPage] = useState(null);
+  const [unreadCount, setUnreadCount] = useState(0);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState(null);
   const [filter, setFilter] = useState('all'); // 'all', 'unread', 'read'
@@ -25,6 +30,7 @@ const NotificationsPage = ({ language }) => {
       unread: 'Unread',
       read: 'Read',
       markAllRead: 'Mark all as read',
+      loadMore: 'Load more',
       noNotifications: 'No notifications',
       noUnread: 'No unread notifications',
       today: 'Today',
@@ -38,6 +44,7 @@ const NotificationsPage = ({ language }) => {
       unread: 'Ungelesen',
       read: 'Gelesen',
       markAllRead: 'Alle als gelesen markieren',
+      loadMore: 'Mehr laden',
       noNotifications: 'Keine Benachrichtigungen',
       noUnread: 'Keine ungelesenen Benachrichtigungen',
       today: 'Heute',
@@ -53,12 +60,29 @@ const NotificationsPage = ({ language }) => {
     loadNotifications();
   }, []);
 
+  // New notifications are pushed by the server instead of polled
+  useEffect(() => {
+    return subscribeToNotificationEvents({
+      onNotification: (notification) => {
+        setNotifications(current => (
+          current.some(n => n.id === notification.id) ? current : [notification, ...current]
+        ));
+        if (!notification.isRead) {
+          setUnreadCount(count => count + 1);
+        }
+      },
+    });
+  }, []);
+
   const loadNotifications = async () => {
     setIsLoading(true);
     setError(null);
     try {
-      const data = await getNotifications();
-      setNotifications(data);
+      // The feed is paginated, so the unread total comes from the server
+      const [page, count] = await Promise.all([getNotificationsPage(), getUnreadCount()]);
+      setNotifications(page.notifications);
+      setNextPage(page.next);
+      setUnreadCount(count);
     } catch (err) {
       setError(err.message);
     } finally {
@@ -66,12 +90,26 @@ const NotificationsPage = ({ language }) => {
     }
   };
 
+  const loadMore = async () => {
+    setIsLoadingMore(true);
+    try {
+      const page = await getNotificationsPage(nextPage);
+      setNotifications([...notifications, ...page.notifications]);
+      setNextPage(page.next);
+    } catch (err) {
+      console.error('Failed to load more notifications:', err);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const handleMarkAsRead = async (id) => {
     try {
       await markAsRead(id);
       setNotifications(notifications.map(n =>
         n.id === id ? { ...n, isRead: true, readAt: new Date().toISOString() } : n
       ));
+      setUnreadCount(count => Math.max(0, count - 1));
     } catch (err) {
       console.error('Failed to mark as read:', err);
     }
@@ -85,6 +123,7 @@ const NotificationsPage = ({ language }) => {
         isRead: true,
         readAt: n.readAt || new Date().toISOString()
       })));
+      setUnreadCount(0);
     } catch (err) {
       console.error('Failed to mark all as read:', err);
     }
@@ -115,8 +154,6 @@ const NotificationsPage = ({ language }) => {
     return true;
   });
 
-  const unreadCount = notifications.filter(n => !n.isRead).length;
-
   if (isLoading) {
     return (
       <div style={styles.loadingContainer}>
@@ -237,6 +274,16 @@ const NotificationsPage = ({ language }) => {
           })
         )}
       </div>
+
+      {nextPage && (
+        <button
+          onClick={loadMore}
+          disabled={isLoadingMore}
+          style={styles.loadMoreButton}
+        >
+          {t.loadMore}
+        </button>
+      )}
     </div>
   );
 };
@@ -286,6 +333,17 @@ const styles = {
     fontWeight: '500',
     transition: 'background-color 0.2s',
   },
+  loadMoreButton: {
+    display: 'block',
+    margin: '20px auto 0',
+    padding: '10px 20px',
+    backgroundColor: 'white',
+    color: '#0F6CBF',
+    border: '1px solid #0F6CBF',
+    borderRadius: '8px',
+    cursor: 'pointer',
+    fontSize: '14px',
+  },
   filterTabs: {
     display: 'flex',
     gap: '8px',
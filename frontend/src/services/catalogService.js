@@ -0,0 +1,50 @@
+import api from './api';
+
+/**
+ * Catalog bundles: the modules, career paths, career offers, master
+ * programs and support services of one examination regulation in one
+ * language, as a single immutable file (see backend/api/bundles.py).
+ *
+ * Only the small manifest is revalidated; a bundle URL changes whenever
+ * its content does, so the browser caches bundles forever.
+ */
+
+// In-flight or loaded bundles by URL, shared for the lifetime of the page
+const bundles = new Map();
+
+/**
+ * Get the current bundle manifest
+ */
+export const getCatalogManifest = async () => {
+  const response = await api.get('/catalog/manifest/');
+  return response.data;
+};
+
+/**
+ * Get the catalog of an examination regulation in the given language
+ * ('en' or 'de'). Resolves to null if no bundle exists for it.
+ */
+export const getCatalog = async (regulationId, language = 'en') => {
+  const manifest = await getCatalogManifest();
+  const entry = manifest.bundles[String(regulationId)]?.[language];
+  if (!entry) {
+    return null;
+  }
+
+  if (!bundles.has(entry.url)) {
+    // Bundles are public; skip the auth header so shared caches may store them
+    const request = api.get(entry.url, { headers: { Authorization: undefined } })
+      .then(response => response.data)
+      .catch(error => {
+        bundles.delete(entry.url);
+        throw error;
+      });
+    bundles.set(entry.url, request);
+  }
+  return bundles.get(entry.url);
+};
+
+export default {
+  getCatalogManifest,
+  getCatalog,
+};
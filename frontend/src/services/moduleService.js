@@ -8,6 +8,34 @@ const USE_MOCK = false;
 // Simulate API delay for mock data
 const delay = (ms = 500) => new Promise(resolve => setTimeout(resolve, ms));
 
+// Largest page the /modules/ endpoint will serve
+const MODULE_PAGE_SIZE = 500;
+
+// Module list fields read by transformModuleFromAPI
+const MODULE_LIST_FIELDS = 'id,module_code,name,credits,category,group_name,description';
+
+/**
+ * Fetch every page of the cursor-paginated /modules/ endpoint
+ */
+const fetchAllModulePages = async (params = {}) => {
+  const modules = [];
+  let response = await api.get('/modules/', {
+    params: { page_size: MODULE_PAGE_SIZE, fields: MODULE_LIST_FIELDS, ...params }
+  });
+
+  for (;;) {
+    const data = response.data;
+    if (Array.isArray(data)) {
+      return modules.concat(data);
+    }
+    modules.push(...(data.results || []));
+    if (!data.next) {
+      return modules;
+    }
+    response = await api.get(data.next);
+  }
+};
+
 /**
  * Get all modules for the current user's examination regulation
  * Falls back to local data if backend is unavailable
@@ -19,8 +47,7 @@ export const getAllModules = async () => {
   }
 
   try {
-    const response = await api.get('/modules/');
-    const data = Array.isArray(response.data) ? response.data : (response.data.results || []);
+    const data = await fetchAllModulePages();
     return data.map(transformModuleFromAPI);
   } catch (error) {
     console.warn('API unavailable, using local module data');
@@ -98,10 +125,8 @@ export const getModulesByCategory = async (category) => {
       .map(transformModuleToFrontend);
   }
 
-  const response = await api.get('/modules/', {
-    params: { category }
-  });
-  return response.data.map(transformModuleFromAPI);
+  const data = await fetchAllModulePages({ category });
+  return data.map(transformModuleFromAPI);
 };
 
 /**
@@ -1,4 +1,4 @@
-import api from './api';
+import api, { getStoredToken } from './api';
 
 // Flag to use mock data when backend is not ready
 const USE_MOCK = false;
@@ -71,16 +71,34 @@ const mockNotifications = [
 ];
 
 /**
- * Get all notifications for the current user
+ * Items of a cursor-paginated /notifications/ response
  */
-export const getNotifications = async () => {
+const notificationResults = (data) => (Array.isArray(data) ? data : (data.results || []));
+
+/**
+ * Get one page of the current user's notifications, newest first.
+ * Pass the `next` URL of the previous page to continue the feed.
+ * Returns { notifications, next }; next is null on the last page.
+ */
+export const getNotificationsPage = async (next = null) => {
   if (USE_MOCK) {
     await delay(500);
-    return mockNotifications.map(transformNotification);
+    return { notifications: mockNotifications.map(transformNotification), next: null };
   }
 
-  const response = await api.get('/notifications/');
-  return response.data.map(transformNotificationFromAPI);
+  const response = next ? await api.get(next) : await api.get('/notifications/');
+  return {
+    notifications: notificationResults(response.data).map(transformNotificationFromAPI),
+    next: response.data.next || null,
+  };
+};
+
+/**
+ * Get the newest notifications for the current user (first page)
+ */
+export const getNotifications = async () => {
+  const { notifications } = await getNotificationsPage();
+  return notifications;
 };
 
 /**
@@ -92,9 +110,8 @@ export const getUnreadCount = async () => {
     return mockNotifications.filter(n => !n.readAt).length;
   }
 
-  // Get all notifications and count unread ones
-  const response = await api.get('/notifications/', { params: { read: 'false' } });
-  return response.data.length;
+  const response = await api.get('/notifications/unread-count/');
+  return response.data.unread_count;
 };
 
 /**
@@ -109,9 +126,9 @@ export const getUnreadNotifications = async () => {
   }
 
   const response = await api.get('/notifications/', {
-    params: { unread: true }
+    params: { read: 'false' }
   });
-  return response.data.map(transformNotificationFromAPI);
+  return notificationResults(response.data).map(transformNotificationFromAPI);
 };
 
 /**
@@ -145,13 +162,82 @@ export const markAllAsRead = async () => {
     return { success: true };
   }
 
-  // Mark all unread as read by fetching and updating each
-  const unreadResponse = await api.get('/notifications/', { params: { read: 'false' } });
-  const promises = unreadResponse.data.map(n => api.patch(`/notifications/${n.id}/read/`));
-  await Promise.all(promises);
+  await api.post('/notifications/mark-all-read/');
   return { success: true };
 };
 
+// Delay before reopening the event stream, matching the server's retry hint
+const EVENT_STREAM_RETRY_MS = 5000;
+
+/**
+ * Subscribe to the server-sent event stream (/events/) instead of polling.
+ * Calls onNotification for every new notification and onMilestone for
+ * every milestone progress change. Returns a function that closes the stream.
+ *
+ * EventSource cannot send the auth header, so every connection uses a
+ * short-lived ticket from POST /events/ticket/. A ticket cannot be reused
+ * once it expires, so the stream is reopened here rather than by
+ * EventSource's own reconnect. It resumes after the last received event.
+ */
+export const subscribeToNotificationEvents = ({ onNotification, onMilestone } = {}) => {
+  if (USE_MOCK || !getStoredToken() || typeof EventSource === 'undefined') {
+    return () => {};
+  }
+
+  let source = null;
+  let retryTimer = null;
+  let closed = false;
+  let lastEventId = null;
+
+  const reconnectLater = () => {
+    if (!closed) {
+      retryTimer = setTimeout(connect, EVENT_STREAM_RETRY_MS);
+    }
+  };
+
+  const handle = (callback, transform) => (event) => {
+    lastEventId = event.lastEventId || lastEventId;
+    if (callback) {
+      callback(transform(JSON.parse(event.data)));
+    }
+  };
+
+  async function connect() {
+    let ticket;
+    try {
+      ticket = (await api.post('/events/ticket/')).data.ticket;
+    } catch (error) {
+      reconnectLater();
+      return;
+    }
+    if (closed) {
+      return;
+    }
+
+    const params = new URLSearchParams({ ticket });
+    if (lastEventId) {
+      params.set('last_event_id', lastEventId);
+    }
+    source = new EventSource(`${api.defaults.baseURL}/events/?${params}`);
+    source.addEventListener('notification', handle(onNotification, transformNotificationFromAPI));
+    source.addEventListener('milestone', handle(onMilestone, data => data));
+    source.onerror = () => {
+      source.close();
+      reconnectLater();
+    };
+  }
+
+  connect();
+
+  return () => {
+    closed = true;
+    clearTimeout(retryTimer);
+    if (source) {
+      source.close();
+    }
+  };
+};
+
 /**
  * Delete a notification
  */
@@ -183,7 +269,7 @@ export const getNotificationsByType = async (type) => {
   const response = await api.get('/notifications/', {
     params: { type }
   });
-  return response.data.map(transformNotificationFromAPI);
+  return notificationResults(response.data).map(transformNotificationFromAPI);
 };
 
 /**